@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+FreeRDP front-end discovery and per-flavour frame delivery benchmark.
+
+Installs the fake FreeRDP binary under the name of every front-end in a
+temporary directory, then reports which flavour is chosen for each display
+server, the cost of the discovery, and the time to established and frame
+delivery rate of sessions run through ConnectionThread with each flavour.
+
+    python3 benchmarks/bench_flavours.py --sessions 20 --frames 5000
+
+With --bin-dir, the front-ends found in that directory are used instead of the
+fake, connecting to --server, which should be a local stand-in RDP server.
+"""
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import tempfile
+import shutil
+import json
+import time
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FAKE_FREERDP = os.path.join(BENCH_DIR, "fake_xfreerdp.py")
+
+
+def install_fakes(PyRDPConnect, directory):
+
+    # Link the fake binary under the preferred name of each front-end
+    for info in PyRDPConnect.FreeRDPClients.flavours.values():
+        os.symlink(FAKE_FREERDP, os.path.join(directory, info["names"][0]))
+
+
+def run_sessions(app, PyRDPConnect, path, server, count):
+
+    """
+    Run `count` sequential sessions with one front-end and time them.
+    """
+    from PyQt5.QtCore import QEventLoop
+
+    records = []
+    for _ in range(count):
+        loop = QEventLoop()
+        thread = PyRDPConnect.ConnectionThread([path, f"/v:{server}"])
+        record = {"start": time.perf_counter(), "outcome": "cancelled"}
+        thread.connection_established.connect(lambda: record.update(established=time.perf_counter()))
+        thread.connection_success.connect(lambda: record.update(outcome="success"))
+        thread.connection_failed.connect(lambda message: record.update(outcome="failed"))
+        thread.finished.connect(loop.quit)
+        thread.start()
+        loop.exec_()
+        record["end"] = time.perf_counter()
+        thread.wait()
+        thread.deleteLater()
+        records.append(record)
+    return records
+
+
+def summarize(records, frames):
+    from load_connect import summarize as percentiles
+    established = [(r["established"] - r["start"]) * 1000 for r in records if "established" in r]
+    delivery = [frames / (r["end"] - r["established"]) for r in records if "established" in r and r["end"] > r["established"]]
+    return {
+        "sessions": len(records),
+        "failed": sum(1 for r in records if r["outcome"] != "success"),
+        "time_to_established_ms": percentiles(established),
+        "frames_per_second": percentiles(delivery),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=10, help="Sessions per flavour")
+    parser.add_argument("--frames", type=int, default=2000, help="Frames printed by the fake session")
+    parser.add_argument("--discoveries", type=int, default=200, help="Timed discovery runs")
+    parser.add_argument("--bin-dir", help="Benchmark the real front-ends in this directory")
+    parser.add_argument("--server", help="Server for the real front-ends, host[:port]")
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    args = parser.parse_args()
+
+    from PyQt5.QtWidgets import QApplication
+    sys.path.insert(0, BENCH_DIR)
+    sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "src"))
+    app = QApplication.instance() or QApplication([])
+    import PyRDPConnect
+    clients = PyRDPConnect.FreeRDPClients
+
+    bin_dir = args.bin_dir or tempfile.mkdtemp(prefix="pyrdpconnect-flavours-")
+    try:
+        if not args.bin_dir:
+            install_fakes(PyRDPConnect, bin_dir)
+        server = args.server or f"ok.lines{args.frames}.session0.fake"
+
+        # Discovery restricted to the benchmark directory, the fake still needs python3 from the PATH
+        path = os.environ["PATH"]
+        os.environ["PATH"] = bin_dir
+        try:
+            started = time.perf_counter()
+            for _ in range(args.discoveries):
+                available = clients.discover()
+            discovery_us = (time.perf_counter() - started) / args.discoveries * 1e6
+        finally:
+            os.environ["PATH"] = path
+
+        # Choice for every display server, with and without embedding
+        choices = {}
+        for display in clients.preference:
+            choices[display] = {
+                "default": clients.choose(display, available),
+                "embedded": clients.choose(display, available, features=("embed",)),
+                "rendering": {flavour: clients.describe(flavour, display) for flavour in available},
+            }
+
+        sessions = {}
+        for flavour, path in available.items():
+            sessions[flavour] = summarize(run_sessions(app, PyRDPConnect, path, server, args.sessions), args.frames)
+    finally:
+        if not args.bin_dir:
+            shutil.rmtree(bin_dir, ignore_errors=True)
+
+    result = {
+        "available": sorted(available),
+        "discovery_us": round(discovery_us, 1),
+        "choices": choices,
+        "sessions": sessions,
+    }
+    print(json.dumps(result, indent=4))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
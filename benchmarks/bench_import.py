@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Bulk connection import benchmark.
+
+Generates .rdp files in the UTF-16 format written by mstsc, an RDCMan file
+and a CSV list, imports them with ConnectionImporter and reports the time,
+the throughput and the peak memory traced by tracemalloc. Every input
+repeats a share of its connections so the deduplication is exercised.
+
+    python3 benchmarks/bench_import.py --files 10000 --rows 100000
+"""
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import tracemalloc
+import argparse
+import tempfile
+import shutil
+import json
+import time
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+RDP_TEMPLATE = """screen mode id:i:2
+use multimon:i:0
+desktopwidth:i:1920
+desktopheight:i:1080
+session bpp:i:32
+full address:s:{host}:3389
+audiomode:i:0
+audiocapturemode:i:1
+redirectprinters:i:1
+redirectclipboard:i:1
+drivestoredirect:s:*
+allow font smoothing:i:1
+disable wallpaper:i:1
+username:s:EXAMPLE\\{user}
+"""
+
+
+def generate(directory, files, rows, duplicates):
+
+    # One .rdp file per connection, every other one in UTF-16 like mstsc writes them
+    rdp_dir = os.path.join(directory, "rdp")
+    os.makedirs(rdp_dir)
+    for index in range(files):
+        number = index % max(1, int(files * (1 - duplicates)))
+        content = RDP_TEMPLATE.format(host=f"host{number}.example.com", user=f"user{number % 7}")
+        encoding = "utf-16" if index % 2 else "utf-8"
+        with open(os.path.join(rdp_dir, f"connection{index}.rdp"), "w", encoding=encoding) as f:
+            f.write(content)
+
+    # An RDCMan file with groups carrying the credentials of their servers
+    with open(os.path.join(directory, "servers.rdg"), "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n<RDCMan programVersion="2.7" schemaVersion="3"><file>')
+        f.write("<properties><name>Servers</name></properties>")
+        for group in range(max(1, rows // 1000)):
+            f.write(f'<group><properties><name>Group {group}</name></properties>')
+            f.write(f'<logonCredentials inherit="None"><profileName scope="Local">Custom</profileName><userName>admin{group}</userName><domain>EXAMPLE</domain></logonCredentials>')
+            for index in range(1000):
+                f.write(f"<server><properties><displayName>Server {group}-{index}</displayName><name>rdg{group}-{index}.example.com</name></properties></server>")
+            f.write("</group>")
+        f.write("</file></RDCMan>\n")
+
+    # A CSV export repeating part of its rows
+    with open(os.path.join(directory, "servers.csv"), "w", encoding="utf-8") as f:
+        f.write("DisplayName,Host,Port,Username,Domain\n")
+        for index in range(rows):
+            number = index % max(1, int(rows * (1 - duplicates)))
+            f.write(f"CSV {number},csv{number}.example.com,3389,user{number % 13},EXAMPLE\n")
+
+
+def import_once(PyRDPConnect, paths, trace_memory):
+    config_dir = tempfile.mkdtemp(prefix="pyrdpconnect-import-config-")
+    try:
+        importer = PyRDPConnect.ConnectionImporter(config_dir)
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        stats = importer.run(paths)
+        elapsed = time.perf_counter() - started
+        if trace_memory:
+            stats["peak_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024)
+            tracemalloc.stop()
+    finally:
+        shutil.rmtree(config_dir, ignore_errors=True)
+    return stats, elapsed
+
+
+def run(PyRDPConnect, directory, inputs):
+
+    # Time without tracemalloc, which slows allocations down, then trace the peak memory separately
+    paths = [os.path.join(directory, name) for name in inputs]
+    stats, elapsed = import_once(PyRDPConnect, paths, False)
+    peak = import_once(PyRDPConnect, paths, True)[0]["peak_kb"]
+    return dict(stats, seconds=round(elapsed, 2), per_second=round(stats["connections"] / elapsed), peak_kb=peak)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=10000, help=".rdp files to generate")
+    parser.add_argument("--rows", type=int, default=100000, help="Servers in the RDCMan file and rows in the CSV")
+    parser.add_argument("--duplicates", type=float, default=0.1, help="Share of repeated connections")
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "src"))
+    import PyRDPConnect
+
+    directory = tempfile.mkdtemp(prefix="pyrdpconnect-import-")
+    try:
+        generate(directory, args.files, args.rows, args.duplicates)
+        result = {
+            "rdp": run(PyRDPConnect, directory, ["rdp"]),
+            "rdg": run(PyRDPConnect, directory, ["servers.rdg"]),
+            "csv": run(PyRDPConnect, directory, ["servers.csv"]),
+        }
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(json.dumps(result, indent=4))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=4)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
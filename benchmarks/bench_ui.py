@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Offscreen benchmarks for the PyRDPConnect UI and command generation hot paths.
+
+The client runs from a temporary copy of src/ so benchmarks never touch the
+local configuration. Results are compared with a JSON baseline, and the run
+fails when a metric exceeds its baseline by more than the regression threshold.
+
+    python3 benchmarks/bench_ui.py                    # compare with the baseline
+    python3 benchmarks/bench_ui.py --update-baseline  # record a new baseline
+"""
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import statistics
+import tracemalloc
+import argparse
+import tempfile
+import shutil
+import json
+import time
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baselines", "bench_ui.json")
+
+# Allowed growth over the baseline before a metric counts as a regression
+DEFAULT_THRESHOLDS = {
+    "wall_ms": 1.5,
+    "alloc_kb": 1.25,
+    "widgets": 1.0,
+}
+
+FREERDP_VERSIONS = [None, "2.11.2", "3.5.1"]
+
+COMMAND_CONFIGS = {
+    "minimal": {
+        "General": {"Server Address": "rds.example.com", "Username": "user", "Password": "secret"},
+    },
+    "full": {
+        "General": {"Server Address": "rds.example.com", "Username": "user", "Password": "secret", "Domain": "EXAMPLE"},
+        "Display": {"Use all monitors": True, "Start session in fullscreen": True, "Fit session to window": True},
+        "Audio": {"Play sound": "On this computer", "Record sound": "On this computer"},
+        "Devices": {"Printers": True, "Drives": True},
+        "Experience": {
+            "Clipboard": True, "Codec": "RemoteFX", "Smooth Fonts": True, "Desktop Composition": True,
+            "Full Window Drag": True, "Menu Animations": True, "Disable Themes": True, "Disable Wallpaper": True,
+        },
+    },
+}
+
+
+def prepare_root():
+
+    # Copy the application sources into a throwaway root directory
+    root = tempfile.mkdtemp(prefix="pyrdpconnect-bench-")
+    shutil.copytree(
+        os.path.join(ROOT_DIR, "src"),
+        os.path.join(root, "src"),
+        ignore=shutil.ignore_patterns("plymouth", "extra", "__pycache__")
+    )
+    return root
+
+
+def make_logo(path, size):
+
+    # Write a noisy PNG so the encoder cannot compress it away
+    from PyQt5.QtGui import QImage
+    image = QImage(os.urandom(size * size * 4), size, size, QImage.Format_RGB32)
+    image.save(path, "PNG")
+    return path
+
+
+class FakeFileDialog:
+
+    """
+    Stand-in for QFileDialog that returns a preset file instead of blocking.
+    """
+
+    selected = None
+
+    AcceptOpen = AcceptSave = ExistingFile = Directory = 0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+    def exec_(self):
+        return 1
+
+    def selectedFiles(self):
+        return [FakeFileDialog.selected]
+
+
+class FakeMessageBox:
+
+    """
+    Stand-in for QMessageBox that never opens a modal dialog.
+    """
+
+    Yes = No = 0
+
+    @staticmethod
+    def information(*args, **kwargs):
+        return 0
+
+    critical = question = warning = information
+
+
+def measure(name, func, iterations, setup=None):
+
+    """
+    Run func repeatedly and return wall time, allocation and widget metrics.
+    """
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QCoreApplication, QEvent
+    from load_connect import percentile
+
+    def settle():
+        # Process deferred deletions so widget counts reflect live objects
+        QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+        QApplication.processEvents()
+
+    timings = []
+    for _ in range(iterations):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        func(state)
+        timings.append((time.perf_counter() - start) * 1000)
+        settle()
+
+    # Separate traced run, tracemalloc slows the code down too much for timing
+    state = setup() if setup else None
+    tracemalloc.start()
+    func(state)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    settle()
+
+    return {
+        "wall_ms": round(statistics.median(timings), 3),
+        "wall_p95_ms": percentile(timings, 0.95),
+        "alloc_kb": round(peak / 1024, 1),
+        "retained_kb": round(current / 1024, 1),
+        "widgets": len(QApplication.allWidgets()),
+    }
+
+
+def run(iterations, logo_size):
+    from PyQt5.QtWidgets import QApplication
+
+    root = prepare_root()
+    sys.path.insert(0, os.path.join(root, "src"))
+    app = QApplication.instance() or QApplication([])
+
+    import PyRDPConnect
+    PyRDPConnect.QFileDialog = FakeFileDialog
+    PyRDPConnect.QMessageBox = FakeMessageBox
+
+    results = {}
+    try:
+        results["client_construction"] = measure(
+            "client_construction", lambda _: PyRDPConnect.Client().close(), iterations)
+
+        client = PyRDPConnect.Client()
+
+        results["reset_ui"] = measure("reset_ui", lambda _: client.reset_ui(), iterations)
+
+        def open_close(_):
+            client.launch_configurations()
+            client.configurations_dialog.hide()
+        results["launch_configurations"] = measure("launch_configurations", open_close, iterations)
+
+        def save(_):
+            client.launch_configurations()
+            client.save_config()
+        results["save_config"] = measure("save_config", save, iterations)
+
+        # Import and export with a large custom logo
+        logo = make_logo(os.path.join(root, "large-logo.png"), logo_size)
+        export_file = os.path.join(root, "export.json")
+
+        def export_settings(_):
+            client.config["Appearance"]["Logo File"] = logo
+            FakeFileDialog.selected = export_file
+            client.export_settings()
+        results["export_settings"] = measure("export_settings", export_settings, iterations)
+
+        def import_settings(_):
+            FakeFileDialog.selected = export_file
+            client.launch_configurations()
+            client.import_settings()
+            client.configurations_dialog.hide()
+        results["import_settings"] = measure("import_settings", import_settings, iterations)
+
+        # Command generation across configurations and FreeRDP versions
+        freerdp_path = client.get_freerdp_path()
+        for config_name, overrides in COMMAND_CONFIGS.items():
+            for version in FREERDP_VERSIONS:
+                def setup(overrides=overrides, version=version):
+                    client.load_config()
+                    for category, values in overrides.items():
+                        client.config[category].update(values)
+                    client.freerdp_versions[freerdp_path] = version
+
+                name = f"gen_command[{config_name}-{version or 'unknown'}]"
+                results[name] = measure(name, lambda _: client.gen_command(), iterations * 10, setup)
+
+        client.close()
+    finally:
+        app.processEvents()
+        shutil.rmtree(root, ignore_errors=True)
+
+    return results
+
+
+def compare(results, baseline):
+
+    """
+    Return a list of regressions against the baseline.
+    """
+    thresholds = dict(DEFAULT_THRESHOLDS, **baseline.get("thresholds", {}))
+    regressions = []
+    for name, metrics in results.items():
+        reference = baseline.get("cases", {}).get(name)
+        if not reference:
+            continue
+        for metric, factor in thresholds.items():
+            if metric in reference and metrics[metric] > reference[metric] * factor:
+                regressions.append(f"{name}: {metric} {metrics[metric]} > {reference[metric]} x {factor}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=10, help="Timed iterations per case")
+    parser.add_argument("--logo-size", type=int, default=1600, help="Edge length of the generated logo in pixels")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args.iterations, args.logo_size)
+
+    # Print a short report
+    print(f"{'case':<40} {'wall ms':>10} {'p95 ms':>10} {'alloc kB':>10} {'widgets':>8}")
+    for name, metrics in results.items():
+        print(f"{name:<40} {metrics['wall_ms']:>10} {metrics['wall_p95_ms']:>10} {metrics['alloc_kb']:>10} {metrics['widgets']:>8}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({"thresholds": DEFAULT_THRESHOLDS, "cases": results}, f, indent=4)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found, run with --update-baseline to record one.")
+        return 0
+
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f))
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
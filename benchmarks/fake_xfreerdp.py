@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Scriptable stand-in for xfreerdp used by the benchmarks and load harness.
+
+Point the client at it with:
+
+    PYRDPCONNECT_FREERDP=benchmarks/fake_xfreerdp.py python3 src/PyRDPConnect.py
+
+The behaviour is taken from environment variables and can be overridden per
+connection through the labels of the server address given with /v:, so a
+single binary can serve a mix of scenarios:
+
+    ok.fake                  connect, stay connected for the session time, exit 0
+    fail.fake                print connect-phase lines and an error, exit non-zero
+    hang.fake                hang before the session is established
+    hangsession.fake         connect and stay connected until terminated
+    ok.delay250.fake         take 250ms to establish the session
+    ok.session100.lines5000  exit after 100ms of session, printing 5000 extra lines
+    fail.exit131.fake        fail with exit status 131
+
+Environment variables provide the defaults:
+
+    FAKE_FREERDP_VERSION     version reported by +version (default 3.5.1)
+    FAKE_FREERDP_MODE        ok, fail, hang or hangsession (default ok)
+    FAKE_FREERDP_DELAY       milliseconds until established (default 50)
+    FAKE_FREERDP_SESSION     milliseconds of session before exiting (default 100)
+    FAKE_FREERDP_LINES       extra output lines printed during the session (default 0)
+    FAKE_FREERDP_EXIT        exit status used by the fail mode (default 1)
+    FAKE_FREERDP_JITTER      random variation of the delays as a fraction (default 0)
+    FAKE_FREERDP_ARGS_LOG    append the received argument list as JSON to this file
+    FAKE_FREERDP_MONITORS    monitors listed by /monitor-list, as WxH+X+Y separated by
+                             commas (default 1920x1080+0+0)
+"""
+import random
+import json
+import time
+import sys
+import os
+
+MODES = ("ok", "fail", "hang", "hangsession")
+
+
+def log(level, tag, message):
+    stamp = time.strftime("%H:%M:%S")
+    print(f"[{stamp}:000] [{os.getpid()}:{os.getpid()}] [{level}][com.freerdp.{tag}] - {message}", flush=True)
+
+
+def settings():
+
+    # Defaults from the environment
+    values = {
+        "mode": os.environ.get("FAKE_FREERDP_MODE", "ok"),
+        "delay": float(os.environ.get("FAKE_FREERDP_DELAY", 50)),
+        "session": float(os.environ.get("FAKE_FREERDP_SESSION", 100)),
+        "lines": int(os.environ.get("FAKE_FREERDP_LINES", 0)),
+        "exit": int(os.environ.get("FAKE_FREERDP_EXIT", 1)),
+        "jitter": float(os.environ.get("FAKE_FREERDP_JITTER", 0)),
+    }
+
+    # Per connection overrides from the server address labels
+    for arg in sys.argv[1:]:
+        if arg.startswith("/v:"):
+            host = arg[3:].rsplit(":", 1)[0]
+            for label in host.split("."):
+                if label in MODES:
+                    values["mode"] = label
+                    continue
+                for key in ("delay", "session", "lines", "exit"):
+                    if label.startswith(key) and label[len(key):].isdigit():
+                        values[key] = type(values[key])(label[len(key):])
+    return values
+
+
+def sleep_ms(milliseconds, jitter):
+    if jitter:
+        milliseconds *= random.uniform(1 - jitter, 1 + jitter)
+    time.sleep(max(milliseconds, 0) / 1000)
+
+
+def main():
+    args = sys.argv[1:]
+
+    if os.environ.get("FAKE_FREERDP_ARGS_LOG"):
+        with open(os.environ["FAKE_FREERDP_ARGS_LOG"], "a") as f:
+            f.write(json.dumps(args) + "\n")
+
+    # Version output in the format printed by FreeRDP
+    if "+version" in args or "/version" in args:
+        version = os.environ.get("FAKE_FREERDP_VERSION", "3.5.1")
+        print(f"This is FreeRDP version {version} (fake)")
+        return 0
+
+    # Monitor list in the format printed by FreeRDP, the first monitor is the primary one
+    if "/monitor-list" in args:
+        for index, monitor in enumerate(os.environ.get("FAKE_FREERDP_MONITORS", "1920x1080+0+0").split(",")):
+            size, x, y = monitor.split("+")
+            print(f"      {'*' if index == 0 else ' '} [{index}] {size}\t+{x}+{y}")
+        return 0
+
+    values = settings()
+
+    # Connect phase
+    log("INFO", "client.common.cmdline", "loading channelEx rdpdr")
+    log("INFO", "client.common.cmdline", "loading channelEx rdpsnd")
+    log("INFO", "client.common.cmdline", "loading channelEx cliprdr")
+    sleep_ms(values["delay"] / 2, values["jitter"])
+
+    if values["mode"] == "hang":
+        while True:
+            time.sleep(3600)
+
+    if values["mode"] == "fail":
+        log("ERROR", "core", "transport_connect_tls:freerdp_set_last_error_ex ERRCONNECT_TLS_CONNECT_FAILED [0x00020008]")
+        log("ERROR", "core", "freerdp_connect:freerdp_set_last_error_ex ERRCONNECT_CONNECT_TRANSPORT_FAILED [0x0002000D]")
+        return values["exit"]
+
+    log("INFO", "crypto", "TLS connection established")
+    log("INFO", "core.nla", "NLA authentication succeeded")
+    sleep_ms(values["delay"] / 2, values["jitter"])
+
+    # Session established
+    log("INFO", "gdi", "Local framebuffer format  PIXEL_FORMAT_BGRX32")
+    log("INFO", "gdi", "Remote framebuffer format PIXEL_FORMAT_BGRA32")
+    log("INFO", "channels.drdynvc.client", "Loading Dynamic Virtual Channel rdpgfx")
+
+    for index in range(values["lines"]):
+        log("DEBUG", "channels.rdpgfx.client", f"RecvSurfaceCommand frame {index}")
+
+    if values["mode"] == "hangsession":
+        while True:
+            time.sleep(3600)
+
+    sleep_ms(values["session"], values["jitter"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+End-to-end connect-latency load harness driven by the fake FreeRDP binary.
+
+Runs thousands of connect, cancel and fail cycles through ConnectionThread in
+parallel, then a number of sequential cycles through the full Client, and
+reports time-to-established and cancel latency percentiles together with
+leaked threads, file descriptors and RSS growth.
+
+    python3 benchmarks/load_connect.py --cycles 2000 --parallel 16 --client-cycles 100
+"""
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import random
+import shutil
+import json
+import time
+import gc
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FAKE_FREERDP = os.path.join(BENCH_DIR, "fake_xfreerdp.py")
+
+# Server address used by the fake binary for each scenario
+SCENARIO_HOSTS = {
+    "ok": "ok.fake",
+    "cancel": "hangsession.fake",
+    "fail": "fail.fake",
+}
+
+# Expected terminal signal of each scenario
+SCENARIO_OUTCOMES = {
+    "ok": "success",
+    "cancel": "cancelled",
+    "fail": "failed",
+}
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return round(ordered[index], 2)
+
+
+def summarize(values):
+    return {
+        "count": len(values),
+        "p50": percentile(values, 0.50),
+        "p95": percentile(values, 0.95),
+        "p99": percentile(values, 0.99),
+    }
+
+
+def resources():
+
+    """
+    Sample the process resources relevant for leak detection.
+    """
+    import threading
+
+    # A QThread that logged stays registered as a dummy thread after it exits, os_threads counts it while it runs
+    sample = {"python_threads": sum(1 for thread in threading.enumerate() if not isinstance(thread, threading._DummyThread))}
+    if os.path.isdir("/proc/self"):
+        sample["os_threads"] = len(os.listdir("/proc/self/task"))
+        sample["fds"] = len(os.listdir("/proc/self/fd"))
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    sample["rss_kb"] = int(line.split()[1])
+    return sample
+
+
+def settle(app):
+    from PyQt5.QtCore import QCoreApplication, QEvent
+    for _ in range(3):
+        QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+        app.processEvents()
+        gc.collect()
+
+
+def choose_scenarios(count, mix, seed):
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    return [rng.choices(names, weights)[0] for _ in range(count)]
+
+
+def run_threads(app, PyRDPConnect, scenarios, parallel):
+
+    """
+    Drive ConnectionThread directly with up to `parallel` concurrent attempts.
+    """
+    from PyQt5.QtCore import QEventLoop
+
+    pending = list(scenarios)
+    active = set()
+    records = []
+    loop = QEventLoop()
+
+    def start_next():
+        if not pending:
+            if not active:
+                loop.quit()
+            return
+        scenario = pending.pop()
+        command = [FAKE_FREERDP, f"/v:{SCENARIO_HOSTS[scenario]}:3389"]
+        thread = PyRDPConnect.ConnectionThread(command)
+        record = {"scenario": scenario, "start": time.perf_counter(), "outcome": "cancelled"}
+
+        def established():
+            record["established"] = time.perf_counter()
+            if scenario == "cancel":
+                record["cancel"] = time.perf_counter()
+                thread.stop()
+
+        def finished():
+            record["end"] = time.perf_counter()
+            records.append(record)
+            active.discard(thread)
+            thread.deleteLater()
+            start_next()
+
+        thread.connection_established.connect(established)
+        thread.connection_success.connect(lambda: record.update(outcome="success"))
+        thread.connection_failed.connect(lambda message: record.update(outcome="failed"))
+        thread.finished.connect(finished)
+        active.add(thread)
+        thread.start()
+
+    for _ in range(min(parallel, len(pending))):
+        start_next()
+    if active:
+        loop.exec_()
+    return records
+
+
+def run_client(app, PyRDPConnect, scenarios):
+
+    """
+    Drive sequential connection attempts through the full Client.
+    """
+    from PyQt5.QtCore import QEventLoop, QTimer
+    from bench_ui import FakeMessageBox
+
+    PyRDPConnect.QMessageBox = FakeMessageBox
+    records = []
+    loop = QEventLoop()
+    pending = list(scenarios)
+
+    class HarnessClient(PyRDPConnect.Client):
+
+        def start_next(self):
+            if not pending:
+                loop.quit()
+                return
+            scenario = pending.pop()
+            self.record = {"scenario": scenario, "start": time.perf_counter(), "outcome": "cancelled"}
+            self.config["General"]["Server Address"] = SCENARIO_HOSTS[scenario]
+            self.config["General"]["Username"] = "user"
+            self.config["General"]["Password"] = "secret"
+            self.connect_to_server()
+
+        def finish(self, outcome):
+            self.record["outcome"] = outcome
+            self.record["end"] = time.perf_counter()
+            records.append(self.record)
+            QTimer.singleShot(0, self.start_next)
+
+        def on_connection_established(self):
+            super().on_connection_established()
+            self.record["established"] = time.perf_counter()
+            if self.record["scenario"] == "cancel":
+                self.record["cancel"] = time.perf_counter()
+                self.connection_timeout()
+                self.finish("cancelled")
+
+        def on_connection_success(self):
+            super().on_connection_success()
+            self.finish("success")
+
+        def on_connection_failed(self, error_message):
+            super().on_connection_failed(error_message)
+            self.finish("failed")
+
+    client = HarnessClient()
+    QTimer.singleShot(0, client.start_next)
+    loop.exec_()
+    client.close()
+    client.deleteLater()
+    return records
+
+
+def report(records):
+    established = [(r["established"] - r["start"]) * 1000 for r in records if "established" in r]
+    cancel = [(r["end"] - r["cancel"]) * 1000 for r in records if "cancel" in r]
+    failed = [(r["end"] - r["start"]) * 1000 for r in records if r["scenario"] == "fail"]
+    unexpected = [r for r in records if r["outcome"] != SCENARIO_OUTCOMES[r["scenario"]]]
+    return {
+        "cycles": len(records),
+        "time_to_established_ms": summarize(established),
+        "cancel_latency_ms": summarize(cancel),
+        "time_to_failure_ms": summarize(failed),
+        "unexpected_outcomes": len(unexpected),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=1000, help="ConnectionThread cycles")
+    parser.add_argument("--parallel", type=int, default=16, help="Concurrent ConnectionThread cycles")
+    parser.add_argument("--client-cycles", type=int, default=50, help="Sequential cycles through Client")
+    parser.add_argument("--mix", default="ok=0.6,cancel=0.3,fail=0.1", help="Scenario weights")
+    parser.add_argument("--delay", type=int, default=50, help="Fake connect delay in milliseconds")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the scenario mix")
+    parser.add_argument("--max-leaked-threads", type=int, default=0)
+    parser.add_argument("--max-leaked-fds", type=int, default=0)
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    args = parser.parse_args()
+
+    mix = {name: float(weight) for name, weight in (item.split("=") for item in args.mix.split(","))}
+    os.environ["PYRDPCONNECT_FREERDP"] = FAKE_FREERDP
+    os.environ.setdefault("FAKE_FREERDP_DELAY", str(args.delay))
+
+    from PyQt5.QtWidgets import QApplication
+    from bench_ui import prepare_root
+
+    root = prepare_root()
+    sys.path.insert(0, BENCH_DIR)
+    sys.path.insert(0, os.path.join(root, "src"))
+    app = QApplication.instance() or QApplication([])
+    import PyRDPConnect
+
+    try:
+        # Warm up so lazily created resources do not count as leaks
+        run_threads(app, PyRDPConnect, ["ok", "cancel", "fail"], 3)
+        run_client(app, PyRDPConnect, ["ok", "cancel", "fail"])
+        settle(app)
+        before = resources()
+
+        started = time.perf_counter()
+        thread_records = run_threads(app, PyRDPConnect, choose_scenarios(args.cycles, mix, args.seed), args.parallel)
+        thread_elapsed = time.perf_counter() - started
+        settle(app)
+        after_threads = resources()
+
+        client_records = run_client(app, PyRDPConnect, choose_scenarios(args.client_cycles, mix, args.seed + 1))
+        settle(app)
+        after_client = resources()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    result = {
+        "connection_thread": dict(report(thread_records), cycles_per_second=round(len(thread_records) / thread_elapsed, 1)),
+        "client": report(client_records),
+        "resources": {"before": before, "after_threads": after_threads, "after_client": after_client},
+        "leaked": {key: after_client[key] - before[key] for key in before},
+    }
+    print(json.dumps(result, indent=4))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=4)
+
+    leaked = result["leaked"]
+    failures = result["connection_thread"]["unexpected_outcomes"] + result["client"]["unexpected_outcomes"]
+    if leaked.get("os_threads", leaked["python_threads"]) > args.max_leaked_threads:
+        failures += 1
+    if leaked.get("fds", 0) > args.max_leaked_fds:
+        failures += 1
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Soak test for long kiosk uptimes.
+
+Runs connect/reset cycles through the Client against the fake FreeRDP binary
+and asserts that the number of live QObjects and the RSS stay flat once the
+warm-up cycles are done.
+
+    python3 benchmarks/soak.py --cycles 10000
+"""
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import shutil
+import json
+import time
+import gc
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FAKE_FREERDP = os.path.join(BENCH_DIR, "fake_xfreerdp.py")
+
+# Every tenth cycle fails and every tenth is cancelled, the rest connect normally
+CYCLE_HOSTS = ["ok.fake"] * 8 + ["fail.fake", "hangsession.fake"]
+
+
+def live_qobjects():
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QObject
+    count = 0
+    for widget in QApplication.topLevelWidgets():
+        count += 1 + len(widget.findChildren(QObject))
+    return count
+
+
+def sample():
+    from load_connect import resources
+    gc.collect()
+    return dict(resources(), qobjects=live_qobjects())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=10000, help="Connect/reset cycles")
+    parser.add_argument("--warmup", type=int, default=100, help="Cycles before the reference sample")
+    parser.add_argument("--sample-every", type=int, default=500, help="Cycles between progress samples")
+    parser.add_argument("--max-qobject-growth", type=int, default=0)
+    parser.add_argument("--max-rss-growth-kb", type=int, default=4096)
+    parser.add_argument("--output", help="Write the samples to this JSON file")
+    args = parser.parse_args()
+
+    os.environ["PYRDPCONNECT_FREERDP"] = FAKE_FREERDP
+    os.environ.setdefault("FAKE_FREERDP_DELAY", "0")
+    os.environ.setdefault("FAKE_FREERDP_SESSION", "0")
+    sys.path.insert(0, BENCH_DIR)
+
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QEventLoop, QEvent, QTimer
+    from bench_ui import prepare_root, FakeMessageBox
+
+    root = prepare_root()
+    sys.path.insert(0, os.path.join(root, "src"))
+    app = QApplication.instance() or QApplication([])
+    import PyRDPConnect
+    PyRDPConnect.QMessageBox = FakeMessageBox
+
+    loop = QEventLoop()
+    samples = []
+    state = {"cycle": 0, "reference": None, "started": time.perf_counter()}
+
+    class SoakClient(PyRDPConnect.Client):
+
+        def next_cycle(self):
+            # Flush deferred deletions like the event loop does between user actions
+            app.sendPostedEvents(None, QEvent.DeferredDelete)
+
+            cycle = state["cycle"]
+            if cycle == args.warmup:
+                state["reference"] = sample()
+            if cycle and cycle % args.sample_every == 0:
+                current = dict(sample(), cycle=cycle, elapsed=round(time.perf_counter() - state["started"], 1))
+                samples.append(current)
+                print(json.dumps(current), flush=True)
+            if cycle >= args.cycles:
+                loop.quit()
+                return
+
+            state["cycle"] += 1
+            self.config["General"]["Server Address"] = CYCLE_HOSTS[cycle % len(CYCLE_HOSTS)]
+            self.config["General"]["Username"] = "user"
+            self.config["General"]["Password"] = "secret"
+            self.connect_to_server()
+
+        def on_connection_established(self):
+            super().on_connection_established()
+            if self.config["General"]["Server Address"].startswith("hangsession"):
+                self.connection_timeout()
+                QTimer.singleShot(0, self.next_cycle)
+
+        def on_connection_success(self):
+            super().on_connection_success()
+            QTimer.singleShot(0, self.next_cycle)
+
+        def on_connection_failed(self, error_message):
+            super().on_connection_failed(error_message)
+            QTimer.singleShot(0, self.next_cycle)
+
+    try:
+        client = SoakClient()
+        QTimer.singleShot(0, client.next_cycle)
+        loop.exec_()
+        app.sendPostedEvents(None, QEvent.DeferredDelete)
+        final = sample()
+        client.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    reference = state["reference"] or samples[0]
+    growth = {key: final[key] - reference[key] for key in final}
+    result = {"cycles": state["cycle"], "reference": reference, "final": final, "growth": growth, "samples": samples}
+    print(json.dumps({key: result[key] for key in ("cycles", "reference", "final", "growth")}, indent=4))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=4)
+
+    failures = []
+    if growth["qobjects"] > args.max_qobject_growth:
+        failures.append(f"live QObjects grew by {growth['qobjects']}")
+    if growth.get("rss_kb", 0) > args.max_rss_growth_kb:
+        failures.append(f"RSS grew by {growth['rss_kb']} kB")
+    if growth.get("fds", 0) > 0:
+        failures.append(f"{growth['fds']} file descriptors leaked")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -51,6 +51,10 @@ log "Installing required packages..."
 pip install pyinstaller sip importlib PySide6-Addons
 pip install pyqt5 --config-settings --confirm-license= --verbose
 
+# Generate the asset manifest used by the resource index
+log "Generating the asset manifest..."
+python src/PyRDPConnect.py --build-manifest src
+
 # Check if the .spec file exists
 SPEC_FILE="$NAME.spec"
 ICON_FILE="src/icons/icon.icns"
@@ -85,13 +89,13 @@ if [ "$OS" == "macos" ]; then
     sed -i '' "s|icon=None|icon='$ICON_FILE'|g" $SPEC_FILE
     sed -i '' "/Analysis/s/(.*)/\0, hiddenimports=['PyQt5.QtSvg']/" $SPEC_FILE
     sed -i '' "/a.datas +=/a \\
-        datas=[('src/styles', 'styles'), ('src/icons', 'icons'), ('src/img', 'img'), ('src/freerdp/$OS/xfreerdp', 'xfreerdp')],
+        datas=[('src/styles', 'styles'), ('src/icons', 'icons'), ('src/img', 'img'), ('src/freerdp/$OS/xfreerdp', 'xfreerdp'), ('src/manifest.json', '.')],
     " $SPEC_FILE
 elif [ "$OS" == "linux" ]; then
     sed -i "s|icon=None|icon='$ICON_FILE'|g" $SPEC_FILE
     sed -i "/Analysis/s/(.*)/\0, hiddenimports=['PyQt5.QtSvg']/" $SPEC_FILE
     sed -i "/a.datas +=/a \\
-        datas=[('src/styles', 'styles'), ('src/icons', 'icons'), ('src/img', 'img'), ('src/freerdp/$OS/xfreerdp', 'xfreerdp')],
+        datas=[('src/styles', 'styles'), ('src/icons', 'icons'), ('src/img', 'img'), ('src/freerdp/$OS/xfreerdp', 'xfreerdp'), ('src/manifest.json', '.')],
     " $SPEC_FILE
 fi
 
@@ -111,6 +115,7 @@ if [ "$OS" == "macos" ]; then
     cp -R src/styles/* "$APP_BUNDLE/styles/"
     cp -R src/img/* "$APP_BUNDLE/img/"
     cp -R src/icons/* "$APP_BUNDLE/icons/"
+    cp src/manifest.json "$APP_BUNDLE/"
 
     log "Copying FreeRDP binary into the app bundle..."
     mkdir -p "$APP_BUNDLE/freerdp/$OS"
@@ -1,68 +1,2789 @@
 #!/usr/bin/env python3
 from PyQt5.QtWidgets import (
     QApplication, QProgressDialog, QMessageBox, QDialog, QMainWindow,
-    QDesktopWidget, QWidget, QTabWidget, QCheckBox, QFrame, QSizePolicy,
+    QWidget, QTabWidget, QCheckBox, QSizePolicy,
     QHBoxLayout, QVBoxLayout, QPushButton, QLabel, QLineEdit, QFormLayout,
-    QGroupBox, QGridLayout, QComboBox, QSpinBox, QFileDialog
+    QGridLayout, QComboBox, QSpinBox, QFileDialog, QCompleter
 )
-from PyQt5.QtGui import QIcon, QPixmap, QPainter, QPalette, QColor
+from PyQt5.QtGui import QIcon, QPixmap, QPainter, QPalette, QColor, QImage
 from PyQt5.QtSvg import QSvgRenderer
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QThread, QObject, QTimer, QSocketNotifier, QBuffer, QByteArray, QIODevice, pyqtSignal
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+import xml.etree.ElementTree as ElementTree
+import logging.handlers
+import urllib.request
+import urllib.parse
+import urllib.error
+import collections
+import asyncio
+import contextlib
+import errno
+import ctypes
+import argparse
+import logging
+import getpass
+import socket
+import struct
+import atexit
+import queue
 import subprocess
+import hashlib
+import random
+import copy
+import csv
+import threading
+import traceback
 import platform
 import shutil
 import base64
 import json
+import time
 import sys
 import os
 import re
 
+logger = logging.getLogger("PyRDPConnect")
+
+def get_script_dir():
+    if getattr(sys, 'frozen', False):
+        # we are running in a bundle
+        return os.path.dirname(sys.executable)
+    else:
+        # we are running in a normal Python environment
+        return os.path.dirname(os.path.abspath(__file__))
+
+# Command line options whose value is a secret, given as /p:value, /p=value or /p value
+SECRET_OPTIONS = ("p", "gp", "pth", "password", "gatewaypassword")
+SECRET_OPTION = re.compile(r"""^(["']?[/-]-?(?:%s)[:=])(.*?)(["']?)$""" % "|".join(SECRET_OPTIONS), re.IGNORECASE)
+SECRET_FLAG = re.compile(r"^[/-]-?(?:%s)$" % "|".join(SECRET_OPTIONS), re.IGNORECASE)
+
+def redact_command(command):
+
+    """
+    Return a copy of a command line with passwords and hashes masked, for logging.
+    """
+    redacted = []
+    for arg in command:
+        arg = str(arg)
+        if redacted and SECRET_FLAG.match(redacted[-1]):
+            arg = "********"
+        elif SECRET_OPTION.match(arg):
+            arg = SECRET_OPTION.sub(r"\1********\3", arg)
+        elif arg.lower().lstrip("\"'").startswith(("/gateway:", "/gw:")):
+            # Gateway credentials are passed as p:<password> inside the option
+            arg = re.sub(r'([:,](?:p|password|access-token)[:=])[^,"\']*', r'\1********', arg)
+        redacted.append(arg)
+    return redacted
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+
+    """
+    Queue handler that drops records instead of blocking when the queue is full.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class SessionFilter(logging.Filter):
+
+    """
+    Tags records with the session ID of the connection attempt in progress.
+    """
+
+    def __init__(self, manager):
+        super().__init__()
+        self.manager = manager
+
+    def filter(self, record):
+        if not hasattr(record, "session"):
+            record.session = self.manager.session_id or "-"
+        return True
+
+class SessionLogHandler(logging.Handler):
+
+    """
+    Writes the records of each session to logs/sessions/<session>.log, runs on the listener thread.
+    """
+
+    def __init__(self, log_dir, keep=50, max_open=8):
+        super().__init__()
+        self.log_dir = log_dir
+        self.keep = keep
+        self.max_open = max_open
+        self.streams = collections.OrderedDict()
+
+    def emit(self, record):
+        session = getattr(record, "session", "-")
+        if session == "-":
+            return
+        try:
+            stream = self.streams.get(session)
+            if stream is None:
+                os.makedirs(self.log_dir, exist_ok=True)
+                stream = open(os.path.join(self.log_dir, f"{session}.log"), "a", encoding="utf-8")
+                self.streams[session] = stream
+                self.prune()
+            stream.write(self.format(record) + "\n")
+            stream.flush()
+
+            # Close the file once the session has ended
+            if getattr(record, "session_end", False):
+                self.streams.pop(session).close()
+        except Exception:
+            self.handleError(record)
+
+    def prune(self):
+
+        # Close sessions that never ended
+        while len(self.streams) > self.max_open:
+            self.streams.popitem(last=False)[1].close()
+
+        # Keep only the most recent session files
+        files = [os.path.join(self.log_dir, name) for name in os.listdir(self.log_dir) if name.endswith(".log")]
+        files.sort(key=os.path.getmtime)
+        for path in files[:-self.keep]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def close(self):
+        for stream in self.streams.values():
+            stream.close()
+        self.streams.clear()
+        super().close()
+
+class LogManager:
+
+    """
+    Routes the application log through a queue to file handlers on a background thread.
+
+    Callers only format the record and put it on a bounded queue, so logging never
+    blocks the GUI thread on disk or a full journal. The main log in logs/ rotates by
+    size, and records of a connection attempt are also written to a per-session file.
+    """
+
+    _instance = None
+
+    @classmethod
+    def instance(cls, log_dir):
+        if cls._instance is None:
+            cls._instance = cls(log_dir)
+            cls._instance.start()
+            atexit.register(cls._instance.stop)
+        return cls._instance
+
+    def __init__(self, log_dir, max_bytes=1024 * 1024, backup_count=5, queue_size=10000):
+        self.log_dir = log_dir
+        self.session_id = None
+        self.running = False
+        self.queue = queue.Queue(queue_size)
+        self.formatter = logging.Formatter("%(asctime)s %(levelname)s [%(session)s] %(funcName)s: %(message)s")
+
+        # Console output for warnings, the files get everything
+        handlers = []
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.WARNING)
+        handlers.append(console_handler)
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+            handlers.append(logging.handlers.RotatingFileHandler(
+                os.path.join(log_dir, "PyRDPConnect.log"),
+                maxBytes=max_bytes,
+                backupCount=backup_count,
+                encoding="utf-8"
+            ))
+            handlers.append(SessionLogHandler(os.path.join(log_dir, "sessions")))
+            handlers.append(TraceFileHandler(os.path.join(log_dir, "trace.jsonl"), maxBytes=max_bytes, backupCount=1))
+        except OSError as e:
+            sys.stderr.write(f"Logging to the console only, cannot write to {log_dir}: {e}\n")
+        for handler in handlers:
+            if not isinstance(handler, TraceFileHandler):
+                handler.setFormatter(self.formatter)
+                handler.addFilter(lambda record: not hasattr(record, "trace"))
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers, respect_handler_level=True)
+
+        # Only the queue handler is attached to the logger
+        self.handler = DroppingQueueHandler(self.queue)
+        self.handler.addFilter(SessionFilter(self))
+
+    def start(self):
+        self.running = True
+
+        # Looking up the thread name registers a dummy thread for every QThread that logs, which is never released
+        logging.logThreads = False
+        logger.addHandler(self.handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        self.listener.start()
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        logger.removeHandler(self.handler)
+        try:
+            self.listener.stop()
+        except queue.Full:
+            pass
+        for handler in self.listener.handlers:
+            handler.close()
+
+    def set_level(self, level):
+        logger.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+
+    def write_trace(self, trace):
+
+        """
+        Queue a finished connection trace for logs/trace.jsonl, regardless of the log level.
+        """
+        record = logger.makeRecord(logger.name, logging.INFO, __file__, 0, "Connection trace %s", (trace["trace_id"],), None, extra={"trace": trace})
+        self.handler.handle(record)
+
+    def begin_session(self):
+
+        """
+        Start tagging records with a new session ID and return it.
+        """
+        self.session_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.urandom(3).hex()}"
+        return self.session_id
+
+    def end_session(self, message="Session ended"):
+        if self.session_id is not None:
+            logger.info(message, extra={"session": self.session_id, "session_end": True})
+        self.session_id = None
+
+class ConnectionTrace:
+
+    """
+    Timed spans of one connection attempt, written as one JSON line to logs/trace.jsonl.
+
+    Offsets and durations are in milliseconds from the start of the attempt. The
+    stages read from the FreeRDP output are milestones, each spanning from the
+    previous milestone, so together they add up to the time spent in FreeRDP.
+    """
+
+    # Stages in the order they happen during an attempt
+    phases = (
+        "config", "version", "dns", "tcp", "x224", "folders", "audio", "monitors", "gen_command",
+        "spawn", "first_output", "tls", "nla", "established", "exit"
+    )
+
+    def __init__(self, trace_id, server=None):
+        self.trace_id = trace_id
+        self.server = server
+        self.started = time.time()
+        self.origin = time.monotonic()
+        self.spans = {}
+        self.annotations = {}
+        self.last_milestone = None
+
+    def offset(self):
+        return (time.monotonic() - self.origin) * 1000
+
+    @contextlib.contextmanager
+    def span(self, name, **attributes):
+        start = self.offset()
+        try:
+            yield attributes
+        finally:
+            self.record(name, start, self.offset(), **attributes)
+
+    def record(self, name, start, end, **attributes):
+        self.spans[name] = dict(start=round(start, 1), duration=round(end - start, 1), **attributes)
+        self.last_milestone = end
+
+    def annotate(self, name, value):
+        self.annotations[name] = value
+
+    def milestone(self, name):
+        end = self.offset()
+        self.record(name, end if self.last_milestone is None else self.last_milestone, end)
+
+    def finish(self, outcome, error=None):
+        return {
+            "trace_id": self.trace_id,
+            "time": time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            "server": self.server,
+            "outcome": outcome,
+            "error": error,
+            "total": round(self.offset(), 1),
+            "spans": dict(self.spans),
+            **self.annotations,
+        }
+
+class TraceFileHandler(logging.handlers.RotatingFileHandler):
+
+    """
+    Writes the trace attached to a record as a JSON line, runs on the listener thread.
+    """
+
+    def __init__(self, filename, **kwargs):
+        super().__init__(filename, encoding="utf-8", **kwargs)
+        self.addFilter(lambda record: hasattr(record, "trace"))
+
+    def format(self, record):
+        return json.dumps(record.trace, sort_keys=True)
+
+def summarize_traces(path, count):
+
+    """
+    Return per-phase p50/p95 durations of the last count attempts in a trace log, as text.
+    """
+    lines = collections.deque(maxlen=count)
+    for name in (path + ".1", path):
+        if os.path.exists(name):
+            with open(name, encoding="utf-8") as f:
+                lines.extend(f)
+
+    traces = []
+    for line in lines:
+        try:
+            traces.append(json.loads(line))
+        except ValueError:
+            continue
+    if not traces:
+        return f"No connection attempts recorded in {path}"
+
+    def percentile(values, fraction):
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+    outcomes = collections.Counter(trace.get("outcome") for trace in traces)
+    summary = [
+        f"Last {len(traces)} attempts ({', '.join(f'{n} {outcome}' for outcome, n in outcomes.most_common())})",
+        f"{'phase':<14}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}",
+    ]
+    rows = [(phase, [trace["spans"][phase]["duration"] for trace in traces if phase in trace.get("spans", {})]) for phase in ConnectionTrace.phases]
+    rows.append(("total", [trace["total"] for trace in traces if "total" in trace]))
+    for phase, durations in rows:
+        if durations:
+            summary.append(f"{phase:<14}{len(durations):>7}{percentile(durations, 0.5):>10.0f}{percentile(durations, 0.95):>10.0f}")
+
+    # Sessions disconnected for inactivity, their seats were handed back to the session hosts
+    reclaimed = [trace["idle"] for trace in traces if trace.get("outcome") == "reclaimed" and "idle" in trace]
+    if reclaimed:
+        minutes = sum(idle["session_seconds"] for idle in reclaimed) / 60
+        summary.append(f"Reclaimed {len(reclaimed)} idle sessions after {minutes / len(reclaimed):.0f} min on average, {minutes:.0f} min in total")
+    return "\n".join(summary)
+
+# Security protocols of the RDP negotiation request, MS-RDPBCGR 2.2.1.1.1
+RDP_PROTOCOLS = {"rdp": 0x0, "tls": 0x1, "nla": 0x2, "rdstls": 0x4, "nla_ext": 0x8}
+
+# Failure codes of the RDP negotiation failure, MS-RDPBCGR 2.2.1.2.2
+RDP_NEG_FAILURES = {
+    1: "SSL_REQUIRED_BY_SERVER",
+    2: "SSL_NOT_ALLOWED_BY_SERVER",
+    3: "SSL_CERT_NOT_ON_SERVER",
+    4: "INCONSISTENT_FLAGS",
+    5: "HYBRID_REQUIRED_BY_SERVER",
+    6: "SSL_WITH_USER_AUTH_REQUIRED_BY_SERVER",
+}
+
+def build_x224_request(protocols=0x0F, cookie=None):
+
+    """
+    Return a TPKT framed X.224 Connection Request carrying an RDP negotiation request.
+    """
+    payload = b""
+    if cookie:
+        payload += f"Cookie: mstshash={cookie}\r\n".encode()
+    payload += struct.pack("<BBHI", 0x01, 0x00, 8, protocols)
+    x224 = struct.pack(">BBHHB", 6 + len(payload), 0xE0, 0, 0, 0) + payload
+    return struct.pack(">BBH", 3, 0, 4 + len(x224)) + x224
+
+def parse_x224_response(data):
+
+    """
+    Parse a TPKT framed X.224 Connection Confirm.
+
+    Returns {"status": "ok", "protocol": <selected>} when the server selected a protocol,
+    {"status": "failure", "failure": <name>} when it refused the request, or
+    {"status": "not_rdp"} when the data is not an RDP answer.
+    """
+    if len(data) < 11 or data[0] != 3 or data[5] & 0xF0 != 0xD0:
+        return {"status": "not_rdp"}
+    length = struct.unpack(">H", data[2:4])[0]
+    negotiation = data[11:min(length, 5 + data[4])]
+
+    # Servers without negotiation support only speak standard RDP security
+    if len(negotiation) < 8:
+        return {"status": "ok", "protocol": RDP_PROTOCOLS["rdp"], "flags": 0}
+    kind, flags, _, value = struct.unpack("<BBHI", negotiation[:8])
+    if kind == 0x02:
+        return {"status": "ok", "protocol": value, "flags": flags}
+    if kind == 0x03:
+        return {"status": "failure", "failure": RDP_NEG_FAILURES.get(value, f"UNKNOWN_{value}")}
+    return {"status": "not_rdp"}
+
+def negotiate_security(sock, cookie=None, protocols=0x0F):
+
+    """
+    Send the negotiation request on a connected socket and parse the answer in one round trip.
+
+    A server that accepts the connection but closes it or does not answer in time is
+    reported as {"status": "busy"}.
+    """
+    try:
+        sock.sendall(build_x224_request(protocols, cookie))
+        data = b""
+        length = 4
+        while len(data) < length:
+            chunk = sock.recv(length - len(data))
+            if not chunk:
+                break
+            data += chunk
+
+            # Read the rest of the TPKT once its length is known
+            if len(data) == 4 and length == 4:
+                if data[0] != 3:
+                    return {"status": "not_rdp"}
+                length = struct.unpack(">H", data[2:4])[0]
+                if not 11 <= length <= 512:
+                    return {"status": "not_rdp"}
+    except OSError as e:
+        return {"status": "busy", "error": str(e) or "Timed out"}
+    if not data:
+        return {"status": "busy", "error": "Connection closed by the server"}
+    return parse_x224_response(data)
+
+def security_flags(preflight):
+
+    """
+    Return the FreeRDP /sec: option matching the outcome of a negotiation preflight.
+    """
+    security = None
+    if preflight and preflight.get("status") == "ok":
+        # RDSTLS runs over TLS
+        security = {0x0: "rdp", 0x1: "tls", 0x2: "nla", 0x4: "tls", 0x8: "nla"}.get(preflight["protocol"])
+        if security is None:
+            logger.info("No /sec: option for the selected protocol 0x%x, FreeRDP negotiates it", preflight["protocol"])
+    elif preflight and preflight.get("status") == "failure":
+        security = {
+            "SSL_REQUIRED_BY_SERVER": "tls",
+            "SSL_NOT_ALLOWED_BY_SERVER": "rdp",
+            "HYBRID_REQUIRED_BY_SERVER": "nla",
+        }.get(preflight["failure"])
+    return [f"/sec:{security}"] if security else []
+
+class JobCancelled(Exception):
+    pass
+
+class JobThread(QThread):
+    job_progress = pyqtSignal(str)
+    job_result = pyqtSignal(object)
+    job_failed = pyqtSignal(str)
+
+    def __init__(self, target, *args, parent=None):
+        super().__init__(parent)
+        self.target = target
+        self.args = args
+        self.cancelled = False
+        self.process = None
+
+    def run(self):
+        try:
+            # Run the target callable with this job as the first argument
+            result = self.target(self, *self.args)
+            if not self.cancelled:
+                self.job_result.emit(result)
+        except JobCancelled:
+            pass
+        except Exception as e:
+            # Emit failed signal with error message if any exception occurs
+            if not self.cancelled:
+                self.job_failed.emit(str(e))
+
+    def cancel(self):
+        # Flag the job as cancelled and terminate its subprocess if running
+        self.cancelled = True
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled()
+
+    def run_command(self, command, cwd=None, timeout=None, check=False):
+
+        """
+        Run an external command from within the job, reporting each output line as progress.
+
+        :param command: Argument list of the command to run
+        :param cwd: Working directory of the command
+        :param timeout: Seconds after which the command is terminated
+        :param check: Raise CalledProcessError on a non-zero exit status
+        :return: subprocess.CompletedProcess with the captured output
+        """
+        self.check_cancelled()
+        self.process = subprocess.Popen(
+            command,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=subprocess.DEVNULL,
+            text=True
+        )
+
+        # Terminate the command once the timeout expires
+        timer = None
+        if timeout:
+            timer = threading.Timer(timeout, self.process.kill)
+            timer.daemon = True
+            timer.start()
+
+        # Drain stderr in a helper thread so neither pipe can fill up
+        stderr_lines = []
+        stderr_reader = threading.Thread(target=lambda: stderr_lines.extend(self.process.stderr), daemon=True)
+        stderr_reader.start()
+
+        stdout_lines = []
+        for line in self.process.stdout:
+            stdout_lines.append(line)
+            self.job_progress.emit(line.rstrip())
+
+        returncode = self.process.wait()
+        stderr_reader.join()
+        if timer:
+            timer.cancel()
+        self.check_cancelled()
+
+        result = subprocess.CompletedProcess(command, returncode, "".join(stdout_lines), "".join(stderr_lines))
+        if check:
+            result.check_returncode()
+        return result
+
+class JobRunner(QObject):
+
+    """
+    Runs blocking work on background threads and reports back on the GUI thread.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.jobs = set()
+
+    def run(self, target, *args, on_result=None, on_failed=None, on_progress=None):
+
+        """
+        Run a callable in a background thread.
+
+        :param target: Callable receiving the JobThread followed by args
+        :param on_result: Slot receiving the return value
+        :param on_failed: Slot receiving the error message
+        :param on_progress: Slot receiving progress messages
+        :return: The started JobThread
+        """
+        job = JobThread(target, *args)
+        if on_result:
+            job.job_result.connect(on_result)
+        if on_failed:
+            job.job_failed.connect(on_failed)
+        if on_progress:
+            job.job_progress.connect(on_progress)
+        job.finished.connect(lambda: self.release(job))
+        self.jobs.add(job)
+        job.start()
+        return job
+
+    def run_command(self, command, cwd=None, timeout=None, check=False, parse=None, **slots):
+
+        """
+        Run an external command in a background thread.
+
+        :param parse: Optional callable run in the worker on the CompletedProcess
+        """
+        def target(job):
+            result = job.run_command(command, cwd=cwd, timeout=timeout, check=check)
+            return parse(result) if parse else result
+        return self.run(target, **slots)
+
+    def release(self, job):
+        self.jobs.discard(job)
+        job.deleteLater()
+
+    def cancel_all(self):
+        for job in list(self.jobs):
+            job.cancel()
+        for job in list(self.jobs):
+            job.wait()
+
+class StallDetector(QObject):
+
+    """
+    Heartbeat timer on the GUI thread watched by a background thread.
+    Any event loop block longer than the threshold is reported with a stack sample of the main thread.
+    """
+
+    def __init__(self, threshold=0.25, interval=0.1, parent=None):
+        super().__init__(parent)
+        self.threshold = threshold
+        self.interval = interval
+        self.main_thread_id = threading.main_thread().ident
+        self.last_beat = time.monotonic()
+        self.stall_sample = None
+        self.stopped = threading.Event()
+        self.watchdog = None
+
+        # Heartbeat timer running in the event loop
+        self.timer = QTimer(self)
+        self.timer.setInterval(int(interval * 1000))
+        self.timer.timeout.connect(self.beat)
+
+    def start(self):
+        self.stopped.clear()
+        self.last_beat = time.monotonic()
+        self.timer.start()
+        self.watchdog = threading.Thread(target=self.watch, name="StallDetector", daemon=True)
+        self.watchdog.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.timer.stop()
+        if self.watchdog is not None:
+            self.watchdog.join()
+            self.watchdog = None
+
+    def beat(self):
+        now = time.monotonic()
+        blocked = now - self.last_beat - self.interval
+        self.last_beat = now
+
+        # Report the stall once the event loop is responsive again
+        if blocked > self.threshold:
+            sample = self.stall_sample or "(no stack sample captured)"
+            logger.warning("UI stall: event loop blocked for %.0fms\n%s", blocked * 1000, sample)
+        self.stall_sample = None
+
+    def watch(self):
+        while not self.stopped.wait(self.interval):
+
+            # Sample the main thread stack once per stall
+            if self.stall_sample is None and time.monotonic() - self.last_beat > self.threshold:
+                frame = sys._current_frames().get(self.main_thread_id)
+                if frame is not None:
+                    self.stall_sample = "".join(traceback.format_stack(frame))
+
+class HealthMonitor(QObject):
+
+    """
+    Probes RDP endpoints with a TCP connect from an asyncio loop on a daemon thread.
+
+    At most max_concurrency probes run at once. The interval of an endpoint doubles
+    while its reachability is stable and drops back to min_interval when it changes,
+    with jitter so a fleet of kiosks does not probe in step.
+    """
+
+    health_changed = pyqtSignal(str, object)
+
+    def __init__(self, timeout=3.0, min_interval=5.0, max_interval=300.0, max_down_interval=60.0, max_concurrency=4, parent=None):
+        super().__init__(parent)
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_down_interval = max_down_interval
+        self.max_concurrency = max_concurrency
+        self.loop = None
+        self.thread = None
+        self.ready = threading.Event()
+        self.tasks = {}
+
+    @staticmethod
+    def endpoint_key(host, port):
+        return f"{host}:{port}"
+
+    def start(self):
+        self.ready.clear()
+        self.thread = threading.Thread(target=self.run, name="HealthMonitor", daemon=True)
+        self.thread.start()
+        self.ready.wait()
+
+    def stop(self):
+        if self.thread is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.thread = None
+
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            # Cancel the probes and release the resolver threads
+            for task in self.tasks.values():
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*self.tasks.values(), return_exceptions=True))
+            self.tasks = {}
+            self.loop.run_until_complete(self.loop.shutdown_default_executor())
+            self.loop.close()
+
+    def set_endpoints(self, endpoints):
+
+        """
+        Replace the probed endpoints by a list of (host, port), can be called from any thread.
+        """
+        if self.thread is not None:
+            self.loop.call_soon_threadsafe(self.update_endpoints, list(endpoints))
+
+    def update_endpoints(self, endpoints):
+        keys = {self.endpoint_key(host, port): (host, port) for host, port in endpoints}
+        for key in list(self.tasks):
+            if key not in keys:
+                self.tasks.pop(key).cancel()
+        for key, (host, port) in keys.items():
+            if key not in self.tasks:
+                self.tasks[key] = self.loop.create_task(self.watch(key, host, port))
+
+    async def watch(self, key, host, port):
+        interval = self.min_interval
+        previous = None
+        while True:
+            result = await self.probe(host, port)
+            self.health_changed.emit(key, result)
+
+            # Back off while the state is stable, probe faster when it flaps
+            if result["reachable"] == previous:
+                interval = min(interval * 2, self.max_interval if previous else self.max_down_interval)
+            else:
+                interval = self.min_interval
+            previous = result["reachable"]
+            await asyncio.sleep(interval * random.uniform(0.9, 1.1))
+
+    async def probe(self, host, port):
+        async with self.semaphore:
+            try:
+                addresses = await asyncio.wait_for(self.loop.getaddrinfo(host, port, type=socket.SOCK_STREAM), self.timeout)
+                address = addresses[0][4]
+
+                # Time the TCP handshake only, the name resolution is not latency to the server
+                start = time.monotonic()
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(address[0], address[1]), self.timeout)
+                latency = (time.monotonic() - start) * 1000
+            except (OSError, asyncio.TimeoutError) as e:
+                return {"reachable": False, "latency": None, "error": str(e) or "Timed out"}
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+            return {"reachable": True, "latency": round(latency, 1)}
+
+class NetworkWatcher(QObject):
+
+    """
+    Reports network changes from rtnetlink link, address and default route events, Linux only.
+
+    The netlink socket is non-blocking and read from the Qt event loop through a
+    QSocketNotifier. Events are collected until the network has been quiet for
+    settle_ms, so a roam or a DHCP renewal is reported once.
+    """
+
+    network_changed = pyqtSignal(object)
+
+    # Multicast groups of rtnetlink
+    groups = 0x1 | 0x10 | 0x40 | 0x100 | 0x400  # LINK, IPV4_IFADDR, IPV4_ROUTE, IPV6_IFADDR, IPV6_ROUTE
+    IFF_RUNNING = 0x40
+    RT_TABLE_MAIN = 254
+
+    def __init__(self, settle_ms=1500, parent=None):
+        super().__init__(parent)
+        self.sock = None
+        self.notifier = None
+        self.events = []
+        self.settle_timer = QTimer(self)
+        self.settle_timer.setSingleShot(True)
+        self.settle_timer.setInterval(settle_ms)
+        self.settle_timer.timeout.connect(self.on_settled)
+
+    def start(self):
+        if self.sock is not None:
+            return True
+        try:
+            self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+            self.sock.bind((0, self.groups))
+            self.sock.setblocking(False)
+        except (OSError, AttributeError) as e:
+            logger.info("Network change detection is not available: %s", e)
+            self.stop()
+            return False
+        self.notifier = QSocketNotifier(self.sock.fileno(), QSocketNotifier.Read, self)
+        self.notifier.activated.connect(self.on_readable)
+        return True
+
+    def stop(self):
+        self.settle_timer.stop()
+        self.events = []
+        if self.notifier is not None:
+            self.notifier.setEnabled(False)
+            self.notifier.deleteLater()
+            self.notifier = None
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    @classmethod
+    def parse(cls, data):
+
+        """
+        Return the relevant events of a buffer of rtnetlink messages.
+        """
+        events = []
+        offset = 0
+        while offset + 16 <= len(data):
+            length, kind = struct.unpack_from("=LH", data, offset)
+            if length < 16:
+                break
+            body = offset + 16
+            if kind in (16, 17) and length >= 32:  # RTM_NEWLINK, RTM_DELLINK
+                _, _, index, flags, _ = struct.unpack_from("=BxHiII", data, body)
+                events.append({"type": "link", "index": index, "up": kind == 16 and bool(flags & cls.IFF_RUNNING)})
+            elif kind in (20, 21) and length >= 24:  # RTM_NEWADDR, RTM_DELADDR
+                family, _, _, scope, index = struct.unpack_from("=BBBBI", data, body)
+                if scope == 0:
+                    events.append({"type": "address", "index": index, "added": kind == 20, "ipv6": family == socket.AF_INET6})
+            elif kind in (24, 25) and length >= 28:  # RTM_NEWROUTE, RTM_DELROUTE
+                family, dst_len, _, _, table = struct.unpack_from("=BBBBB", data, body)
+                if dst_len == 0 and table == cls.RT_TABLE_MAIN:
+                    events.append({"type": "default route", "added": kind == 24, "ipv6": family == socket.AF_INET6})
+            offset += (length + 3) & ~3
+        return events
+
+    def on_readable(self):
+        while self.sock is not None:
+            try:
+                data = self.sock.recv(65536)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                if e.errno != errno.ENOBUFS:
+                    # A broken socket stays readable, reading it again would spin the event loop
+                    logger.warning("Network change detection stopped: %s", e)
+                    self.stop()
+                    break
+
+                # Events were lost while the receive buffer was full
+                self.events.append({"type": "overflow", "error": str(e)})
+                self.settle_timer.start()
+                continue
+            events = self.parse(data)
+            if events:
+                self.events.extend(events)
+                self.settle_timer.start()
+
+    def on_settled(self):
+        events, self.events = self.events, []
+        self.network_changed.emit(events)
+
+    @staticmethod
+    def route_source(address):
+
+        """
+        Return the local address used to reach an address, or None without a route.
+
+        Connecting a UDP socket selects the route without sending anything.
+        """
+        family = socket.AF_INET6 if ":" in address else socket.AF_INET
+        try:
+            with socket.socket(family, socket.SOCK_DGRAM) as sock:
+                sock.connect((address, 9))
+                return sock.getsockname()[0]
+        except OSError:
+            return None
+
+class PathValidator:
+
+    """
+    Checks folder paths concurrently with a hard per-path timeout.
+
+    Each path is checked on a daemon thread, so a hung network mount can never block
+    the caller or the interpreter exit. A path whose previous check is still hanging
+    is reported unreachable without starting another check. Results are cached for
+    a short time.
+    """
+
+    def __init__(self, timeout=2.0, ttl=30.0, max_pending=16):
+        self.timeout = timeout
+        self.ttl = ttl
+        self.max_pending = max_pending
+        self.cache = {}
+        self.pending = set()
+        self.lock = threading.Lock()
+
+    def check(self, path):
+        reachable = os.path.isdir(path) and os.access(path, os.R_OK)
+        with self.lock:
+            self.cache[path] = (time.monotonic(), reachable)
+            self.pending.discard(path)
+
+    def cached(self, path):
+
+        # Return the cached result or None when it expired
+        with self.lock:
+            entry = self.cache.get(path)
+        if entry and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def validate(self, paths):
+
+        """
+        Return a dictionary telling which of the paths are reachable.
+        """
+        results = {}
+        threads = []
+        for path in dict.fromkeys(paths):
+            cached = self.cached(path)
+            if cached is not None:
+                results[path] = cached
+                continue
+            with self.lock:
+                if path in self.pending or len(self.pending) >= self.max_pending:
+                    # A previous check of this mount is still hanging
+                    results[path] = False
+                    continue
+                self.pending.add(path)
+            thread = threading.Thread(target=self.check, args=(path,), name="PathValidator", daemon=True)
+            thread.start()
+            threads.append((path, thread))
+
+        # Wait for all checks against a single deadline
+        deadline = time.monotonic() + self.timeout
+        for path, thread in threads:
+            thread.join(max(0, deadline - time.monotonic()))
+            results[path] = bool(self.cached(path)) if not thread.is_alive() else False
+        return results
+
+    def is_reachable(self, path):
+        return bool(self.cached(path))
+
+class HardwareProfile:
+
+    """
+    CPU features, core count and decode speed of this machine, used to pick the session codec.
+
+    The profile is stored in config/hardware.json and measured again only when the
+    hardware fingerprint changes. The benchmark decodes a 720p PNG frame and converts
+    its colours with Qt, a stand-in for the work of the session decoder.
+    """
+
+    file_name = "hardware.json"
+    codecs = ("Automatic", "RemoteFX", "GFX Progressive", "AVC420", "AVC444", "Bitmap")
+
+    # CPU features that matter to the decoders, the other flags change with kernel updates
+    simd_flags = ("sse2", "ssse3", "sse4_1", "sse4_2", "avx", "avx2", "avx512f", "neon", "asimd")
+
+    @classmethod
+    def read_cpu(cls):
+        fields = {}
+        try:
+            with open("/proc/cpuinfo") as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    fields.setdefault(key.strip().lower(), value.strip())
+        except OSError:
+            pass
+
+        # x86 names the CPU in "model name", ARM boards in "Model" or "Hardware"
+        model = fields.get("model name")
+        if not model and not fields.get("model", "").isdigit():
+            model = fields.get("model")
+        flags = set(fields.get("flags", fields.get("features", "")).split())
+        return {
+            "arch": platform.machine(),
+            "model": model or fields.get("hardware") or platform.processor(),
+            "flags": [flag for flag in cls.simd_flags if flag in flags],
+            "cores": os.cpu_count() or 1,
+        }
+
+    @staticmethod
+    def fingerprint(cpu):
+        return hashlib.sha256(json.dumps([cpu["arch"], cpu["model"], cpu["flags"], cpu["cores"]]).encode()).hexdigest()[:16]
+
+    @staticmethod
+    def benchmark(duration=0.5, width=1280, height=720):
+
+        """
+        Return the frames per second of decoding and colour converting a 720p frame on one core.
+        """
+        # Encode a frame once, with rows of noise repeated like desktop content
+        raw = os.urandom(width * 3 * 8) * (height // 8)
+        frame = QImage(raw, width, height, width * 3, QImage.Format_RGB888).copy()
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.WriteOnly)
+        frame.save(buffer, "PNG")
+        encoded = bytes(data)
+
+        frames = 0
+        start = time.monotonic()
+        while frames < 3 or time.monotonic() - start < duration:
+            decoded = QImage.fromData(encoded, "PNG")
+            decoded.convertToFormat(QImage.Format_ARGB32_Premultiplied).convertToFormat(QImage.Format_RGB16)
+            frames += 1
+        return round(frames / (time.monotonic() - start), 1)
+
+    @classmethod
+    def measure(cls):
+        cpu = cls.read_cpu()
+        return dict(cpu, fingerprint=cls.fingerprint(cpu), fps=cls.benchmark(), measured=time.strftime('%Y-%m-%dT%H:%M:%S'))
+
+    @classmethod
+    def is_current(cls, profile):
+        return isinstance(profile, dict) and "fps" in profile and profile.get("fingerprint") == cls.fingerprint(cls.read_cpu())
+
+    @staticmethod
+    def choose_codec(profile):
+
+        """
+        Pick the most efficient codec the machine can decode in real time.
+        """
+        flags = set(profile.get("flags", []))
+        fps = profile.get("fps", 0)
+        cores = profile.get("cores", 1)
+        simd = bool(flags & {"sse2", "neon", "asimd"})
+        if fps >= 80 and cores >= 4 and flags & {"avx2", "asimd"}:
+            return "AVC444"
+        if fps >= 40 and cores >= 2:
+            return "AVC420"
+        if fps >= 15 and simd:
+            return "GFX Progressive"
+        if fps >= 6:
+            return "RemoteFX"
+        return "Bitmap"
+
+    @staticmethod
+    def codec_options(codec, major_version):
+
+        """
+        Return the FreeRDP options and colour depth of a codec.
+        """
+        if codec == "AVC444":
+            return ["/gfx:avc444", "/bpp:32"]
+        if codec == "AVC420":
+            return ["/gfx:avc420", "/bpp:32"]
+        if codec == "GFX Progressive":
+            if major_version and major_version < 3:
+                return ["/gfx", "/gfx-progressive", "/bpp:32"]
+            return ["/gfx:progressive", "/bpp:32"]
+        if codec == "RemoteFX":
+            return ["/rfx", "/bpp:32"]
+        if codec == "Bitmap":
+            return ["-gfx", "/bpp:16"]
+        return []
+
+class FreeRDPClients:
+
+    """
+    Discovery of the installed and bundled FreeRDP front-ends and choice of the one for this session.
+
+    xfreerdp renders through X11, so on Wayland it runs under XWayland with an extra copy
+    and composition per frame. sdl-freerdp and wlfreerdp draw on Wayland natively. The
+    capabilities are those of the upstream front-ends, probing each binary for its help
+    text would cost a process start per connect.
+    """
+
+    flavours = {
+        "xfreerdp": {
+            "names": ("xfreerdp3", "xfreerdp"),
+            "native": ("x11",),
+            "fallback": ("wayland",),
+            "features": ("embed", "multimon", "smart-sizing"),
+        },
+        "sdl-freerdp": {
+            "names": ("sdl-freerdp3", "sdl-freerdp"),
+            "native": ("wayland", "x11"),
+            "fallback": (),
+            "features": ("multimon",),
+        },
+        "wlfreerdp": {
+            "names": ("wlfreerdp3", "wlfreerdp"),
+            "native": ("wayland",),
+            "fallback": (),
+            "features": (),
+        },
+        "wfreerdp": {
+            "names": ("wfreerdp",),
+            "native": ("windows",),
+            "fallback": (),
+            "features": ("embed", "multimon", "smart-sizing"),
+        },
+    }
+
+    # Preferred flavours per display server, the first installed one is used
+    preference = {
+        "wayland": ("sdl-freerdp", "wlfreerdp", "xfreerdp"),
+        "x11": ("xfreerdp", "sdl-freerdp"),
+        "macos": ("xfreerdp", "sdl-freerdp"),
+        "windows": ("wfreerdp", "sdl-freerdp"),
+    }
+
+    @staticmethod
+    def display_server(platform_name=None):
+
+        """
+        Return the display server of this session, x11, wayland, macos or windows.
+        """
+        platform_name = platform_name or QApplication.platformName()
+        if sys.platform == "darwin" or platform_name == "cocoa":
+            return "macos"
+        if sys.platform == "win32" or platform_name == "windows":
+            return "windows"
+        if platform_name.startswith("wayland"):
+            return "wayland"
+        if platform_name == "xcb":
+            return "x11"
+
+        # Offscreen or other platforms, fall back to the session environment
+        if os.environ.get("WAYLAND_DISPLAY") or os.environ.get("XDG_SESSION_TYPE") == "wayland":
+            return "wayland"
+        return "x11"
+
+    @classmethod
+    def discover(cls, bundled_dirs=()):
+
+        """
+        Return the available front-ends as {flavour: path}, bundled binaries before the PATH.
+        """
+        found = {}
+        for flavour, info in cls.flavours.items():
+            candidates = [os.path.join(directory, name) for directory in bundled_dirs for name in info["names"]]
+            path = next((candidate for candidate in candidates if os.access(candidate, os.X_OK)), None)
+            path = path or next(filter(None, map(shutil.which, info["names"])), None)
+            if path:
+                found[flavour] = path
+        return found
+
+    @classmethod
+    def choose(cls, display, available, override="Automatic", features=()):
+
+        """
+        Return the flavour to use, or None when no front-end is installed.
+
+        An override is honoured when that front-end is installed. Otherwise the preferred
+        installed flavour offering the requested features wins, then any preferred one.
+        """
+        if override in available:
+            return override
+        if override != "Automatic":
+            logger.warning("FreeRDP client %s is not installed, choosing automatically", override)
+        candidates = [flavour for flavour in cls.preference.get(display, ()) if flavour in available]
+        candidates += [flavour for flavour in available if flavour not in candidates]
+        for flavour in candidates:
+            if set(features) <= set(cls.flavours[flavour]["features"]):
+                return flavour
+        return candidates[0] if candidates else None
+
+    @classmethod
+    def describe(cls, flavour, display):
+        info = cls.flavours[flavour]
+        if display in info["native"]:
+            return "native"
+        return "fallback" if display in info["fallback"] else "unsupported"
+
+class AudioBackends:
+
+    """
+    Detection of the local audio backends and the FreeRDP sound and microphone options.
+
+    FreeRDP has PulseAudio and ALSA backends. PipeWire is used through its PulseAudio
+    server, so it is only available when pipewire-pulse is running. The detection only
+    looks for the server sockets and sound devices, without starting a process.
+    """
+
+    backends = ("PipeWire", "PulseAudio", "ALSA")
+    freerdp_names = {"PipeWire": "pulse", "PulseAudio": "pulse", "ALSA": "alsa"}
+    profiles = ("Standard", "Low latency")
+
+    # PCM avoids the codec delay, small buffers keep the playback close to real time
+    low_latency = {
+        "playback": {"format": 1, "rate": 48000, "channel": 2, "latency": 40, "quality": "high"},
+        "microphone": {"format": 1, "rate": 16000, "channel": 1},
+    }
+
+    @staticmethod
+    def detect():
+
+        """
+        Return the available backends in order of preference.
+        """
+        runtime_dir = os.environ.get("XDG_RUNTIME_DIR", f"/run/user/{os.getuid()}" if hasattr(os, "getuid") else "")
+        pulse = bool(os.environ.get("PULSE_SERVER")) or os.path.exists(os.path.join(runtime_dir, "pulse", "native"))
+        available = []
+        if pulse and os.path.exists(os.path.join(runtime_dir, "pipewire-0")):
+            available.append("PipeWire")
+        elif pulse:
+            available.append("PulseAudio")
+        try:
+            if any(name.startswith("pcm") for name in os.listdir("/dev/snd")):
+                available.append("ALSA")
+        except OSError:
+            pass
+        return available
+
+    @classmethod
+    def choose(cls, requested, available):
+
+        """
+        Return the backend to use, the requested one if available, or None without any backend.
+        """
+        if requested in available:
+            return requested
+        if requested not in ("", "Automatic"):
+            # pipewire-pulse serves PulseAudio clients as well
+            if requested == "PulseAudio" and "PipeWire" in available:
+                return "PipeWire"
+            logger.warning("Audio backend %s is not available, found: %s", requested, ", ".join(available) or "none")
+        return available[0] if available else None
+
+    @classmethod
+    def options(cls, backend, profile, device):
+
+        """
+        Return the option value of /sound or /microphone for a backend and profile.
+        """
+        values = {"sys": cls.freerdp_names[backend]}
+        if profile == "Low latency":
+            values.update(cls.low_latency[device])
+        return ",".join(f"{key}:{value}" for key, value in values.items())
+
+class ScreenLayout:
+
+    """
+    Snapshot of the monitors and the FreeRDP display options derived from it.
+
+    Qt reports geometries in device independent pixels, so the panel size is the
+    geometry times the device pixel ratio. Without Qt scaling the ratio stays 1 and
+    the scale factor comes from the logical DPI set by the desktop. The 'Logical
+    resolution' mode sends the scaled down desktop and lets FreeRDP stretch it to the
+    panel, a 4K panel at 200% then transfers the pixels of a 1080p desktop.
+    """
+
+    hidpi_modes = ("Native", "Scale desktop", "Logical resolution")
+    device_scales = (100, 140, 180)
+
+    def __init__(self, monitors):
+        self.monitors = monitors
+
+    @classmethod
+    def capture(cls):
+
+        """
+        Read the screens from Qt, the primary screen is listed first.
+        """
+        primary = QApplication.primaryScreen()
+        monitors = []
+        for screen in QApplication.screens():
+            geometry = screen.geometry()
+            ratio = screen.devicePixelRatio()
+            # Desktops scale in steps of 25%, a 100 DPI panel is not a HiDPI panel
+            scale = ratio if ratio > 1 else max(1.0, round(screen.logicalDotsPerInch() / 96 * 4) / 4)
+            width, height = round(geometry.width() * ratio), round(geometry.height() * ratio)
+            monitors.append({
+                "name": screen.name(),
+                "x": round(geometry.x() * ratio),
+                "y": round(geometry.y() * ratio),
+                "width": width,
+                "height": height,
+                "scale": round(scale, 2),
+                "logical": (round(width / scale), round(height / scale)),
+                "primary": screen is primary,
+            })
+        monitors.sort(key=lambda monitor: not monitor["primary"])
+        return cls(monitors)
+
+    def describe(self):
+        return "\n".join(f"{index}: {monitor['name']} {monitor['width']}x{monitor['height']} at {round(monitor['scale'] * 100)}%"
+                         for index, monitor in enumerate(self.monitors))
+
+    def find(self, name):
+        return next((index for index, monitor in enumerate(self.monitors) if monitor["name"] == name), 0)
+
+    def select(self, text):
+
+        """
+        Return the indexes listed in the Monitors setting, all monitors when it is empty.
+        """
+        indexes = []
+        for part in re.split(r"[,\s]+", text or ""):
+            if part.isdigit() and int(part) < len(self.monitors) and int(part) not in indexes:
+                indexes.append(int(part))
+        return indexes or list(range(len(self.monitors)))
+
+    @staticmethod
+    def parse_monitor_list(output):
+
+        """
+        Parse the output of FreeRDP /monitor-list into {id: (x, y, width, height)}.
+        """
+        monitors = {}
+        for match in re.finditer(r"\[(\d+)\]\s+(\d+)x(\d+)\s+\+?(-?\d+)\+?(-?\d+)", output):
+            monitor_id, width, height, x, y = (int(value) for value in match.groups())
+            monitors[monitor_id] = (x, y, width, height)
+        return monitors
+
+    def freerdp_ids(self, indexes, freerdp_monitors):
+
+        """
+        Map monitor indexes to the ids FreeRDP uses, by geometry, or by order when FreeRDP did not list them.
+        """
+        ids = []
+        for index in indexes:
+            monitor = self.monitors[index]
+            geometry = (monitor["x"], monitor["y"], monitor["width"], monitor["height"])
+            ids.append(next((monitor_id for monitor_id, other in freerdp_monitors.items() if other == geometry), index))
+        return ids
+
+    def scale_options(self, monitor):
+
+        """
+        Return /scale-desktop and /scale-device for a HiDPI monitor, none at 100%.
+        """
+        if monitor["scale"] <= 1:
+            return []
+        desktop = min(500, round(monitor["scale"] * 100))
+        device = min(self.device_scales, key=lambda value: abs(value - desktop))
+        return [f"/scale-desktop:{desktop}", f"/scale-device:{device}"]
+
+class XScreenSaverInfo(ctypes.Structure):
+    _fields_ = [
+        ("window", ctypes.c_ulong),
+        ("state", ctypes.c_int),
+        ("kind", ctypes.c_int),
+        ("til_or_since", ctypes.c_ulong),
+        ("idle", ctypes.c_ulong),
+        ("event_mask", ctypes.c_ulong),
+    ]
+
+class X11:
+
+    """
+    The few Xlib calls Qt does not expose, loaded with ctypes on the xcb platform only.
+    """
+
+    library = None
+    screensaver = None
+    screensaver_info = None
+    display = None
+    loaded = False
+
+    @classmethod
+    def open(cls):
+        if cls.loaded:
+            return cls.display
+        cls.loaded = True
+        if QApplication.platformName() != "xcb":
+            return None
+        try:
+            cls.library = ctypes.CDLL("libX11.so.6")
+        except OSError:
+            logger.info("libX11 is not available")
+            return None
+        cls.library.XOpenDisplay.restype = ctypes.c_void_p
+        cls.library.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        cls.library.XQueryTree.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_ulong),
+            ctypes.POINTER(ctypes.POINTER(ctypes.c_ulong)), ctypes.POINTER(ctypes.c_uint)
+        ]
+        cls.library.XResizeWindow.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_uint, ctypes.c_uint]
+        cls.library.XFlush.argtypes = [ctypes.c_void_p]
+        cls.library.XFree.argtypes = [ctypes.c_void_p]
+        cls.display = cls.library.XOpenDisplay(None)
+        return cls.display
+
+    @classmethod
+    def idle_ms(cls):
+
+        """
+        Return the milliseconds since the last keyboard or mouse input on the X server, None without XScreenSaver.
+        """
+        display = cls.open()
+        if not display:
+            return None
+        if cls.screensaver is None:
+            try:
+                cls.screensaver = ctypes.CDLL("libXss.so.1")
+            except OSError:
+                logger.info("libXss is not available")
+                cls.screensaver = False
+                return None
+            cls.screensaver.XScreenSaverAllocInfo.restype = ctypes.POINTER(XScreenSaverInfo)
+            cls.screensaver.XScreenSaverQueryInfo.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(XScreenSaverInfo)]
+            cls.library.XDefaultRootWindow.restype = ctypes.c_ulong
+            cls.library.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+            cls.screensaver_info = cls.screensaver.XScreenSaverAllocInfo()
+        if not cls.screensaver:
+            return None
+        if not cls.screensaver.XScreenSaverQueryInfo(display, cls.library.XDefaultRootWindow(display), cls.screensaver_info):
+            return None
+        return cls.screensaver_info.contents.idle
+
+    @classmethod
+    def resize_children(cls, window, width, height):
+
+        """
+        Resize the child windows of a native window, returns how many were resized.
+        """
+        display = cls.open()
+        if not display:
+            return 0
+        root, parent = ctypes.c_ulong(), ctypes.c_ulong()
+        children, count = ctypes.POINTER(ctypes.c_ulong)(), ctypes.c_uint()
+        if not cls.library.XQueryTree(display, window, ctypes.byref(root), ctypes.byref(parent), ctypes.byref(children), ctypes.byref(count)):
+            return 0
+        try:
+            for index in range(count.value):
+                cls.library.XResizeWindow(display, children[index], width, height)
+        finally:
+            if children:
+                cls.library.XFree(children)
+        cls.library.XFlush(display)
+        return count.value
+
+class IdleMonitor:
+
+    """
+    Local input idle time, from the X server or from the idle hint of the logind session.
+
+    XScreenSaver counts the input of every window on the display, including the
+    FreeRDP window. Elsewhere the compositor reports idleness to logind, which only
+    sets the hint after its own idle delay, so shorter thresholds are not reached.
+    """
+
+    @staticmethod
+    def source():
+
+        """
+        Return the idle time source of this desktop, None when there is none.
+        """
+        if X11.idle_ms() is not None:
+            return "x11"
+        # The same test as sd_booted, loginctl is installed on hosts without systemd as well
+        if os.path.isdir("/run/systemd/system") and shutil.which("loginctl"):
+            return "logind"
+        return None
+
+    @staticmethod
+    def logind_command():
+        session = os.environ.get("XDG_SESSION_ID", "self")
+        return ["loginctl", "show-session", session, "-p", "IdleHint", "-p", "IdleSinceHintMonotonic"]
+
+    @staticmethod
+    def parse_logind(result):
+
+        """
+        Return the idle milliseconds from loginctl show-session, None when logind did not answer.
+        """
+        if result.returncode != 0:
+            return None
+        values = dict(line.split("=", 1) for line in result.stdout.splitlines() if "=" in line)
+        if values.get("IdleHint") != "yes":
+            return 0
+        # The hint is stamped with CLOCK_MONOTONIC in microseconds, the clock of time.monotonic
+        since = int(values.get("IdleSinceHintMonotonic") or 0)
+        return max(0, round(time.monotonic() * 1000 - since / 1000)) if since else 0
+
+class LaunchPolicy:
+
+    """
+    Scheduling priority, CPU affinity and cgroup limits of the FreeRDP session and the front-end.
+
+    Nice and affinity are set on the thread that spawns FreeRDP, which the child
+    inherits, and the I/O class is applied with ionice. Memory and CPU caps use a
+    delegated cgroup v2 subtree when the client runs in one, moving the front-end into
+    a 'frontend' child and the session into a 'session' child. Without delegation the
+    session runs in a systemd user scope with the caps, and the front-end is not capped.
+    Every step returns a report of what was requested and what took effect.
+    """
+
+    io_classes = {"Default": None, "Realtime": 1, "Best effort": 2, "Idle": 3}
+    cgroup_root = "/sys/fs/cgroup"
+    frontend_keys = ("Front-end Nice", "Front-end CPUs", "Front-end Memory Limit", "Front-end CPU Limit")
+
+    def __init__(self):
+        self.settings = {}
+        self.cgroup = None
+        self.cgroup_checked = False
+        self.frontend_applied = None
+
+    def configure(self, settings):
+        self.settings = dict(settings)
+
+    @staticmethod
+    def parse_cpus(text):
+
+        """
+        Parse a CPU list such as "0-2,4" into a set of CPU numbers, an empty text means all CPUs.
+        """
+        cpus = set()
+        for part in str(text or "").replace(" ", "").split(","):
+            if not part:
+                continue
+            first, _, last = part.partition("-")
+            cpus.update(range(int(first), int(last or first) + 1))
+        return cpus
+
+    def find_cgroup(self):
+
+        """
+        Return the delegated cgroup v2 directory the client may manage, or None.
+        """
+        if self.cgroup_checked:
+            return self.cgroup
+        self.cgroup_checked = True
+        try:
+            with open("/proc/self/cgroup") as f:
+                path = next(line.strip()[3:] for line in f if line.startswith("0::"))
+            base = os.path.join(self.cgroup_root, path.lstrip("/"))
+
+            # A previous start already moved the front-end into its child
+            if os.path.basename(base) == "frontend":
+                base = os.path.dirname(base)
+            with open(os.path.join(base, "cgroup.controllers")) as f:
+                controllers = f.read().split()
+        except (OSError, StopIteration):
+            return None
+        writable = all(os.access(os.path.join(base, name), os.W_OK) for name in ("cgroup.procs", "cgroup.subtree_control"))
+        if writable and os.access(base, os.W_OK) and {"cpu", "memory"} <= set(controllers):
+            self.cgroup = base
+        return self.cgroup
+
+    def prepare_cgroup(self, name):
+
+        """
+        Create a child of the delegated cgroup with the cpu and memory controllers enabled.
+        """
+        base = self.find_cgroup()
+        frontend = os.path.join(base, "frontend")
+        os.makedirs(frontend, exist_ok=True)
+
+        # Processes may only live in leaves once controllers are enabled
+        with open(os.path.join(frontend, "cgroup.procs"), "w") as f:
+            f.write(str(os.getpid()))
+        with open(os.path.join(base, "cgroup.subtree_control"), "w") as f:
+            f.write("+cpu +memory")
+        path = os.path.join(base, name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    @staticmethod
+    def write_limits(path, memory_mb, cpu_percent):
+        with open(os.path.join(path, "memory.max"), "w") as f:
+            f.write(str(memory_mb * 1024 * 1024) if memory_mb else "max")
+        with open(os.path.join(path, "cpu.max"), "w") as f:
+            f.write(f"{cpu_percent * 1000} 100000" if cpu_percent else "max 100000")
+        if memory_mb:
+            # Kill the whole session together when it runs out of memory
+            with open(os.path.join(path, "memory.oom.group"), "w") as f:
+                f.write("1")
+
+    @classmethod
+    def apply_scheduling(cls, tids, nice, cpu_list):
+        report = {}
+        if nice is not None:
+            report["nice"] = {"requested": nice}
+            try:
+                for tid in tids:
+                    os.setpriority(os.PRIO_PROCESS, tid, nice)
+            except (OSError, AttributeError) as e:
+                report["nice"]["error"] = str(e)
+        if cpu_list:
+            report["cpus"] = {"requested": cpu_list}
+            try:
+                cpus = cls.parse_cpus(cpu_list)
+                for tid in tids:
+                    os.sched_setaffinity(tid, cpus)
+            except (OSError, AttributeError, ValueError) as e:
+                report["cpus"]["error"] = str(e)
+        return report
+
+    def apply_frontend(self):
+
+        """
+        Apply the front-end nice, affinity and limits to every thread of this process.
+
+        Returns None when the front-end settings did not change since they were last applied,
+        threads started later inherit the nice and affinity of the thread creating them.
+        """
+        settings = {key: self.settings.get(key) for key in self.frontend_keys}
+        if settings == self.frontend_applied:
+            return None
+        self.frontend_applied = settings
+        nice = self.settings.get("Front-end Nice", 0)
+        try:
+            tids = [int(tid) for tid in os.listdir("/proc/self/task")]
+        except OSError:
+            tids = [0]
+        current = os.getpriority(os.PRIO_PROCESS, 0) if hasattr(os, "getpriority") else 0
+        report = self.apply_scheduling(tids, nice if nice != current else None, self.settings.get("Front-end CPUs"))
+
+        memory_mb = self.settings.get("Front-end Memory Limit", 0)
+        cpu_percent = self.settings.get("Front-end CPU Limit", 0)
+        if memory_mb or cpu_percent or self.find_cgroup():
+            report["cgroup"] = {"memory_mb": memory_mb, "cpu_percent": cpu_percent}
+            if self.find_cgroup() is None:
+                report["cgroup"]["error"] = "No delegated cgroup v2 subtree"
+            else:
+                try:
+                    self.write_limits(self.prepare_cgroup("frontend"), memory_mb, cpu_percent)
+                    report["cgroup"]["path"] = os.path.join(self.cgroup, "frontend")
+                except OSError as e:
+                    report["cgroup"]["error"] = str(e)
+        return report
+
+    def wrap_session(self, command):
+
+        """
+        Return the session command wrapped for the I/O class and the cgroup limits, and a report.
+        """
+        report = {}
+        io_class = self.io_classes.get(self.settings.get("Session IO Class"))
+        if io_class is not None:
+            report["io_class"] = {"requested": self.settings.get("Session IO Class")}
+            if shutil.which("ionice"):
+                # -t runs FreeRDP even if the class cannot be set, the effect is checked after the spawn
+                command = ["ionice", "-t", "-c", str(io_class)] + (["-n", "0"] if io_class in (1, 2) else []) + command
+            else:
+                report["io_class"]["error"] = "ionice not found"
+
+        memory_mb = self.settings.get("Session Memory Limit", 0)
+        cpu_percent = self.settings.get("Session CPU Limit", 0)
+        if memory_mb or cpu_percent:
+            report["cgroup"] = {"memory_mb": memory_mb, "cpu_percent": cpu_percent}
+            if self.find_cgroup() is not None:
+                try:
+                    path = self.prepare_cgroup("session")
+                    self.write_limits(path, memory_mb, cpu_percent)
+
+                    # The shell moves itself into the session cgroup before it becomes FreeRDP
+                    command = ["/bin/sh", "-c", 'echo $$ > "$0"; exec "$@"', os.path.join(path, "cgroup.procs")] + command
+                    report["cgroup"]["mode"] = "delegated"
+                except OSError as e:
+                    report["cgroup"]["error"] = str(e)
+            elif shutil.which("systemd-run") and os.path.exists(os.path.join(os.environ.get("XDG_RUNTIME_DIR", "/nonexistent"), "bus")):
+                properties = []
+                if memory_mb:
+                    properties += ["-p", f"MemoryMax={memory_mb}M"]
+                if cpu_percent:
+                    properties += ["-p", f"CPUQuota={cpu_percent}%"]
+                command = ["systemd-run", "--user", "--scope", "--quiet", "--collect"] + properties + ["--"] + command
+                report["cgroup"]["mode"] = "systemd-run"
+            else:
+                report["cgroup"]["error"] = "No delegated cgroup v2 subtree or systemd user manager"
+        return command, report
+
+    def apply_session_thread(self):
+
+        """
+        Apply the session nice and affinity to the calling thread, FreeRDP inherits them.
+        """
+        nice = self.settings.get("Session Nice", 0)
+        current = os.getpriority(os.PRIO_PROCESS, 0) if hasattr(os, "getpriority") else 0
+        return self.apply_scheduling([0], nice if nice != current else None, self.settings.get("Session CPUs"))
+
+    @staticmethod
+    def effect(pid):
+
+        """
+        Read back the nice value, affinity, I/O priority and cgroup of a process.
+        """
+        effect = {}
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                effect["nice"] = int(f.read().rsplit(")", 1)[1].split()[16])
+            effect["cpus"] = sorted(os.sched_getaffinity(pid))
+            with open(f"/proc/{pid}/cgroup") as f:
+                effect["cgroup"] = next((line.strip()[3:] for line in f if line.startswith("0::")), None)
+        except (OSError, AttributeError, IndexError, ValueError):
+            pass
+        return effect
+
+class ResourceIndex:
+
+    """
+    Index of the bundled assets under src/ and Resources/, used instead of a stat per lookup.
+
+    The asset directories are listed once, and refresh rebuilds the index when the
+    mtime of one of them changed. Hashes come from the manifest.json written by
+    build.sh, or are computed on first use. A missing asset is reported once.
+    """
+
+    asset_dirs = ("icons", "img", "styles", "freerdp")
+    manifest_name = "manifest.json"
+
+    def __init__(self, base_dirs):
+        self.base_dirs = base_dirs
+        self.paths = {}
+        self.hashes = {}
+        self.dir_mtimes = {}
+        self.missing = set()
+        self.build()
+
+    @staticmethod
+    def normalize(name):
+        return os.path.normpath(name).replace(os.sep, "/")
+
+    def build(self):
+        paths = {}
+        hashes = {}
+        dir_mtimes = {}
+
+        # The first base directory wins, so it is scanned last
+        for base_dir in reversed(self.base_dirs):
+            for asset_dir in self.asset_dirs:
+                self.scan(base_dir, asset_dir, paths, dir_mtimes)
+            try:
+                with open(os.path.join(base_dir, self.manifest_name), encoding="utf-8") as f:
+                    for name, asset in json.load(f).get("assets", {}).items():
+                        hashes[os.path.join(base_dir, name)] = asset["sha256"]
+            except (OSError, ValueError, KeyError, AttributeError):
+                pass
+        self.paths = paths
+        self.hashes = hashes
+        self.dir_mtimes = dir_mtimes
+
+    def scan(self, base_dir, name, paths, dir_mtimes):
+        path = os.path.join(base_dir, name)
+        try:
+            dir_mtimes[path] = os.stat(path).st_mtime_ns
+            entries = list(os.scandir(path))
+        except OSError:
+            dir_mtimes[path] = None
+            return
+        for entry in entries:
+            if entry.is_dir():
+                if entry.name != "__pycache__":
+                    self.scan(base_dir, f"{name}/{entry.name}", paths, dir_mtimes)
+            else:
+                paths[f"{name}/{entry.name}"] = entry.path
+
+    def refresh(self):
+
+        """
+        Rebuild the index if an asset directory changed, returns whether it was rebuilt.
+        """
+        for path, mtime in self.dir_mtimes.items():
+            try:
+                current = os.stat(path).st_mtime_ns
+            except OSError:
+                current = None
+            if current != mtime:
+                self.build()
+                self.missing.clear()
+                return True
+        return False
+
+    def lookup(self, name):
+        name = self.normalize(name)
+        path = self.paths.get(name)
+        if path is not None:
+            return path
+
+        # Files outside the asset directories are not indexed
+        if name.split("/", 1)[0] not in self.asset_dirs:
+            for base_dir in self.base_dirs:
+                path = os.path.join(base_dir, name)
+                if os.path.exists(path):
+                    self.paths[name] = path
+                    return path
+
+        # Report a missing asset once
+        if name not in self.missing:
+            self.missing.add(name)
+            logger.warning("Could not find: %s in %s", name, ", ".join(self.base_dirs))
+        return None
+
+    def digest(self, name):
+
+        """
+        Return the SHA-256 of an asset, or None if it does not exist.
+        """
+        path = self.lookup(name)
+        if path is None:
+            return None
+        if path not in self.hashes:
+            sha256 = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    sha256.update(chunk)
+            self.hashes[path] = sha256.hexdigest()
+        return self.hashes[path]
+
+    @classmethod
+    def write_manifest(cls, base_dir):
+
+        """
+        Write base_dir/manifest.json with the size and hash of every asset, run by build.sh.
+        """
+        index = cls([base_dir])
+        assets = {}
+        for name, path in sorted(index.paths.items()):
+            assets[name] = {"sha256": index.digest(name), "size": os.path.getsize(path)}
+        with open(os.path.join(base_dir, cls.manifest_name), "w", encoding="utf-8") as f:
+            json.dump({"assets": assets}, f, indent=2, sort_keys=True)
+        return len(assets)
+
+class ConnectionImporter:
+
+    """
+    Streaming import of .rdp files, RDCMan .rdg files and CSV lists into config/connections.jsonl.
+
+    Files are read line by line or element by element and the connections written in
+    batches, so memory stays bounded by the batch size and the set of known keys.
+    Connections are deduplicated by host, port and user, including those already imported.
+    """
+
+    file_name = "connections.jsonl"
+    batch_size = 500
+    extensions = (".rdp", ".rdg", ".csv")
+
+    # .rdp integer settings mapped to (category, name), True when the setting is inverted
+    rdp_flags = {
+        "use multimon": ("Display", "Use all monitors", False),
+        "smart sizing": ("Display", "Fit session to window", False),
+        "redirectprinters": ("Devices", "Printers", False),
+        "redirectsmartcards": ("Devices", "Smart Cards", False),
+        "redirectcomports": ("Devices", "Ports", False),
+        "redirectclipboard": ("Experience", "Clipboard", False),
+        "allow font smoothing": ("Experience", "Smooth Fonts", False),
+        "allow desktop composition": ("Experience", "Desktop Composition", False),
+        "disable full window drag": ("Experience", "Full Window Drag", True),
+        "disable menu anims": ("Experience", "Menu Animations", True),
+        "disable themes": ("Experience", "Disable Themes", False),
+        "disable wallpaper": ("Experience", "Disable Wallpaper", False),
+    }
+    audio_modes = {"0": "On this computer", "1": "On the remote computer", "2": "Never"}
+
+    # CSV column names accepted for each field, compared in lower case
+    csv_columns = {
+        "host": ("host", "server", "server address", "address", "computername", "computer", "hostname"),
+        "port": ("port",),
+        "user": ("username", "user", "login"),
+        "domain": ("domain",),
+        "name": ("displayname", "display name", "name", "description"),
+    }
+
+    def __init__(self, config_dir):
+        self.path = os.path.join(config_dir, self.file_name)
+        self.keys = set()
+        self.batch = []
+        self.stats = {"files": 0, "connections": 0, "imported": 0, "duplicates": 0, "errors": 0}
+
+    @staticmethod
+    def connection(host, port=None, user="", domain="", name=None):
+
+        """
+        Return a connection record, splitting the DOMAIN and UPN forms of the user name.
+        """
+        user = user or ""
+        if "\\" in user and not domain:
+            domain, user = user.split("\\", 1)
+        elif "@" in user and not domain:
+            user, domain = user.split("@", 1)
+        record = {"name": name or host, "General": {"Server Address": host, "Username": user, "Domain": domain or ""}}
+        if port:
+            record["General"]["Port"] = int(port)
+        return record
+
+    @staticmethod
+    def split_address(address):
+
+        """
+        Split host:port, [v6]:port and bare hosts.
+        """
+        address = address.strip()
+        if address.startswith("["):
+            host, _, rest = address[1:].partition("]")
+            return host, rest[1:] if rest.startswith(":") and rest[1:].isdigit() else None
+        host, sep, port = address.rpartition(":")
+        if sep and port.isdigit() and ":" not in host:
+            return host, port
+        return address, None
+
+    @staticmethod
+    def open_text(path):
+
+        """
+        Open a text file in the encoding given by its byte order mark, mstsc writes UTF-16.
+        """
+        with open(path, "rb") as f:
+            head = f.read(4)
+        if head.startswith((b"\xff\xfe", b"\xfe\xff")):
+            encoding = "utf-16"
+        elif len(head) >= 2 and head[1:2] == b"\x00":
+            encoding = "utf-16-le"
+        else:
+            encoding = "utf-8-sig"
+        return open(path, encoding=encoding, errors="replace", newline="")
+
+    def parse_rdp(self, path):
+        values = {}
+        with self.open_text(path) as f:
+            for line in f:
+                key, _, rest = line.strip().partition(":")
+                kind, _, value = rest.partition(":")
+                if kind in ("s", "i", "b"):
+                    values[key.lower()] = value
+        if not values.get("full address"):
+            return
+        host, port = self.split_address(values["full address"])
+        record = self.connection(host, port or values.get("server port"), values.get("username"), values.get("domain"),
+                                 os.path.splitext(os.path.basename(path))[0])
+
+        # Display, audio, devices and experience settings
+        width, height = values.get("desktopwidth"), values.get("desktopheight")
+        if width and height and width != "0" and height != "0":
+            record.setdefault("Display", {})["Resolution"] = f"{width}x{height}"
+        if values.get("screen mode id") in ("1", "2"):
+            record.setdefault("Display", {})["Start session in fullscreen"] = values["screen mode id"] == "2"
+        if values.get("audiomode") in self.audio_modes:
+            record.setdefault("Audio", {})["Play sound"] = self.audio_modes[values["audiomode"]]
+        if values.get("audiocapturemode") in ("0", "1"):
+            record.setdefault("Audio", {})["Record sound"] = "On this computer" if values["audiocapturemode"] == "1" else "Never"
+        if "drivestoredirect" in values:
+            record.setdefault("Devices", {})["Drives"] = bool(values["drivestoredirect"])
+        for key, (category, name, inverted) in self.rdp_flags.items():
+            if values.get(key, "").isdigit():
+                record.setdefault(category, {})[name] = (values[key] != "0") != inverted
+        yield record
+
+    def parse_rdg(self, path):
+
+        """
+        Yield the servers of an RDCMan file, with the logon credentials inherited from their groups.
+        """
+        credentials = [{}]
+        stack = []
+        for event, element in ElementTree.iterparse(path, events=("start", "end")):
+            tag = element.tag
+            if event == "start":
+                stack.append(element)
+                if tag in ("group", "file"):
+                    credentials.append(dict(credentials[-1]))
+                continue
+            stack.pop()
+            parent = stack[-1] if stack else None
+            if tag == "logonCredentials" and parent is not None and parent.tag in ("group", "file"):
+                values = {child.tag: (child.text or "") for child in element}
+                if element.get("inherit", "None") == "None":
+                    credentials[-1] = {"user": values.get("userName", ""), "domain": values.get("domain", "")}
+            elif tag == "server":
+                properties = element.find("properties")
+                source = properties if properties is not None else element
+                host = (source.findtext("name") or "").strip()
+                if host:
+                    inherited = credentials[-1]
+                    logon = element.find("logonCredentials")
+                    if logon is not None and logon.get("inherit", "None") == "None":
+                        inherited = {"user": logon.findtext("userName", ""), "domain": logon.findtext("domain", "")}
+                    host, port = self.split_address(host)
+                    port = port or element.findtext("connectionSettings/port")
+                    yield self.connection(host, port, inherited.get("user"), inherited.get("domain"), source.findtext("displayName"))
+            elif tag in ("group", "file"):
+                credentials.pop()
+            else:
+                continue
+
+            # Drop handled servers and groups from the tree to keep memory bounded
+            if parent is not None:
+                parent.remove(element)
+
+    def parse_csv(self, path):
+        with self.open_text(path) as f:
+            reader = csv.DictReader(f)
+            columns = {}
+            for field, names in self.csv_columns.items():
+                columns[field] = next((column for column in reader.fieldnames or [] if column.strip().lower() in names), None)
+            if columns["host"] is None:
+                raise ValueError("no host column")
+            for row in reader:
+                value = lambda field: (row.get(columns[field]) or "").strip() if columns[field] else ""
+                if value("host"):
+                    host, port = self.split_address(value("host"))
+                    yield self.connection(host, value("port") or port, value("user"), value("domain"), value("name") or None)
+
+    @classmethod
+    def key(cls, record):
+
+        """
+        Return a short digest of host, port and user, keeps the set of known connections small.
+        """
+        general = record["General"]
+        key = f"{general['Server Address'].lower()}\0{general.get('Port', 3389)}\0{general['Username'].lower()}"
+        return hashlib.blake2b(key.encode(), digest_size=8).digest()
+
+    @classmethod
+    def read(cls, path):
+
+        """
+        Yield the imported connections, skipping a line cut short by an interrupted write.
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            return
+
+    @classmethod
+    def find_files(cls, paths):
+        for path in paths:
+            if os.path.isdir(path):
+                for root, _, names in os.walk(path):
+                    for name in sorted(names):
+                        if name.lower().endswith(cls.extensions):
+                            yield os.path.join(root, name)
+            else:
+                yield path
+
+    def run(self, paths, progress=None, cancelled=None):
+
+        """
+        Import files and directories, return the statistics.
+
+        :param progress: Callable receiving the statistics, at most every 100ms
+        :param cancelled: Callable returning True to stop after the current batch
+        """
+        self.keys = {self.key(record) for record in self.read(self.path)}
+        parsers = {".rdp": self.parse_rdp, ".rdg": self.parse_rdg, ".csv": self.parse_csv}
+        reported = 0
+        for path in self.find_files(paths):
+            if cancelled and cancelled():
+                break
+            self.stats["files"] += 1
+            parser = parsers.get(os.path.splitext(path)[1].lower())
+            try:
+                if parser is None:
+                    raise ValueError("unsupported file type")
+                for record in parser(path):
+                    self.add(record)
+
+                    # Large RDCMan and CSV files report and check for a cancel once per batch
+                    if self.stats["connections"] % self.batch_size == 0:
+                        if cancelled and cancelled():
+                            break
+                        if progress and time.monotonic() - reported > 0.1:
+                            reported = time.monotonic()
+                            progress(dict(self.stats))
+            except (OSError, ValueError, UnicodeError, ElementTree.ParseError) as e:
+                self.stats["errors"] += 1
+                logger.warning("Failed to import %s: %s", path, e)
+            if progress and time.monotonic() - reported > 0.1:
+                reported = time.monotonic()
+                progress(dict(self.stats))
+        self.flush()
+        return dict(self.stats)
+
+    def add(self, record):
+        self.stats["connections"] += 1
+        key = self.key(record)
+        if key in self.keys:
+            self.stats["duplicates"] += 1
+            return
+        self.keys.add(key)
+        self.batch.append(record)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.batch:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in self.batch))
+        self.stats["imported"] += len(self.batch)
+        self.batch = []
+
+class ConfigTracker(QObject):
+
+    """
+    Tracks which configuration keys differ from the last saved snapshot.
+    """
+
+    dirty_changed = pyqtSignal(bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.saved = {}
+        self.dirty = {}
+
+    def snapshot(self, values):
+
+        # Remember the saved values and clear the dirty state
+        was_dirty = self.is_dirty()
+        self.saved = copy.deepcopy(values)
+        self.dirty = {}
+        if was_dirty:
+            self.dirty_changed.emit(False)
+
+    def update(self, category, name, value):
+
+        """
+        Compare a single value with the snapshot and update the dirty state.
+        """
+        was_dirty = self.is_dirty()
+        keys = self.dirty.setdefault(category, set())
+        if value != self.saved.get(category, {}).get(name):
+            keys.add(name)
+        else:
+            keys.discard(name)
+        if not keys:
+            del self.dirty[category]
+        if was_dirty != self.is_dirty():
+            self.dirty_changed.emit(self.is_dirty())
+
+    def refresh(self, values):
+
+        # Compare every value with the snapshot
+        for category, settings in values.items():
+            for name, value in settings.items():
+                self.update(category, name, value)
+
+    def is_dirty(self):
+        return bool(self.dirty)
+
+    def dirty_categories(self):
+        return sorted(self.dirty)
+
+    def dirty_keys(self):
+        return {category: sorted(names) for category, names in self.dirty.items()}
+
+class ConfigStore:
+
+    """
+    Writes configuration files as a single transaction.
+
+    Changed files are written to fsynced temporary files first, then a journal
+    with the new generation number is written, and finally the files are
+    renamed into place. An interrupted commit is rolled forward by recover()
+    when the journal was written, and rolled back otherwise.
+    """
+
+    journal_name = 'transaction.json'
+    staged_suffix = '.staged.tmp'
+
+    def __init__(self, config_dir):
+        self.config_dir = config_dir
+        self.generation = 0
+
+    def path(self, name):
+        return os.path.join(self.config_dir, name)
+
+    def staged_path(self, name):
+        return self.path(name + self.staged_suffix)
+
+    def read(self, name):
+
+        """
+        Return the parsed JSON content of a file, or None if it is missing or unreadable.
+        """
+        try:
+            with open(self.path(name), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable configuration file %s: %s", name, e)
+            return None
+
+    def read_bytes(self, name):
+        try:
+            with open(self.path(name), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def write_durable(self, path, content):
+
+        # Write and flush a file to stable storage
+        with open(path, 'wb') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def sync_dir(self):
+
+        # Persist renames by flushing the directory entry
+        if hasattr(os, 'O_DIRECTORY'):
+            fd = os.open(self.config_dir, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def write_journal(self, state, files):
+        journal = json.dumps({"generation": self.generation, "state": state, "files": files}).encode()
+        temp_path = self.staged_path(self.journal_name)
+        self.write_durable(temp_path, journal)
+        os.replace(temp_path, self.path(self.journal_name))
+        self.sync_dir()
+
+    def commit(self, files):
+
+        """
+        Write the files whose content changed and return their names.
+
+        :param files: Dictionary of file names to their new content as bytes
+        """
+        os.makedirs(self.config_dir, exist_ok=True)
+        self.recover()
+        changed = [name for name, content in files.items() if self.read_bytes(name) != content]
+        if not changed:
+            return []
+        self.generation += 1
+
+        # Stage every changed file before anything is replaced
+        for name in changed:
+            self.write_durable(self.staged_path(name), files[name])
+        self.write_journal("pending", changed)
+
+        # Swap the staged files into place
+        for name in changed:
+            os.replace(self.staged_path(name), self.path(name))
+        self.sync_dir()
+        self.write_journal("committed", changed)
+        return changed
+
+    def recover(self):
+
+        """
+        Complete or discard a transaction interrupted by a crash or power loss.
+        """
+        journal = self.read(self.journal_name) or {}
+        self.generation = max(self.generation, journal.get("generation", 0))
+        if journal.get("state") == "pending":
+            # Every staged file was synced before the journal, finish the renames
+            for name in journal.get("files", []):
+                if os.path.exists(self.staged_path(name)):
+                    os.replace(self.staged_path(name), self.path(name))
+            self.sync_dir()
+            self.write_journal("committed", journal.get("files", []))
+
+        # Staged files without a pending journal belong to an incomplete commit, other temporary files are not ours
+        if os.path.isdir(self.config_dir):
+            for name in os.listdir(self.config_dir):
+                if name.endswith(self.staged_suffix):
+                    os.remove(self.path(name))
+
+class ConfigSync:
+
+    """
+    Pull-based client for a central settings bundle in the export format.
+
+    HTTP(S) sources are polled with ETag/If-Modified-Since conditional requests, file
+    shares and local paths by size and mtime. The last bundle is cached so it can still
+    be applied while the source is unreachable. The methods are blocking and meant to
+    run inside a JobThread.
+    """
+
+    def __init__(self, url, cache_dir, defaults=None):
+        self.url = url
+        self.cache_dir = cache_dir
+        self.defaults = defaults or {}
+        self.bundle_path = os.path.join(cache_dir, 'bundle.json')
+        self.state_path = os.path.join(cache_dir, 'state.json')
+
+    def load_state(self):
+        try:
+            with open(self.state_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_state(self, state):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = self.state_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.state_path)
+
+    def fetch(self, job, timeout=30):
+
+        """
+        Fetch the bundle if it changed.
+
+        :return: Tuple of (bytes, validators) or (None, validators) when unchanged
+        """
+        state = self.load_state()
+        parsed = urllib.parse.urlparse(self.url)
+
+        if parsed.scheme in ('http', 'https'):
+            request = urllib.request.Request(self.url)
+            if state.get("etag"):
+                request.add_header("If-None-Match", state["etag"])
+            if state.get("last_modified"):
+                request.add_header("If-Modified-Since", state["last_modified"])
+            try:
+                with urllib.request.urlopen(request, timeout=timeout) as response:
+                    return response.read(), {
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                    }
+            except urllib.error.HTTPError as e:
+                if e.code == 304:
+                    return None, {}
+                raise
+
+        # File shares and local paths
+        path = urllib.request.url2pathname(parsed.path) if parsed.scheme == 'file' else self.url
+        stat = os.stat(path)
+        validators = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+        if all(state.get(key) == value for key, value in validators.items()):
+            return None, {}
+        with open(path, 'rb') as f:
+            return f.read(), validators
+
+    @staticmethod
+    def validate(bundle, defaults):
+
+        """
+        Raise ValueError unless the known settings of the bundle have the types of their defaults.
+        """
+        if not isinstance(bundle, dict):
+            raise ValueError("the bundle is not an object")
+        for category, settings in bundle.items():
+            if category not in defaults:
+                continue
+            if not isinstance(settings, dict):
+                raise ValueError(f"{category} is not an object")
+            for name, value in settings.items():
+                if name not in defaults[category]:
+                    continue
+                default = defaults[category][name]
+                if name == "Logo File" and isinstance(value, dict):
+                    # Exported logos are embedded as base64
+                    valid = isinstance(value.get("filename"), str) and isinstance(value.get("content"), str)
+                elif isinstance(default, list):
+                    valid = isinstance(value, list) and all(isinstance(item, dict) for item in value)
+                elif isinstance(default, bool) or isinstance(value, bool):
+                    valid = type(value) is type(default)
+                else:
+                    valid = isinstance(value, type(default))
+                if not valid:
+                    raise ValueError(f"{category}/{name} must be {type(default).__name__}, not {type(value).__name__}")
+
+    def poll(self, job):
+
+        """
+        Return the bundle to apply as a dictionary with its content hash, or None if nothing changed.
+        Falls back to the cached bundle when the source cannot be reached.
+        """
+        state = self.load_state()
+        try:
+            content, validators = self.fetch(job)
+        except (OSError, ValueError) as e:
+            logger.warning("Settings sync source unreachable, using the cached bundle: %s", e)
+            content, validators = None, {}
+
+        job.check_cancelled()
+        if content is not None:
+            state.update(validators)
+            digest = hashlib.sha256(content).hexdigest()
+            if digest not in (state.get("sha256"), state.get("rejected_sha256")):
+                # Validate before replacing the cached copy
+                try:
+                    self.validate(json.loads(content), self.defaults)
+                except ValueError as e:
+                    logger.error("Rejected settings bundle %s: %s", digest, e)
+                    state["rejected_sha256"] = digest
+                else:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    with open(self.bundle_path + '.tmp', 'wb') as f:
+                        f.write(content)
+                    os.replace(self.bundle_path + '.tmp', self.bundle_path)
+                    state["sha256"] = digest
+            self.save_state(state)
+
+        # Apply the cached bundle when it was neither applied nor rejected yet
+        if not state.get("sha256") or state.get("sha256") in (state.get("applied_sha256"), state.get("rejected_sha256")):
+            return None
+        with open(self.bundle_path, 'r') as f:
+            return {"sha256": state["sha256"], "bundle": json.load(f)}
+
+    def mark_applied(self, digest):
+        state = self.load_state()
+        state["applied_sha256"] = digest
+        self.save_state(state)
+
+    def mark_rejected(self, digest):
+        state = self.load_state()
+        state["rejected_sha256"] = digest
+        self.save_state(state)
+
+class Updater:
+
+    """
+    Fetches, verifies and stages application updates from the git remote.
+    The methods are blocking and meant to run inside a JobThread.
+    """
+
+    def __init__(self, root_dir, remote="origin", branch=None):
+        self.root_dir = root_dir
+        self.remote = remote
+        self.branch = branch
+        self.stage_dir = os.path.join(root_dir, '.update')
+        self.staged_commit = None
+
+    def is_available(self):
+
+        # Only source checkouts can be updated through git
+        return (
+            not getattr(sys, 'frozen', False)
+            and os.path.exists(os.path.join(self.root_dir, '.git'))
+            and shutil.which('git') is not None
+        )
+
+    def git(self, job, *args, cwd=None, check=True):
+        result = job.run_command(['git'] + list(args), cwd=cwd or self.root_dir, timeout=300, check=check)
+        return result.stdout.strip() if check else result
+
+    def check(self, job):
+
+        """
+        Fetch the tracked branch and return the new commit, or None if up to date.
+        """
+        branch = self.branch or self.git(job, 'rev-parse', '--abbrev-ref', 'HEAD')
+        current = self.git(job, 'rev-parse', 'HEAD')
+        shallow = self.git(job, 'rev-parse', '--is-shallow-repository') == 'true'
+
+        # Shallow clones stay shallow, full clones only receive the missing objects
+        fetch = ['fetch', '--no-tags', self.remote, branch]
+        if shallow:
+            fetch.insert(1, '--depth=1')
+        self.git(job, *fetch)
+        latest = self.git(job, 'rev-parse', 'FETCH_HEAD')
+        if latest == current:
+            return None
+
+        # Never replace local commits that are not part of the remote history
+        if not shallow:
+            if self.git(job, 'merge-base', '--is-ancestor', current, latest, check=False).returncode != 0:
+                raise RuntimeError(f"Local branch has diverged from {self.remote}/{branch}")
+        return latest
+
+    def stage(self, job, commit):
+
+        """
+        Check out the commit in the side directory and verify it.
+        """
+        self.discard(job)
+        self.git(job, 'worktree', 'add', '--detach', self.stage_dir, commit)
+        self.verify(job, self.stage_dir)
+        self.staged_commit = commit
+        return commit
+
+    def verify(self, job, tree):
+
+        # Make sure every Python source of the staged tree compiles
+        entry = os.path.join(tree, 'src', 'PyRDPConnect.py')
+        if not os.path.isfile(entry):
+            raise RuntimeError(f"Staged tree is missing {os.path.relpath(entry, tree)}")
+        for directory, _, files in os.walk(os.path.join(tree, 'src')):
+            for name in files:
+                if name.endswith('.py'):
+                    job.check_cancelled()
+                    path = os.path.join(directory, name)
+                    with open(path, 'rb') as f:
+                        compile(f.read(), path, 'exec')
+
+    def check_and_stage(self, job):
+        commit = self.check(job)
+        if commit is None:
+            return None
+        return self.stage(job, commit)
+
+    def apply(self, job):
+
+        """
+        Swap the verified src of the staged tree into the checkout and move the checkout to the staged commit.
+
+        Everything the client runs is in src, so the exchange of the two src directories is
+        the switch-over. Files outside src follow afterwards. Local changes the update would
+        overwrite stop it before anything is moved.
+        """
+        commit = self.staged_commit
+        if commit is None:
+            raise RuntimeError("No update has been staged")
+
+        # The stage must still be the verified commit, unmodified
+        if self.git(job, 'rev-parse', 'HEAD', cwd=self.stage_dir) != commit or self.git(job, 'status', '--porcelain', cwd=self.stage_dir):
+            raise RuntimeError("Staged tree does not match the staged commit")
+
+        # src is replaced as a whole, other files only where the update changes them
+        current = self.git(job, 'rev-parse', 'HEAD')
+        changed = set(self.git(job, 'diff', '--name-only', current, commit).splitlines())
+        modified = set(self.git(job, 'diff', '--name-only', 'HEAD').splitlines())
+        modified.update(self.git(job, 'ls-files', '--others', '--exclude-standard').splitlines())
+        conflicts = sorted(path for path in modified if path in changed or path.startswith('src/'))
+        if conflicts:
+            raise RuntimeError(f"Local changes would be overwritten by the update: {', '.join(conflicts)}")
+        job.check_cancelled()
+
+        self.exchange(os.path.join(self.root_dir, 'src'), os.path.join(self.stage_dir, 'src'))
+
+        # Point the checkout at the commit, then bring the changed files outside src up to date
+        self.git(job, 'reset', '--quiet', '--mixed', commit)
+        others = [path for path in changed if not path.startswith('src/')]
+        present = set(self.git(job, 'ls-files', '--', *others).splitlines()) if others else set()
+        if present:
+            self.git(job, 'checkout', commit, '--', *sorted(present))
+        for path in set(others) - present:
+            with contextlib.suppress(OSError):
+                os.remove(os.path.join(self.root_dir, path))
+        self.discard(job)
+        return commit
+
+    @staticmethod
+    def exchange(first, second):
+
+        """
+        Exchange two directories, atomically with renameat2 on Linux, with two renames elsewhere.
+        """
+        if sys.platform.startswith('linux'):
+            libc = ctypes.CDLL(None, use_errno=True)
+            renameat2 = getattr(libc, 'renameat2', None)
+            if renameat2 is not None:
+                # AT_FDCWD and RENAME_EXCHANGE
+                if renameat2(-100, os.fsencode(first), -100, os.fsencode(second), 2) == 0:
+                    return
+                error = ctypes.get_errno()
+                if error not in (errno.ENOSYS, errno.EINVAL):
+                    raise OSError(error, os.strerror(error), first)
+
+        # Without an atomic exchange, src is missing between the two renames
+        parked = second + '.old'
+        os.rename(first, parked)
+        try:
+            os.rename(second, first)
+        except OSError:
+            os.rename(parked, first)
+            raise
+        os.rename(parked, second)
+
+    def discard(self, job):
+
+        # Remove a previously staged tree
+        self.staged_commit = None
+        if os.path.exists(self.stage_dir):
+            self.git(job, 'worktree', 'remove', '--force', self.stage_dir, check=False)
+            shutil.rmtree(self.stage_dir, ignore_errors=True)
+        self.git(job, 'worktree', 'prune', check=False)
+
+class InstanceServer(QObject):
+
+    """
+    Local socket owned by the running client, later launches forward their command to it.
+
+    Requests and replies are one JSON object per line, for example {"command": "show"}
+    answered by {"ok": true}. The handler runs in the event loop and returns the reply.
+    """
+
+    max_request = 64 * 1024
+
+    def __init__(self, name, handler, parent=None):
+        super().__init__(parent)
+        self.name = name
+        self.handler = handler
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self.on_new_connection)
+
+    @staticmethod
+    def name_for(root_dir):
+
+        """
+        Socket name of the instance running from root_dir for the current user.
+        """
+        digest = hashlib.sha1(os.path.abspath(root_dir).encode()).hexdigest()[:12]
+        return f"PyRDPConnect-{getpass.getuser()}-{digest}"
+
+    @staticmethod
+    def send(name, request, timeout=1000):
+
+        """
+        Forward a request to the running instance and return its reply, or None if there is none.
+        """
+        socket = QLocalSocket()
+        socket.connectToServer(name)
+        if not socket.waitForConnected(timeout):
+            return None
+        socket.write(json.dumps(request).encode() + b"\n")
+        socket.waitForBytesWritten(timeout)
+        while not socket.canReadLine():
+            if not socket.waitForReadyRead(timeout):
+                return {"ok": False, "error": "No reply from the running instance"}
+        try:
+            return json.loads(bytes(socket.readLine()).decode())
+        except ValueError:
+            return {"ok": False, "error": "Invalid reply from the running instance"}
+        finally:
+            socket.disconnectFromServer()
+
+    def listen(self):
+        if self.server.listen(self.name):
+            return True
+
+        # Remove the socket left behind by a crashed instance, nobody answered on it
+        QLocalServer.removeServer(self.name)
+        if self.server.listen(self.name):
+            return True
+        logger.warning("Single instance socket unavailable: %s", self.server.errorString())
+        return False
+
+    def close(self):
+        self.server.close()
+
+    def on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(lambda socket=socket: self.on_ready_read(socket))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def on_ready_read(self, socket):
+        if not socket.canReadLine():
+            if socket.bytesAvailable() > self.max_request:
+                socket.abort()
+            return
+        try:
+            request = json.loads(bytes(socket.readLine()).decode())
+            if not isinstance(request, dict):
+                raise ValueError("request is not an object")
+            reply = self.handler(request)
+        except ValueError as e:
+            reply = {"ok": False, "error": f"Invalid request: {e}"}
+        except Exception as e:
+            logger.exception("Failed to handle instance request")
+            reply = {"ok": False, "error": str(e)}
+        socket.write(json.dumps(reply).encode() + b"\n")
+        socket.flush()
+        socket.disconnectFromServer()
+
 class ConnectionThread(QThread):
+    connection_established = pyqtSignal()
     connection_success = pyqtSignal()
     connection_failed = pyqtSignal(str)
     stop_thread = False  # Flag to stop the thread
 
-    def __init__(self, command, parent=None):
+    # FreeRDP log lines printed once the session is up
+    established_pattern = re.compile(r"Local framebuffer format|Loading Dynamic Virtual Channel")
+
+    # FreeRDP log lines marking the security handshake, traced when present
+    milestone_patterns = {
+        "tls": re.compile(r"com\.freerdp\.crypto|TLS"),
+        "nla": re.compile(r"com\.freerdp\.core\.nla|NLA|CredSSP"),
+    }
+
+    def __init__(self, command, trace=None, launch_policy=None, parent=None):
         super().__init__(parent)
         self.command = command
+        self.trace = trace or ConnectionTrace(None)
+        self.launch_policy = launch_policy
+        self.freerdp_process = None
 
     def run(self):
         try:
-            # Start the freerdp3 connection as a subprocess
-            self.freerdp_process = subprocess.Popen(
-                self.command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
+            # Apply the session launch policy, FreeRDP inherits the scheduling of this thread
+            command = self.command
+            if self.launch_policy is not None:
+                report = self.launch_policy.apply_session_thread()
+                command, wrap_report = self.launch_policy.wrap_session(command)
+                report.update(wrap_report)
+                if report:
+                    self.trace.annotate("policy", report)
+                    logger.info("Session launch policy: %s", report)
 
-            # Capture output and errors
-            stdout, stderr = self.freerdp_process.communicate()
+            # Start the freerdp3 connection as a subprocess
+            with self.trace.span("spawn"):
+                self.freerdp_process = subprocess.Popen(
+                    command,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    stdin=subprocess.DEVNULL,
+                    text=True
+                )
+
+            # The thread may have been stopped while the process was starting
+            if self.stop_thread:
+                self.freerdp_process.terminate()
+
+            # Follow the output, keeping the tail for error reporting
+            output = collections.deque(maxlen=50)
+            established = False
+            for line in self.freerdp_process.stdout:
+                if not output and self.launch_policy is not None:
+                    # The wrappers have exec'd FreeRDP by its first line of output
+                    self.trace.annotate("policy_effect", LaunchPolicy.effect(self.freerdp_process.pid))
+                output.append(line.rstrip())
+                logger.debug("freerdp: %s", line.rstrip())
+                if not established:
+                    self.trace_milestones(line)
+                if not established and self.established_pattern.search(line):
+                    established = True
+                    self.trace.milestone("established")
+                    self.connection_established.emit()
+            self.freerdp_process.wait()
+            self.trace.milestone("exit")
+            logger.info("FreeRDP exited with code %s", self.freerdp_process.returncode)
 
             # Check if the thread is supposed to stop
             if self.stop_thread:
-                self.freerdp_process.terminate()  # Terminate the subprocess
                 return
 
-            # Check for errors in stderr
+            # Check for errors in the output
             if self.freerdp_process.returncode != 0:
-                error_message = stderr.strip()
+                errors = [line for line in output if "[ERROR]" in line]
+                error_message = "\n".join(errors or list(output)[-1:]).strip()
                 self.connection_failed.emit(error_message)
             else:
                 self.connection_success.emit()
 
         except Exception as e:
             # Emit failed signal with error message if any exception occurs
+            logger.exception("Failed to run FreeRDP")
             self.connection_failed.emit(str(e))
 
+    def trace_milestones(self, line):
+        if "first_output" not in self.trace.spans:
+            self.trace.milestone("first_output")
+        for name, pattern in self.milestone_patterns.items():
+            if name not in self.trace.spans and pattern.search(line):
+                self.trace.milestone(name)
+
     def stop(self):
         # Method to stop the thread
         self.stop_thread = True
         if self.freerdp_process:
             self.freerdp_process.terminate()  # Terminate the subprocess if running
 
+class SessionWidget(QWidget):
+
+    """
+    Native child widget that an embedded FreeRDP session renders into.
+    """
+
+    resized = pyqtSignal()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.resized.emit()
+
 class Client(QMainWindow):
 
+    # Categories read by init_ui to build the login screen
+    login_categories = ("General", "Appearance", "RemoteApp")
+
     def __init__(self):
         super().__init__()
 
@@ -81,28 +2802,46 @@ class Client(QMainWindow):
         # Initialize UI
         self.init_ui()
 
+        # Watch the event loop for blocking calls
+        self.stall_detector.start()
+
+        # Measure the hardware once for the automatic codec
+        self.load_hardware_profile()
+
+        # Probe the server for the status on the login screen
+        self.health_monitor.start()
+        self.update_health_endpoints()
+
+        # Spread the first settings poll over the interval so a fleet does not poll at once
+        self.schedule_sync(initial=True)
+
+        # Check for updates periodically
+        if self.config["Administration"]["Automatic Updates"] and self.updater.is_available():
+            self.update_timer.start()
+            QTimer.singleShot(60 * 1000, self.check_for_updates)
+
+    def closeEvent(self, event):
+
+        # Stop background work before the window goes away
+        if self.instance_server is not None:
+            self.instance_server.close()
+        self.stall_detector.stop()
+        self.health_monitor.stop()
+        self.network_watcher.stop()
+        self.stop_idle_monitor()
+        self.job_runner.cancel_all()
+        super().closeEvent(event)
+
     def get_path(self,path):
 
         """
         Returns the full path to a file if it exists in either the 'src' or 'Resources' directory.
-        Prints a debug message if the file is not found.
+        Logs a warning the first time a file is not found.
 
         :param path: Relative path to the file
         :return: Full path to the file if found, None otherwise
         """
-        # Check the 'src' directory
-        src_path = os.path.join(self.root_dir, 'src', path)
-        if os.path.exists(src_path):
-            return src_path
-
-        # Check the 'Resources' directory
-        resources_path = os.path.join(self.root_dir, 'Resources', path)
-        if os.path.exists(resources_path):
-            return resources_path
-
-        # Debugging message if file is not found
-        print(f"Could not find: [{self.root_dir}] {path}")
-        return None
+        return self.resource_index.lookup(path)
 
     def get_os(self):
         os_name = platform.system()
@@ -127,14 +2866,20 @@ class Client(QMainWindow):
                 "Domain": ""
             },
             "Display": {
-                "Resolution": "",
+                "Resolution": "Automatic",
                 "Use all monitors": False,
+                "Monitors": "",
                 "Start session in fullscreen": False,
-                "Fit session to window": False
+                "Fit session to window": False,
+                "Dynamic resolution": False,
+                "HiDPI": "Native",
+                "Embed session in window": False
             },
             "Audio": {
                 "Play sound": "",
                 "Record sound": "",
+                "Backend": "Automatic",
+                "Profile": "Standard",
             },
             "Devices": {
                 "Printers": False,
@@ -146,15 +2891,20 @@ class Client(QMainWindow):
                 "Redirect": False,
                 "Folders": []
             },
+            "RemoteApp": {
+                "Enabled": False,
+                "Apps": []
+            },
             "Experience": {
                 "Clipboard": False,
-                "RemoteFX": False,
+                "Codec": "Automatic",
                 "Smooth Fonts": False,
                 "Desktop Composition": False,
                 "Full Window Drag": False,
                 "Menu Animations": False,
                 "Disable Themes": False,
                 "Disable Wallpaper": False,
+                "Reconnect on network change": False,
             },
             "Appearance": {
                 "Logo File": "",
@@ -166,29 +2916,74 @@ class Client(QMainWindow):
                 "Fullscreen": False
             },
             "Administration": {
-                "Password": ""
+                "Password": "",
+                "Automatic Updates": False,
+                "Sync URL": "",
+                "Sync Interval": 15,
+                "Log Level": "INFO",
+                "Security Preflight": False,
+                "FreeRDP Client": "Automatic",
+                "Session Nice": 0,
+                "Session IO Class": "Default",
+                "Session CPUs": "",
+                "Session Memory Limit": 0,
+                "Session CPU Limit": 0,
+                "Front-end Nice": 0,
+                "Front-end CPUs": "",
+                "Front-end Memory Limit": 0,
+                "Front-end CPU Limit": 0,
+                "Idle Disconnect": 0,
+                "Idle Warning": 60,
+                "Idle Action": "Disconnect"
             },
         }
+        self.config_defaults = copy.deepcopy(self.config)
 
-        # Load config from file
-        config_dir = os.path.join(self.root_dir, 'config')
+        # Finish a configuration write interrupted by a power loss
+        try:
+            self.config_store.recover()
+        except OSError as e:
+            logger.error("Failed to recover the configuration: %s", e)
 
+        # Load config from file
+        self.saved_config = {}
         for category in self.config.keys():
-            config_path = os.path.join(config_dir, f'{category.lower()}.cfg')
-            if os.path.exists(config_path):
-                with open(config_path, 'r') as f:
-                    category_config = json.load(f)
-
-                    # Loop through each config item and set the config value
-                    for name, value in category_config.items():
-
-                        # Check if the config item exists in the config
-                        if name in self.config[category]:
-                            if isinstance(self.config[category][name], list) and value is None:
-                                # Make sure lists like Folders are not set to None
-                                self.config[category][name] = []
-                            else:
-                                self.config[category][name] = value
+            category_config = self.config_store.read(f'{category.lower()}.cfg')
+            if isinstance(category_config, dict):
+                self.saved_config[category] = category_config
+
+                # Loop through each config item and set the config value
+                for name, value in category_config.items():
+
+                    # Check if the config item exists in the config
+                    if name in self.config[category]:
+                        if isinstance(self.config[category][name], list) and value is None:
+                            # Make sure lists like Folders are not set to None
+                            self.config[category][name] = []
+                        else:
+                            self.config[category][name] = value
+
+        # The RemoteFX checkbox was replaced by the codec selection
+        saved_experience = self.saved_config.get("Experience", {})
+        if saved_experience.get("RemoteFX") and "Codec" not in saved_experience:
+            self.config["Experience"]["Codec"] = "RemoteFX"
+
+        # Earlier versions replaced the saved resolution with the primary screen on every load
+        saved_display = self.saved_config.get("Display", {})
+        if "HiDPI" not in saved_display:
+            self.config["Display"]["Resolution"] = "Automatic"
+            if "Resolution" in saved_display:
+                # load_widgets fills the widgets from the saved values
+                saved_display["Resolution"] = "Automatic"
+
+        # Apply the configured log level
+        self.log_manager.set_level(self.config["Administration"]["Log Level"])
+
+        # Apply the front-end launch policy when its settings changed, the session policy is applied on connect
+        self.launch_policy.configure(self.config["Administration"])
+        report = self.launch_policy.apply_frontend()
+        if report:
+            logger.info("Front-end launch policy: %s", report)
 
         # Check if the custom logo exists in the 'config/' directory
         logo_path = os.path.join(self.root_dir, 'config', 'logo.png')
@@ -204,6 +2999,14 @@ class Client(QMainWindow):
         Load all the widgets including logo selection and preview.
         """
 
+        # Release the widgets of a previous load
+        self.teardown_widgets()
+
+        # Hidden owner of the configuration widgets until they are placed in the dialog
+        self.widgets_owner = QWidget()
+        self.folder_widgets = []
+        self.remote_app_widgets = []
+
         # Initialize QLineEdit for password with echo mode set to Password
         passwordLineEdit = QLineEdit()
         passwordLineEdit.setEchoMode(QLineEdit.Password)
@@ -212,24 +3015,97 @@ class Client(QMainWindow):
         lockLineEdit = QLineEdit()
         lockLineEdit.setEchoMode(QLineEdit.Password)
 
+        # Initialize QSpinBox for the settings sync interval in minutes
+        syncIntervalSpinBox = QSpinBox()
+        syncIntervalSpinBox.setRange(1, 1440)
+        syncIntervalSpinBox.setSuffix(" min")
+        syncIntervalSpinBox.setValue(self.config["Administration"]["Sync Interval"])
+
+        # Initialize QSpinBoxes for the idle session disconnect, 0 keeps idle sessions
+        idleDisconnectSpinBox = QSpinBox()
+        idleDisconnectSpinBox.setRange(0, 1440)
+        idleDisconnectSpinBox.setSuffix(" min")
+        idleDisconnectSpinBox.setSpecialValueText("Never")
+        idleDisconnectSpinBox.setValue(self.config["Administration"]["Idle Disconnect"])
+        idleWarningSpinBox = QSpinBox()
+        idleWarningSpinBox.setRange(0, 600)
+        idleWarningSpinBox.setSuffix(" s")
+        idleWarningSpinBox.setValue(self.config["Administration"]["Idle Warning"])
+        idleActionComboBox = QComboBox()
+        idleActionComboBox.addItems(["Disconnect", "Log off"])
+        idleActionComboBox.setCurrentText(self.config["Administration"]["Idle Action"])
+
+        # Initialize log level combo box
+        logLevelComboBox = QComboBox()
+        logLevelComboBox.addItems(["DEBUG", "INFO", "WARNING", "ERROR"])
+        logLevelComboBox.setCurrentText(self.config["Administration"]["Log Level"])
+
+        # Initialize the launch policy widgets for the session and the front-end
+        policyWidgets = {}
+        for prefix in ("Session", "Front-end"):
+            niceSpinBox = QSpinBox()
+            niceSpinBox.setRange(-20, 19)
+            niceSpinBox.setValue(self.config["Administration"][f"{prefix} Nice"])
+            cpusLineEdit = QLineEdit()
+            cpusLineEdit.setPlaceholderText("All, or a list such as 0-2,4")
+            memorySpinBox = QSpinBox()
+            memorySpinBox.setRange(0, 1048576)
+            memorySpinBox.setSingleStep(128)
+            memorySpinBox.setSuffix(" MB")
+            memorySpinBox.setSpecialValueText("Unlimited")
+            memorySpinBox.setValue(self.config["Administration"][f"{prefix} Memory Limit"])
+            cpuSpinBox = QSpinBox()
+            cpuSpinBox.setRange(0, 100 * (os.cpu_count() or 1))
+            cpuSpinBox.setSingleStep(25)
+            cpuSpinBox.setSuffix(" %")
+            cpuSpinBox.setSpecialValueText("Unlimited")
+            cpuSpinBox.setValue(self.config["Administration"][f"{prefix} CPU Limit"])
+            policyWidgets[prefix] = {
+                f"{prefix} Nice": niceSpinBox,
+                f"{prefix} CPUs": cpusLineEdit,
+                f"{prefix} Memory Limit": memorySpinBox,
+                f"{prefix} CPU Limit": cpuSpinBox,
+            }
+        ioClassComboBox = QComboBox()
+        ioClassComboBox.addItems(LaunchPolicy.io_classes.keys())
+        ioClassComboBox.setCurrentText(self.config["Administration"]["Session IO Class"])
+        policyWidgets["Session"]["Session IO Class"] = ioClassComboBox
+
+        # Initialize FreeRDP front-end combo box
+        freerdpClientComboBox = QComboBox()
+        freerdpClientComboBox.addItems(["Automatic"] + list(FreeRDPClients.flavours))
+        freerdpClientComboBox.setCurrentText(self.config["Administration"]["FreeRDP Client"])
+
+        # Initialize codec combo box
+        codecComboBox = QComboBox()
+        codecComboBox.addItems(HardwareProfile.codecs)
+        codecComboBox.setCurrentText(self.config["Experience"]["Codec"])
+
         # Initialize QSpinBox for port with default value and range
         portSpinBox = QSpinBox()
         portSpinBox.setRange(1, 65535)
         portSpinBox.setValue(self.config["General"]["Port"])
 
-        # Get current screen resolution
-        screenResolution = QApplication.desktop().screenGeometry()
-        currentResolution = f"{screenResolution.width()}x{screenResolution.height()}"
-        self.config["Display"]["Resolution"] = currentResolution
-
-        # Initialize resolution combo box with common resolutions
+        # Initialize resolution combo box with common resolutions, Automatic follows the screen of the window
         resolutionComboBox = QComboBox()
-        commonResolutions = ["800x600", "1024x768", "1280x720", "1366x768", "1920x1080", "3840x2160"]
+        currentResolution = self.config["Display"]["Resolution"] or "Automatic"
+        commonResolutions = ["Automatic", "800x600", "1024x768", "1280x720", "1366x768", "1920x1080", "3840x2160"]
         if currentResolution not in commonResolutions:
-            commonResolutions.insert(0, currentResolution)
+            commonResolutions.insert(1, currentResolution)
         resolutionComboBox.addItems(commonResolutions)
         resolutionComboBox.setCurrentText(currentResolution)
 
+        # Initialize the monitor selection, listing the monitors of the cached layout
+        monitorsLineEdit = QLineEdit()
+        monitorsLineEdit.setPlaceholderText("All, or e.g. 0,1")
+        monitorsLineEdit.setToolTip(self.get_screen_layout().describe())
+        monitorsLineEdit.setText(self.config["Display"]["Monitors"])
+
+        # Initialize HiDPI combo box
+        hidpiComboBox = QComboBox()
+        hidpiComboBox.addItems(ScreenLayout.hidpi_modes)
+        hidpiComboBox.setCurrentText(self.config["Display"]["HiDPI"])
+
         # Initialize sound options combo box
         playSoundComboBox = QComboBox()
         playSoundOptions = ["Never", "On this computer", "On the remote computer"]
@@ -242,6 +3118,14 @@ class Client(QMainWindow):
         recordSoundComboBox.addItems(recordSoundOptions)
         recordSoundComboBox.setCurrentText(self.config["Audio"]["Record sound"])
 
+        # Initialize audio backend and profile combo boxes
+        audioBackendComboBox = QComboBox()
+        audioBackendComboBox.addItems(("Automatic",) + AudioBackends.backends)
+        audioBackendComboBox.setCurrentText(self.config["Audio"]["Backend"])
+        audioProfileComboBox = QComboBox()
+        audioProfileComboBox.addItems(AudioBackends.profiles)
+        audioProfileComboBox.setCurrentText(self.config["Audio"]["Profile"])
+
         # Initialize login and logo positions
         positionsOptions = ["top-left", "top-center", "top-right", "center-left", "center-center", "center-right", "bottom-left", "bottom-center", "bottom-right"]
         loginPositionComboBox = QComboBox()
@@ -261,6 +3145,21 @@ class Client(QMainWindow):
         self.folder_add_button.clicked.connect(self.select_folder)
         self.folder_list_layout = QVBoxLayout()
 
+        # Initialize the RemoteApp catalogue editor
+        self.remote_app_add_row = QWidget()
+        remote_app_add_layout = QHBoxLayout(self.remote_app_add_row)
+        remote_app_add_layout.setContentsMargins(0, 0, 0, 0)
+        self.remote_app_name_edit = QLineEdit()
+        self.remote_app_name_edit.setPlaceholderText("Name")
+        self.remote_app_program_edit = QLineEdit()
+        self.remote_app_program_edit.setPlaceholderText("||alias or program path")
+        remote_app_add_button = QPushButton("Add App")
+        remote_app_add_button.clicked.connect(self.add_remote_app)
+        remote_app_add_layout.addWidget(self.remote_app_name_edit)
+        remote_app_add_layout.addWidget(self.remote_app_program_edit)
+        remote_app_add_layout.addWidget(remote_app_add_button)
+        self.remote_app_list_layout = QVBoxLayout()
+
         # Add "Update" button in the Administration tab
         self.update_button = QPushButton("Update")
         self.update_button.clicked.connect(self.update_application)
@@ -273,6 +3172,10 @@ class Client(QMainWindow):
         self.export_button = QPushButton("Export")
         self.export_button.clicked.connect(self.export_settings)
 
+        # Add "Import Connections" button for .rdp, RDCMan and CSV connection lists
+        self.import_connections_button = QPushButton("Import Connections")
+        self.import_connections_button.clicked.connect(self.import_connections)
+
         # Initialize widgets dictionary
         self.widgets = {
             "General": {
@@ -285,12 +3188,18 @@ class Client(QMainWindow):
             "Display": {
                 "Resolution": resolutionComboBox,
                 "Use all monitors": QCheckBox(),
+                "Monitors": monitorsLineEdit,
                 "Start session in fullscreen": QCheckBox(),
                 "Fit session to window": QCheckBox(),
+                "Dynamic resolution": QCheckBox(),
+                "HiDPI": hidpiComboBox,
+                "Embed session in window": QCheckBox(),
             },
             "Audio": {
                 "Play sound": playSoundComboBox,
                 "Record sound": recordSoundComboBox,
+                "Backend": audioBackendComboBox,
+                "Profile": audioProfileComboBox,
             },
             "Devices": {
                 "Printers": QCheckBox(),
@@ -302,15 +3211,20 @@ class Client(QMainWindow):
                 "Redirect": QCheckBox(),
                 "Folders": [],
             },
+            "RemoteApp": {
+                "Enabled": QCheckBox(),
+                "Apps": [],
+            },
             "Experience": {
                 "Clipboard": QCheckBox(),
-                "RemoteFX": QCheckBox(),
+                "Codec": codecComboBox,
                 "Smooth Fonts": QCheckBox(),
                 "Desktop Composition": QCheckBox(),
                 "Full Window Drag": QCheckBox(),
                 "Menu Animations": QCheckBox(),
                 "Disable Themes": QCheckBox(),
                 "Disable Wallpaper": QCheckBox(),
+                "Reconnect on network change": QCheckBox(),
             },
             "Appearance": {
                 "Logo File": self.logo_file_button,
@@ -323,41 +3237,195 @@ class Client(QMainWindow):
             },
             "Administration": {
                 "Password": lockLineEdit,
+                "Automatic Updates": QCheckBox(),
+                "Sync URL": QLineEdit(),
+                "Sync Interval": syncIntervalSpinBox,
+                "Log Level": logLevelComboBox,
+                "Security Preflight": QCheckBox(),
+                "FreeRDP Client": freerdpClientComboBox,
+                "Session Nice": policyWidgets["Session"]["Session Nice"],
+                "Session IO Class": policyWidgets["Session"]["Session IO Class"],
+                "Session CPUs": policyWidgets["Session"]["Session CPUs"],
+                "Session Memory Limit": policyWidgets["Session"]["Session Memory Limit"],
+                "Session CPU Limit": policyWidgets["Session"]["Session CPU Limit"],
+                "Front-end Nice": policyWidgets["Front-end"]["Front-end Nice"],
+                "Front-end CPUs": policyWidgets["Front-end"]["Front-end CPUs"],
+                "Front-end Memory Limit": policyWidgets["Front-end"]["Front-end Memory Limit"],
+                "Front-end CPU Limit": policyWidgets["Front-end"]["Front-end CPU Limit"],
+                "Idle Disconnect": idleDisconnectSpinBox,
+                "Idle Warning": idleWarningSpinBox,
+                "Idle Action": idleActionComboBox,
                 "Update": self.update_button,
                 "Import": self.import_button,
                 "Export": self.export_button,
+                "Import Connections": self.import_connections_button,
             },
         }
 
-        # Load configuration files and set widget values
-        config_dir = os.path.join(self.root_dir, 'config')
-        for category in self.widgets.keys():
-            config_path = os.path.join(config_dir, f'{category.lower()}.cfg')
-            if os.path.exists(config_path):
-                with open(config_path, 'r') as f:
-                    category_config = json.load(f)
-                    for name, value in category_config.items():
-                        widget = self.get_widget_from_config(category, name)
-                        if widget:
-                            self.set_widget_value(widget, value)
+        # Give every widget an explicit owner so teardown_widgets can release them
+        self.folder_add_button.setParent(self.widgets_owner)
+        self.remote_app_add_row.setParent(self.widgets_owner)
+        for settings in self.widgets.values():
+            for widget in settings.values():
+                if isinstance(widget, QWidget):
+                    widget.setParent(self.widgets_owner)
+
+        # Set widget values from the configuration files read by load_config
+        for category, category_config in self.saved_config.items():
+            for name, value in category_config.items():
+                widget = self.get_widget_from_config(category, name)
+                if widget:
+                    self.set_widget_value(widget, value)
+
+        # Remember the loaded values to detect unsaved changes
+        self.config_tracker.snapshot(self.collect_config())
+
+    def teardown_widgets(self):
+
+        """
+        Delete the configuration widgets, their dialogs and the folder rows created by load_widgets.
+        """
+        for name in ('configurations_dialog', 'prompt_dialog', 'widgets_owner'):
+            widget = getattr(self, name, None)
+            if widget is not None:
+                widget.hide()
+                widget.deleteLater()
+            setattr(self, name, None)
+
+        # Forget references into the deleted widget tree
+        for name in ('logo_file_button', 'logo_layout', 'logo_row', 'save_button', 'adminPasswordLineEdit'):
+            if hasattr(self, name):
+                delattr(self, name)
+        self.folder_widgets = []
+        self.remote_app_widgets = []
+
+        # Discard a logo selection that was never saved
+        if hasattr(self, 'selected_logo_file'):
+            del self.selected_logo_file
 
     def init_properties(self):
 
         # Set class properties
         # Get the directory of the script
-        if getattr(sys, 'frozen', False):
-            # we are running in a bundle
-            self.script_dir = os.path.dirname(sys.executable)
-        else:
-            # we are running in a normal Python environment
-            self.script_dir = os.path.dirname(os.path.abspath(__file__))
+        self.script_dir = get_script_dir()
 
         # Get the root directory of the script
         self.root_dir = os.path.dirname(self.script_dir)
 
+        # Background logging to logs/
+        self.log_manager = LogManager.instance(os.path.join(self.root_dir, 'logs'))
+
+        # Scheduling and resource limits of the front-end and the sessions, applied by load_config
+        self.launch_policy = LaunchPolicy()
+
+        # Index of the assets in the 'src' and 'Resources' directories
+        self.resource_index = ResourceIndex([os.path.join(self.root_dir, 'src'), os.path.join(self.root_dir, 'Resources')])
+
         # Get the icon directory for the window
         self.icon_path = self.get_path(os.path.join('icons', "play-fill.ico"))
 
+        # Background job runner for external commands
+        self.job_runner = JobRunner(self)
+
+        # Transactional configuration storage
+        self.config_store = ConfigStore(os.path.join(self.root_dir, 'config'))
+
+        # Unsaved configuration changes
+        self.config_tracker = ConfigTracker(self)
+        self.config_tracker.dirty_changed.connect(self.schedule_save_button_update)
+        self.save_button_update_pending = False
+
+        # Event loop stall detector
+        self.stall_detector = StallDetector(parent=self)
+
+        # Cache of FreeRDP versions by binary path
+        self.freerdp_versions = {}
+
+        # Hardware profile for the automatic codec, see load_hardware_profile
+        self.hardware_profile = None
+        self.hardware_job = None
+
+        # Reachability of redirected folders
+        self.path_validator = PathValidator()
+        self.connection_thread = None
+        self.connection_trace = None
+        self.session_widget = None
+        self.login_widget = None
+
+        # Login fields, only created by init_ui for the settings that are not configured
+        self.username_edit = None
+        self.password_edit = None
+        self.domain_edit = None
+        self.server_edit = None
+        self.port_edit = None
+
+        # Monitor layout, captured again after a screen was added, removed or changed
+        self.screen_layout = None
+        self.freerdp_monitors = {}
+        QApplication.instance().screenAdded.connect(self.on_screen_added)
+        QApplication.instance().screenRemoved.connect(self.invalidate_screen_layout)
+        QApplication.instance().primaryScreenChanged.connect(self.invalidate_screen_layout)
+        for screen in QApplication.screens():
+            self.on_screen_added(screen)
+
+        # Embedded sessions follow the window size once the resizing settles
+        self.session_resize_timer = QTimer(self)
+        self.session_resize_timer.setSingleShot(True)
+        self.session_resize_timer.setInterval(250)
+        self.session_resize_timer.timeout.connect(self.resize_embedded_session)
+        self.freerdp_clients = None
+        self.freerdp_flavour = None
+        self.audio_backend = None
+        self.network_watcher = NetworkWatcher(parent=self)
+        self.network_watcher.network_changed.connect(self.on_network_changed)
+        self.network_route = None
+        self.network_address = None
+        self.network_recovery = None
+        self.remote_app = None
+        self.remote_app_sessions = {}
+        self.remote_app_session_key = None
+        self.remote_app_threads = {}
+        self.import_job = None
+        self.import_dialog = None
+
+        # Idle session reclamation, polled while a session is running
+        self.idle_source = None
+        self.idle_job = None
+        self.idle_warning = None
+        self.idle_dismissed = None
+        self.idle_reclaims = {"sessions": 0, "session_seconds": 0, "logged_off": 0}
+        self.logoff_job = None
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setInterval(5000)
+        self.idle_timer.timeout.connect(self.check_idle)
+        self.connection_hosts = None
+        self.security_preflight = None
+        self.prepare_job = None
+
+        # Single instance socket, see start_instance_server
+        self.instance_server = None
+
+        # Reachability of the server shown on the login screen
+        self.health_monitor = HealthMonitor(parent=self)
+        self.health_monitor.health_changed.connect(self.on_health_changed)
+        self.health = {}
+        self.health_pixmaps = {}
+        self.health_icon = None
+        self.health_label = None
+
+        # Settings sync with a jittered poll timer
+        self.sync_job = None
+        self.sync_timer = QTimer(self)
+        self.sync_timer.setSingleShot(True)
+        self.sync_timer.timeout.connect(self.sync_settings)
+
+        # Background updater with a periodic check
+        self.updater = Updater(self.root_dir)
+        self.update_job = None
+        self.update_timer = QTimer(self)
+        self.update_timer.setInterval(6 * 60 * 60 * 1000)
+        self.update_timer.timeout.connect(self.check_for_updates)
+
     def init_window(self):
 
         # Set window title and icon
@@ -464,6 +3532,8 @@ class Client(QMainWindow):
                         self.server_edit = QLineEdit(central_widget)
                         self.server_edit.setPlaceholderText("Server Address")
                         self.server_edit.returnPressed.connect(self.connect_to_server)
+                        self.server_edit.editingFinished.connect(self.update_health_endpoints)
+                        self.set_server_completer()
                         form_layout.addRow(self.server_edit)
 
                         # Add the newly created QLineEdit to the list
@@ -534,10 +3604,36 @@ class Client(QMainWindow):
             self.shutdown_button.clicked.connect(self.shutdown_system)
             buttons_layout.addWidget(self.shutdown_button)
 
+        # Add a tile per published app, launched instead of a full desktop
+        if self.config["RemoteApp"]["Enabled"] and self.config["RemoteApp"]["Apps"]:
+            tiles_layout = QGridLayout()
+            tiles_layout.setSpacing(10)
+            for index, app in enumerate(self.config["RemoteApp"]["Apps"]):
+                tile = QPushButton(f" {app['name']}", central_widget)
+                tile.setObjectName("RemoteAppBTN")
+                self.set_svg_icon(tile, self.get_path(os.path.join("icons/play-fill.svg")))
+                tile.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Expanding)
+                tile.clicked.connect(lambda checked, app=app: self.launch_remote_app(app))
+                tiles_layout.addWidget(tile, index // 3, index % 3)
+            form_layout.addRow(tiles_layout)
+
         # Add buttons to view
         form_layout.addRow(button_layout)
         form_layout.addRow(buttons_layout)
 
+        # Add the server status, updated by the health monitor
+        health_layout = QHBoxLayout()
+        health_layout.setSpacing(5)
+        health_layout.setContentsMargins(0, 10, 0, 0)
+        self.health_icon = QLabel(central_widget)
+        self.health_label = QLabel(central_widget)
+        self.health_label.setObjectName("healthLabel")
+        health_layout.addWidget(self.health_icon)
+        health_layout.addWidget(self.health_label)
+        health_layout.addStretch()
+        form_layout.addRow(health_layout)
+        self.show_health()
+
         # After all widgets have been created, set the tab order based on the list
         for i in range(len(tab_order_widgets) - 1):
             self.setTabOrder(tab_order_widgets[i], tab_order_widgets[i + 1])
@@ -589,6 +3685,13 @@ class Client(QMainWindow):
             widget.setValue(value)
 
     def set_svg_icon(self, button, svg_path, size=(18, 18)):
+        # Convert QPixmap to QIcon and set it to the button
+        pixmap = self.render_svg(svg_path, size)
+        icon = QIcon(pixmap)
+        button.setIcon(icon)
+        button.setIconSize(pixmap.size())
+
+    def render_svg(self, svg_path, size=(18, 18)):
         # Load SVG file
         renderer = QSvgRenderer(svg_path)
 
@@ -597,14 +3700,10 @@ class Client(QMainWindow):
         pixmap.fill(Qt.transparent)  # Fill the pixmap with transparent color
 
         # Paint the SVG onto the QPixmap
-        painter = QPainter(pixmap)
-        renderer.render(painter)
-        painter.end()
-
-        # Convert QPixmap to QIcon and set it to the button
-        icon = QIcon(pixmap)
-        button.setIcon(icon)
-        button.setIconSize(pixmap.size())
+        painter = QPainter(pixmap)
+        renderer.render(painter)
+        painter.end()
+        return pixmap
 
     def calculate_position(self, position_string):
         position_map = {
@@ -624,6 +3723,9 @@ class Client(QMainWindow):
         """
         Reset the UI by reloading configurations and resetting the widgets.
         """
+        # Pick up assets and FreeRDP installations that changed on disk
+        self.resource_index.refresh()
+        self.freerdp_clients = None
         # Reload configuration settings
         self.load_config()
         # Reload widgets
@@ -632,16 +3734,30 @@ class Client(QMainWindow):
         self.clear_ui()
         # Reinitialize the UI with updated configurations
         self.init_ui()
+        # Probe the configured server again
+        self.update_health_endpoints()
+        # Measure the hardware if the automatic codec was just selected
+        if self.hardware_profile is None:
+            self.load_hardware_profile()
+        # Restart into a staged update now that no session is active
+        QTimer.singleShot(0, self.apply_pending_update)
+        # Start polling when the settings sync was just configured
+        if not self.sync_timer.isActive() and self.sync_job is None:
+            self.schedule_sync(initial=True)
 
     def clear_ui(self):
         """
         Clear existing UI components.
         """
-        central_widget = self.centralWidget()
+        central_widget = self.takeCentralWidget()
         if central_widget is not None:
             # Delete the central widget and its children
             central_widget.deleteLater()
 
+        # Forget the login fields owned by the central widget
+        for name in ('username_edit', 'password_edit', 'domain_edit', 'server_edit', 'port_edit', 'health_icon', 'health_label'):
+            setattr(self, name, None)
+
     def restart_system(self):
         # Confirm with the user
         reply = QMessageBox.question(self, 'System Restart',
@@ -649,13 +3765,15 @@ class Client(QMainWindow):
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
 
         if reply == QMessageBox.Yes:
-            try:
-                if sys.platform == "win32":
-                    subprocess.run(["shutdown", "/r", "/t", "0"], check=True)
-                else:
-                    subprocess.run(["sudo", "shutdown", "-r", "now"], check=True)
-            except subprocess.CalledProcessError as e:
-                QMessageBox.critical(self, "Error", f"Failed to restart the system: {e}")
+            if sys.platform == "win32":
+                command = ["shutdown", "/r", "/t", "0"]
+            else:
+                command = ["sudo", "shutdown", "-r", "now"]
+            self.job_runner.run_command(
+                command,
+                check=True,
+                on_failed=lambda e: QMessageBox.critical(self, "Error", f"Failed to restart the system: {e}")
+            )
 
     def shutdown_system(self):
         # Confirm with the user
@@ -664,13 +3782,15 @@ class Client(QMainWindow):
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
 
         if reply == QMessageBox.Yes:
-            try:
-                if sys.platform == "win32":
-                    subprocess.run(["shutdown", "/s", "/t", "0"], check=True)
-                else:
-                    subprocess.run(["sudo", "shutdown", "-h", "now"], check=True)
-            except subprocess.CalledProcessError as e:
-                QMessageBox.critical(self, "Error", f"Failed to shutdown the system: {e}")
+            if sys.platform == "win32":
+                command = ["shutdown", "/s", "/t", "0"]
+            else:
+                command = ["sudo", "shutdown", "-h", "now"]
+            self.job_runner.run_command(
+                command,
+                check=True,
+                on_failed=lambda e: QMessageBox.critical(self, "Error", f"Failed to shutdown the system: {e}")
+            )
 
     def launch_prompt(self):
 
@@ -681,6 +3801,10 @@ class Client(QMainWindow):
             self.launch_configurations()
         else:
 
+            # Replace a previous password prompt
+            if self.prompt_dialog is not None:
+                self.prompt_dialog.deleteLater()
+
             # Create a password prompt
             self.prompt_dialog = QDialog(self)
             self.prompt_dialog.setWindowModality(Qt.WindowModal)
@@ -726,16 +3850,20 @@ class Client(QMainWindow):
 
         if folder_dialog.exec_():
             selected_folder = folder_dialog.selectedFiles()[0]
+            if "," in selected_folder:
+                QMessageBox.warning(self, "Folders", "FreeRDP cannot redirect a folder whose path contains a comma.")
+                return
             folder_data = {"path": selected_folder, "enabled": True}
             self.config["Folders"]["Folders"].append(folder_data)
             self.add_folder_to_list(folder_data)
 
             # Call on_configuration_changed to highlight the Save button
-            self.on_configuration_changed()
+            self.on_configuration_changed("Folders", "Folders")
 
     def add_folder_to_list(self, folder_data):
-        folder_widget = QWidget()
+        folder_widget = QWidget(self.widgets_owner)
         folder_layout = QHBoxLayout(folder_widget)
+        self.folder_widgets.append(folder_widget)
 
         # Add the folder path label
         folder_label = QLabel(folder_data["path"])
@@ -757,23 +3885,62 @@ class Client(QMainWindow):
         # Add the folder widget to the list layout
         self.folder_list_layout.addWidget(folder_widget)
 
-        # Call on_configuration_changed to highlight the Save button
-        self.on_configuration_changed()
-
     def update_folder_enabled(self, folder_data, state):
         folder_data["enabled"] = bool(state)
         # Call on_configuration_changed to highlight the Save button
-        self.on_configuration_changed()
+        self.on_configuration_changed("Folders", "Folders")
 
     def remove_folder(self, folder_widget, folder_data):
 
         # Remove the folder from the list
         self.folder_list_layout.removeWidget(folder_widget)
+        self.folder_widgets.remove(folder_widget)
         folder_widget.deleteLater()
         self.config["Folders"]["Folders"].remove(folder_data)
 
         # Call on_configuration_changed to highlight the Save button
-        self.on_configuration_changed()
+        self.on_configuration_changed("Folders", "Folders")
+
+    def add_remote_app(self):
+        name = self.remote_app_name_edit.text().strip()
+        program = self.remote_app_program_edit.text().strip()
+        if not name or not program:
+            return
+        app_data = {"name": name, "program": program, "args": ""}
+        self.config["RemoteApp"]["Apps"].append(app_data)
+        self.add_remote_app_to_list(app_data)
+        self.remote_app_name_edit.clear()
+        self.remote_app_program_edit.clear()
+
+        # Call on_configuration_changed to highlight the Save button
+        self.on_configuration_changed("RemoteApp", "Apps")
+
+    def add_remote_app_to_list(self, app_data):
+        app_widget = QWidget(self.widgets_owner)
+        app_layout = QHBoxLayout(app_widget)
+        self.remote_app_widgets.append(app_widget)
+
+        # Add the app name and program
+        app_layout.addWidget(QLabel(f"{app_data['name']} ({app_data['program']})"))
+
+        # Add a delete button
+        delete_button = QPushButton("Delete")
+        delete_button.clicked.connect(lambda: self.remove_remote_app(app_widget, app_data))
+        app_layout.addWidget(delete_button)
+
+        # Add the app widget to the list layout
+        self.remote_app_list_layout.addWidget(app_widget)
+
+    def remove_remote_app(self, app_widget, app_data):
+
+        # Remove the app from the catalogue
+        self.remote_app_list_layout.removeWidget(app_widget)
+        self.remote_app_widgets.remove(app_widget)
+        app_widget.deleteLater()
+        self.config["RemoteApp"]["Apps"].remove(app_data)
+
+        # Call on_configuration_changed to highlight the Save button
+        self.on_configuration_changed("RemoteApp", "Apps")
 
     def find_widget_index(layout, widget):
         for row in range(layout.rowCount()):
@@ -796,7 +3963,7 @@ class Client(QMainWindow):
             # Remove the existing button
             self.logo_file_button.deleteLater()
 
-        self.logo_file_button = QPushButton("Select Logo File")
+        self.logo_file_button = QPushButton("Select Logo File", self.widgets_owner)
         self.config["Appearance"]["Logo File"] = logo_file
         self.update_logo_button(logo_file)  # Update with the new logo
         self.logo_file_button.clicked.connect(self.select_logo_file)
@@ -805,6 +3972,10 @@ class Client(QMainWindow):
         self.logo_file_button.setFixedSize(88, 96)  # Set button size (72px image + 4px padding on each side)
         self.logo_file_button.setStyleSheet("padding: 4px;")  # Apply 4px padding to the button
 
+        # Keep the widgets dictionary pointing at the current button
+        if hasattr(self, 'widgets'):
+            self.widgets["Appearance"]["Logo File"] = self.logo_file_button
+
         # Check if logo_layout and logo_row exist and reset the row
         if hasattr(self, 'logo_layout') and hasattr(self, 'logo_row'):
 
@@ -829,10 +4000,10 @@ class Client(QMainWindow):
                 self.logo_file_button.setIconSize(scaled_pixmap.size())
                 self.logo_file_button.setText("")  # Clear text, only show image
             else:
-                print(f"Failed to load logo: {logo_file}")
+                logger.warning("Failed to load logo: %s", logo_file)
                 self.logo_file_button.setText("Invalid Logo File")
         else:
-            print(f"File not found: {logo_file}")
+            logger.warning("File not found: %s", logo_file)
             self.logo_file_button.setText("Select Logo File")  # Fallback if no valid file
 
         # Force repaint
@@ -854,19 +4025,209 @@ class Client(QMainWindow):
                 self.selected_logo_file = os.path.join(selected_file)
                 # Update the button to reflect the new logo preview
                 self.gen_logo_button(self.selected_logo_file)
-                self.on_configuration_changed()  # Mark as configuration changed
+                self.on_configuration_changed("Appearance", "Logo File")  # Mark as configuration changed
 
     def update_application(self):
-        try:
-            subprocess.run(['git', 'pull'], check=True, cwd=self.root_dir)
-            QMessageBox.information(self, "Update", "Application updated successfully. Restarting...")
-            QApplication.quit()
-            subprocess.run([sys.executable] + sys.argv)
-        except subprocess.CalledProcessError as e:
-            QMessageBox.critical(self, "Error", f"Failed to update the application: {e}")
+
+        # Check for an update in the background, the restart happens once the client is idle
+        if not self.updater.is_available():
+            QMessageBox.critical(self, "Error", "Updates are only available for git installations.")
+            return
+        if self.update_job is not None:
+            return
+        self.update_button.setEnabled(False)
+        self.update_job = self.job_runner.run(
+            self.updater.check_and_stage,
+            on_result=lambda commit: self.on_update_staged(commit, True),
+            on_failed=lambda e: self.on_update_failed(e, True)
+        )
+
+    def check_for_updates(self):
+
+        # Periodic silent update check
+        if self.update_job is not None or self.updater.staged_commit is not None:
+            self.apply_pending_update()
+            return
+        self.update_job = self.job_runner.run(
+            self.updater.check_and_stage,
+            on_result=lambda commit: self.on_update_staged(commit, False),
+            on_failed=lambda e: self.on_update_failed(e, False)
+        )
+
+    def on_update_staged(self, commit, interactive):
+        self.update_job = None
+        self.update_button.setEnabled(True)
+        if interactive:
+            if commit is None:
+                QMessageBox.information(self, "Update", "The application is already up to date.")
+                return
+            QMessageBox.information(self, "Update", "Update downloaded. The application will restart when no session is active.")
+        if commit is not None:
+            logger.info("Update staged: %s", commit)
+            self.apply_pending_update()
+
+    def on_update_failed(self, error_message, interactive):
+        self.update_job = None
+        self.update_button.setEnabled(True)
+        if interactive:
+            QMessageBox.critical(self, "Error", f"Failed to update the application: {error_message}")
+        else:
+            logger.warning("Failed to check for updates: %s", error_message)
+
+    def schedule_sync(self, initial=False):
+
+        # Poll the settings source with a jittered interval
+        if not self.config["Administration"]["Sync URL"]:
+            self.sync_timer.stop()
+            return
+        interval = max(1, self.config["Administration"]["Sync Interval"]) * 60
+        delay = random.uniform(0, interval) if initial else interval * random.uniform(0.8, 1.2)
+        self.sync_timer.start(int(delay * 1000))
+
+    def sync_settings(self):
+        url = self.config["Administration"]["Sync URL"]
+        if not url or self.sync_job is not None:
+            return
+        config_sync = ConfigSync(url, os.path.join(self.config_store.config_dir, 'sync'), self.config_defaults)
+        self.sync_job = self.job_runner.run(
+            config_sync.poll,
+            on_result=lambda result: self.on_sync_result(config_sync, result),
+            on_failed=self.on_sync_failed
+        )
+
+    def on_sync_result(self, config_sync, result):
+        self.sync_job = None
+
+        # Leave the bundle cached until nobody is using the client
+        if result is not None and self.is_idle():
+            try:
+                self.apply_imported_settings(result["bundle"])
+            except Exception as e:
+                # Drop the partly applied values and do not retry this bundle
+                logger.error("Failed to apply settings bundle %s: %s", result['sha256'], e)
+                config_sync.mark_rejected(result["sha256"])
+                self.reset_ui()
+                self.schedule_sync()
+                return
+            changed = set(self.config_tracker.dirty_categories())
+            try:
+                self.write_config()
+            except OSError as e:
+                # Drop the unsaved values, the cached bundle is applied again on the next poll
+                logger.error("Failed to save settings bundle %s: %s", result['sha256'], e)
+                self.reset_ui()
+            else:
+                config_sync.mark_applied(result["sha256"])
+                logger.info("Applied settings bundle %s", result['sha256'])
+
+                # The widgets already show the bundle, only the login screen may need rebuilding
+                if changed.intersection(self.login_categories):
+                    self.reset_ui()
+                else:
+                    self.load_config()
+        self.schedule_sync()
+
+    def on_sync_failed(self, error_message):
+        self.sync_job = None
+        logger.warning("Settings sync failed: %s", error_message)
+        self.schedule_sync()
+
+    def connection_in_progress(self):
+        if self.prepare_job is not None or self.logoff_job is not None:
+            return True
+        return self.connection_thread is not None and self.connection_thread.isRunning()
+
+    def is_idle(self):
+
+        """
+        Whether the client can restart without disturbing the user.
+        """
+        if self.connection_in_progress():
+            return False
+        if self.configurations_dialog is not None and self.configurations_dialog.isVisible():
+            return False
+        for name in ('username_edit', 'password_edit', 'domain_edit', 'server_edit', 'port_edit'):
+            widget = getattr(self, name, None)
+            if widget is not None and widget.text():
+                return False
+        return True
+
+    def start_instance_server(self):
+
+        """
+        Make this process the single instance that later launches forward their commands to.
+        """
+        self.instance_server = InstanceServer(InstanceServer.name_for(self.root_dir), self.handle_instance_command, self)
+        return self.instance_server.listen()
+
+    def handle_instance_command(self, request):
+
+        """
+        Run a command forwarded by another launch or a management agent and return the reply.
+        """
+        command = request.get("command")
+        logger.info("Instance command: %s", command)
+        if command == "show":
+            self.show_window()
+        elif command == "status":
+            return {
+                "ok": True,
+                "connected": self.connection_in_progress(),
+                "session": self.log_manager.session_id,
+                "idle": self.is_idle(),
+                "reclaimed": dict(self.idle_reclaims),
+            }
+        elif command == "reload-config":
+            if self.connection_in_progress() or (self.configurations_dialog is not None and self.configurations_dialog.isVisible()):
+                return {"ok": False, "error": "Busy, the configuration is in use"}
+            self.reset_ui()
+        elif command == "connect":
+            if self.connection_in_progress():
+                return {"ok": False, "error": "A connection is already in progress"}
+            if request.get("server"):
+                # Only for this attempt, reset_ui reloads the configuration afterwards
+                self.config["General"]["Server Address"] = str(request["server"])
+            self.show_window()
+            self.connect_to_server()
+        else:
+            return {"ok": False, "error": f"Unknown command: {command}"}
+        return {"ok": True}
+
+    def show_window(self):
+        if self.config['Appearance']['Fullscreen']:
+            self.showFullScreen()
+        else:
+            self.showNormal()
+        self.raise_()
+        self.activateWindow()
+
+    def apply_pending_update(self):
+
+        # Switch to the staged update once the client is idle
+        if self.updater.staged_commit is None or self.update_job is not None or not self.is_idle():
+            return
+        self.update_job = self.job_runner.run(
+            self.updater.apply,
+            on_result=self.on_update_applied,
+            on_failed=lambda e: self.on_update_failed(e, False)
+        )
+
+    def on_update_applied(self, commit):
+
+        # Replace the running process with the updated application, src now holds the new tree
+        logger.info("Updated to %s, restarting", commit)
+        self.stall_detector.stop()
+        self.job_runner.cancel_all()
+        script = os.path.join(self.script_dir, os.path.basename(sys.argv[0]))
+        os.execv(sys.executable, [sys.executable, script] + sys.argv[1:])
 
     def launch_configurations(self):
 
+        # Reuse the dialog while its widgets are current
+        if self.configurations_dialog is not None:
+            self.configurations_dialog.show()
+            return
+
         # Create a password prompt
         self.configurations_dialog = QDialog(self)
         self.configurations_dialog.setWindowModality(Qt.WindowModal)
@@ -902,23 +4263,30 @@ class Client(QMainWindow):
                         for folder in self.config["Folders"]["Folders"]:
                             self.add_folder_to_list(folder)
                         layout.addRow(self.folder_list_layout)
+                    elif name == "Apps":
+                        layout.addRow(QLabel(name), self.remote_app_add_row)
+                        for app in self.config["RemoteApp"]["Apps"]:
+                            self.add_remote_app_to_list(app)
+                        layout.addRow(self.remote_app_list_layout)
                 else:
                     layout.addRow(QLabel(name), widget)
 
                 # Connect signals for widget changes
+                changed = lambda *args, category=category, name=name: self.on_configuration_changed(category, name)
                 if isinstance(widget, QLineEdit):
-                    widget.textChanged.connect(self.on_configuration_changed)
+                    widget.textChanged.connect(changed)
                 elif isinstance(widget, QCheckBox):
-                    widget.stateChanged.connect(self.on_configuration_changed)
+                    widget.stateChanged.connect(changed)
                 elif isinstance(widget, QComboBox):
-                    widget.currentTextChanged.connect(self.on_configuration_changed)
+                    widget.currentTextChanged.connect(changed)
                 elif isinstance(widget, QSpinBox):
-                    widget.valueChanged.connect(self.on_configuration_changed)
+                    widget.valueChanged.connect(changed)
 
             self.configurations_tab_widget.addTab(tab, category)
 
         # Save Button
         self.save_button = QPushButton("Save")
+        self.save_button.setObjectName("saveButton")
         self.save_button.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Expanding)
         self.configurations_layout.addWidget(self.save_button)
         self.save_button.clicked.connect(self.save_config)
@@ -931,60 +4299,114 @@ class Client(QMainWindow):
         # show the dialog
         self.configurations_dialog.show()
 
-    def on_configuration_changed(self):
+    def on_configuration_changed(self, category=None, name=None):
+
+        """
+        Compare the changed setting with the saved configuration. Without a key every setting is compared.
+        """
+        if category is None:
+            self.config_tracker.refresh(self.collect_config())
+        else:
+            self.config_tracker.update(category, name, self.get_config_value(category, name))
+
+    def schedule_save_button_update(self):
+
+        # Restyle the save button at most once per event loop iteration
+        if not self.save_button_update_pending:
+            self.save_button_update_pending = True
+            QTimer.singleShot(0, self.update_save_button)
+
+    def update_save_button(self):
+        self.save_button_update_pending = False
+        if not hasattr(self, 'save_button'):
+            return
+
+        # Only recompute the stylesheet when the state actually flips
+        object_name = "unsavedChanges" if self.config_tracker.is_dirty() else "saveButton"
+        if self.save_button.objectName() != object_name:
+            self.save_button.setObjectName(object_name)  # Change object name to apply new style
+            self.save_button.style().unpolish(self.save_button)  # Unpolish to clear the existing styling
+            self.save_button.style().polish(self.save_button)  # Re-apply the stylesheet
+            self.save_button.update()  # Update the button's appearance
+
+    def collect_config(self):
+
+        """
+        Return the configuration as currently shown by the widgets, keyed by category.
+        """
+        return {
+            category: {name: self.get_config_value(category, name) for name in settings}
+            for category, settings in self.widgets.items()
+        }
 
-        # Change background color of the save button to highlight
-        self.save_button.setObjectName("unsavedChanges")  # Change object name to apply new style
-        self.save_button.style().unpolish(self.save_button)  # Unpolish to clear the existing styling
-        self.save_button.style().polish(self.save_button)  # Re-apply the stylesheet
-        self.save_button.update()  # Update the button's appearance
+    def get_config_value(self, category, name):
+        value = self.widgets[category][name]
+        if name == "Folders":
+            # Save the folders list from self.config
+            return copy.deepcopy(self.config["Folders"]["Folders"])
+        elif name == "Apps":
+            # Save the RemoteApp catalogue from self.config
+            return copy.deepcopy(self.config["RemoteApp"]["Apps"])
+        elif category == "Appearance" and name == "Logo File":
+            # The logo is only saved when a new file was selected
+            return getattr(self, 'selected_logo_file', None)
+        elif isinstance(value, dict):
+            # For nested settings like in "Redirect" under "Devices"
+            return {sub_name: self.get_widget_value(sub_widget) for sub_name, sub_widget in value.items()}
+        else:
+            return self.get_widget_value(value)
 
     def save_config(self):
 
         """
-        Save the current configuration, including the logo file path.
+        Save the current configuration and reload the UI with it.
         """
+        try:
+            self.write_config()
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to save the configuration: {e}")
+            return
 
-        # Ensure the configuration directory exists
-        config_dir = os.path.join(self.root_dir, 'config')
-        if not os.path.exists(config_dir):
-            os.makedirs(config_dir)
+        # hide the dialog
+        if self.configurations_dialog is not None:
+            self.configurations_dialog.hide()
 
-        # Iterate over the widgets to save settings
-        for category, settings in self.widgets.items():
-            category_config = {}
-            for name, value in settings.items():
-                if name == "Folders":
-                    # Save the folders list from self.config
-                    category_config[name] = self.config["Folders"]["Folders"]
-                elif isinstance(value, dict):
-                    # For nested settings like in "Redirect" under "Devices"
-                    category_config[name] = {sub_name: self.get_widget_value(sub_widget) for sub_name, sub_widget in value.items()}
-                else:
-                    category_config[name] = self.get_widget_value(value)
+        # Reset the UI, this also releases the dialog and its widgets
+        self.reset_ui()
+
+    def write_config(self):
+
+        """
+        Write the changed categories of the configuration, including the logo file path.
+
+        :raises OSError: When the configuration could not be written, nothing is changed then
+        """
+        config_dir = self.config_store.config_dir
+        dirty_categories = self.config_tracker.dirty_categories()
+        files = {}
+
+        # Serialise the changed categories and those without a readable file
+        for category, category_config in self.collect_config().items():
+            file_name = f'{category.lower()}.cfg'
+            if category not in dirty_categories and category in self.saved_config:
+                continue
 
             # Ensure the default logo is saved if no file is selected
-            if category == "Appearance" and "Logo File" in category_config:
-                if hasattr(self, 'selected_logo_file'):
-                    if os.path.isfile(self.selected_logo_file):
-                        shutil.copyfile(self.selected_logo_file, os.path.join(config_dir, 'logo.png'))
-                        category_config["Logo File"] = os.path.join(config_dir, 'logo.png')
-
-            config_path = os.path.join(config_dir, f'{category.lower()}.cfg')
-            with open(config_path, 'w') as f:
-                json.dump(category_config, f)
-
-        # Reset background color of the save button to default
-        self.save_button.setObjectName("saveButton")  # Change object name back to default
-        self.save_button.style().unpolish(self.save_button)  # Unpolish to clear the unsaved styling
-        self.save_button.style().polish(self.save_button)  # Re-apply the stylesheet
-        self.save_button.update()  # Update the button's appearance
-
-        # Reset the UI
-        self.reset_ui()
+            if category == "Appearance" and category_config.get("Logo File"):
+                if os.path.isfile(self.selected_logo_file):
+                    with open(self.selected_logo_file, 'rb') as f:
+                        files['logo.png'] = f.read()
+                    category_config["Logo File"] = os.path.join(config_dir, 'logo.png')
+                else:
+                    category_config["Logo File"] = None
 
-        # hide the dialog
-        self.configurations_dialog.hide()
+            files[file_name] = json.dumps(category_config).encode()
+
+        # Write the changed files as a single transaction
+        self.config_store.commit(files)
+
+        # The saved values are the new reference for unsaved changes
+        self.config_tracker.snapshot(self.collect_config())
 
     def import_settings(self):
         try:
@@ -1007,38 +4429,7 @@ class Client(QMainWindow):
                     imported_data = json.load(f)
 
                 # Fill the fields with imported data, but don't save yet
-                for category, settings in imported_data.items():
-                    if category in self.config:
-                        for name, value in settings.items():
-                            widget = self.get_widget_from_config(category, name)
-                            if widget:
-                                self.set_widget_value(widget, value)
-                            else:
-                                # Update config dictionary for non-UI items like logo, folders, etc.
-                                self.config[category][name] = value
-
-                # Handle the imported logo if it exists (base64 encoded)
-                logo_data = imported_data["Appearance"]["Logo File"]
-                if isinstance(logo_data, dict) and "content" in logo_data and "filename" in logo_data:
-                    logo_content = base64.b64decode(logo_data["content"])
-                    logo_path = os.path.join(config_dir, "import.png")
-
-                    # Save the decoded logo to the config directory as import.png
-                    with open(logo_path, "wb") as logo_file:
-                        logo_file.write(logo_content)
-
-                    # Update the path to the newly imported logo
-                    self.config["Appearance"]["Logo File"] = logo_path
-
-                    # Store the selected logo file path but don't save it yet
-                    self.selected_logo_file = os.path.join(logo_path)
-
-                    # Update the button to reflect the imported logo preview
-                    print("FILE:",logo_path)
-                    self.gen_logo_button(logo_path)
-
-                # Mark as configuration changed
-                self.on_configuration_changed()
+                self.apply_imported_settings(imported_data)
 
                 # Notify the user to save the changes
                 QMessageBox.information(self, "Import Complete", "Settings successfully imported. Press 'Save' to apply changes.")
@@ -1046,12 +4437,156 @@ class Client(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to import settings: {e}")
 
+    def import_connections(self):
+
+        """
+        Import .rdp files, RDCMan files and CSV lists into config/connections.jsonl in the background.
+        """
+        if self.import_job is not None:
+            return
+        paths, _ = QFileDialog.getOpenFileNames(self, "Import Connections", "", "Connections (*.rdp *.rdg *.csv);;All Files (*)")
+        if not paths:
+            return
+        self.start_connection_import(paths)
+
+    def start_connection_import(self, paths):
+        self.import_dialog = QProgressDialog("Importing connections...", "Cancel", 0, 0, self)
+        self.import_dialog.setWindowModality(Qt.WindowModal)
+        self.import_dialog.setMinimumDuration(500)
+        self.import_dialog.canceled.connect(self.cancel_connection_import)
+        self.import_job = self.job_runner.run(
+            self.run_connection_import,
+            paths,
+            on_result=self.on_connections_imported,
+            on_failed=self.on_connections_imported,
+            on_progress=self.on_connection_import_progress
+        )
+
+    def run_connection_import(self, job, paths):
+        importer = ConnectionImporter(self.config_store.config_dir)
+        stats = importer.run(paths, progress=lambda stats: job.job_progress.emit(json.dumps(stats)), cancelled=lambda: job.cancelled)
+        logger.info("Imported connections: %s", stats)
+        return stats
+
+    def on_connection_import_progress(self, message):
+        if self.import_dialog is not None:
+            stats = json.loads(message)
+            self.import_dialog.setLabelText(f"Importing connections... {stats['files']} files, {stats['imported']} imported")
+
+    def cancel_connection_import(self):
+        if self.import_job is not None:
+            # Connections written before the cancel are kept
+            self.import_job.cancel()
+            self.import_job = None
+            self.connection_hosts = None
+        if self.import_dialog is not None:
+            self.import_dialog.deleteLater()
+            self.import_dialog = None
+
+    def on_connections_imported(self, result):
+        if self.import_job is None:
+            return
+        self.import_job = None
+        self.connection_hosts = None
+        self.import_dialog.hide()
+        self.import_dialog.deleteLater()
+        self.import_dialog = None
+        if isinstance(result, dict):
+            QMessageBox.information(self, "Import Complete",
+                f"Imported {result['imported']} connections from {result['files']} files, "
+                f"skipped {result['duplicates']} duplicates and {result['errors']} unreadable files.")
+            self.set_server_completer()
+        else:
+            QMessageBox.critical(self, "Error", f"Failed to import connections: {result}")
+
+    def set_server_completer(self):
+
+        """
+        Offer the imported connections in the server field, read again when the file changed.
+        """
+        if getattr(self, 'server_edit', None) is None:
+            return
+        path = os.path.join(self.config_store.config_dir, ConnectionImporter.file_name)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return
+        if self.connection_hosts is None or self.connection_hosts[0] != mtime:
+            hosts = dict.fromkeys(record["General"]["Server Address"] for record in ConnectionImporter.read(path))
+            self.connection_hosts = (mtime, list(hosts))
+        completer = QCompleter(self.connection_hosts[1], self.server_edit)
+        completer.setCaseSensitivity(Qt.CaseInsensitive)
+        completer.setFilterMode(Qt.MatchContains)
+        completer.activated.connect(self.apply_imported_connection)
+        self.server_edit.setCompleter(completer)
+
+    def apply_imported_connection(self, host):
+
+        """
+        Use the settings of an imported connection for the next attempt, reset_ui reloads the configuration afterwards.
+        """
+        path = os.path.join(self.config_store.config_dir, ConnectionImporter.file_name)
+        record = next((record for record in ConnectionImporter.read(path) if record["General"]["Server Address"] == host), None)
+        if record is None:
+            return
+        for name, edit in (("Username", self.username_edit), ("Domain", self.domain_edit)):
+            if edit is not None and not edit.text() and record["General"].get(name):
+                edit.setText(record["General"][name])
+        if record["General"].get("Port"):
+            if self.port_edit is not None:
+                self.port_edit.setText(str(record["General"]["Port"]))
+            else:
+                self.config["General"]["Port"] = record["General"]["Port"]
+        for category in ("Display", "Audio", "Devices", "Experience"):
+            self.config[category].update({name: value for name, value in record.get(category, {}).items() if name in self.config[category]})
+        self.update_health_endpoints()
+
+    def apply_imported_settings(self, imported_data):
+
+        """
+        Fill the widgets and configuration with imported settings without saving them.
+        """
+        config_dir = self.config_store.config_dir
+        os.makedirs(config_dir, exist_ok=True)
+
+        for category, settings in imported_data.items():
+            if category in self.config:
+                for name, value in settings.items():
+                    widget = self.get_widget_from_config(category, name)
+                    if widget:
+                        self.set_widget_value(widget, value)
+                    else:
+                        # Update config dictionary for non-UI items like logo, folders, etc.
+                        self.config[category][name] = value
+
+        # Handle the imported logo if it exists (base64 encoded)
+        logo_data = imported_data.get("Appearance", {}).get("Logo File")
+        if isinstance(logo_data, dict) and "content" in logo_data and "filename" in logo_data:
+            logo_content = base64.b64decode(logo_data["content"])
+            logo_path = os.path.join(config_dir, "import.png")
+
+            # Save the decoded logo to the config directory as import.png
+            with open(logo_path, "wb") as logo_file:
+                logo_file.write(logo_content)
+
+            # Update the path to the newly imported logo
+            self.config["Appearance"]["Logo File"] = logo_path
+
+            # Store the selected logo file path but don't save it yet
+            self.selected_logo_file = os.path.join(logo_path)
+
+            # Update the button to reflect the imported logo preview
+            self.gen_logo_button(logo_path)
+
+        # Mark as configuration changed
+        self.on_configuration_changed()
+
     def export_settings(self):
         try:
             # Collect all current settings
             export_data = {}
             for category, settings in self.config.items():
-                export_data[category] = settings
+                export_data[category] = dict(settings)
 
             # Handle the custom logo (convert to base64)
             logo_file_path = self.config["Appearance"].get("Logo File", "")
@@ -1079,9 +4614,45 @@ class Client(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to export settings: {e}")
 
+    def load_hardware_profile(self):
+
+        """
+        Load the stored hardware profile, or measure it in the background if the hardware changed.
+        """
+        if self.config["Experience"]["Codec"] != "Automatic" or self.hardware_job is not None:
+            return
+        profile = self.config_store.read(HardwareProfile.file_name)
+        if HardwareProfile.is_current(profile):
+            self.hardware_profile = profile
+            return
+        self.hardware_job = self.job_runner.run(
+            lambda job: HardwareProfile.measure(),
+            on_result=self.on_hardware_measured,
+            on_failed=self.on_hardware_failed
+        )
+
+    def on_hardware_measured(self, profile):
+        self.hardware_job = None
+        self.hardware_profile = profile
+        logger.info("Measured hardware profile: %s cores, %.0f fps, %s", profile["cores"], profile["fps"], profile["model"])
+        try:
+            self.config_store.commit({HardwareProfile.file_name: json.dumps(profile).encode()})
+        except OSError as e:
+            logger.warning("Failed to store the hardware profile: %s", e)
+
+    def on_hardware_failed(self, error_message):
+        self.hardware_job = None
+        logger.warning("Failed to measure the hardware profile: %s", error_message)
+
     def get_freerdp_version(self, freerdp_path):
+
+        """
+        Return the cached FreeRDP version of a binary, see prepare_connection.
+        """
+        return self.freerdp_versions.get(freerdp_path)
+
+    def parse_freerdp_version(self, result):
         try:
-            result = subprocess.run([freerdp_path, '+version'], capture_output=True, text=True)
             version_line = result.stdout.splitlines()[0].strip()  # Get the first line of the output
             version_parts = version_line.split()  # Split the line into words
             if len(version_parts) > 4:  # Check if the version string is present
@@ -1091,20 +4662,37 @@ class Client(QMainWindow):
             else:
                 return None
         except Exception as e:
-            print(f"Error retrieving FreeRDP version: {e}")
+            logger.warning("Error retrieving FreeRDP version: %s", e)
             return None
 
-    def get_printers(self):
+    def get_printers(self, on_result):
 
+        """
+        Retrieve the list of (printer, driver) pairs in the background and pass it to on_result.
+        """
         if self.get_os() == "macos":
 
             # Run the lpstat -p command to get the list of printers
+            return self.job_runner.run_command(
+                ['lpstat', '-p'],
+                timeout=10,
+                parse=self.parse_printers,
+                on_result=on_result,
+                on_failed=lambda e: on_result([])
+            )
+        # elif self.get_os() == "linux":
+        else:
+            on_result([])
+            return None
+
+    def parse_printers(self, result):
+
+        if self.get_os() == "macos":
             try:
-                result = subprocess.run(['lpstat', '-p'], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
 
                 # Check if the command executed successfully
                 if result.returncode != 0:
-                    print("Failed to run lpstat command. Error:", result.stderr)
+                    logger.warning("Failed to run lpstat command. Error: %s", result.stderr)
                     return []
 
                 # Initialize a list to store printer and driver pairs
@@ -1128,15 +4716,14 @@ class Client(QMainWindow):
                         else:
                             printers.append((printer_name, None))  # No PPD file found, driver is None
 
-                # Debugging: Print the list of printers found
-                print("Printers found:", printers)
+                # Debugging: Log the list of printers found
+                logger.debug("Printers found: %s", printers)
 
                 return printers
 
             except Exception as e:
-                print(f"An error occurred: {e}")
+                logger.exception("Failed to list printers: %s", e)
                 return []
-        # elif self.get_os() == "linux":
         else:
             return []
 
@@ -1154,18 +4741,144 @@ class Client(QMainWindow):
                             driver_name = line.split(':', 1)[1].strip().strip('"')
                             return driver_name
             except Exception as e:
-                print(f"Error reading PPD file {ppd_file}: {e}")
+                logger.warning("Error reading PPD file %s: %s", ppd_file, e)
                 return None
         else:
             return None
 
+    def get_freerdp_path(self):
+
+        # Allow pointing the client at another FreeRDP binary
+        if os.environ.get("PYRDPCONNECT_FREERDP"):
+            return os.environ["PYRDPCONNECT_FREERDP"]
+
+        # Find the installed front-ends once, the bundled ones are only shipped for macOS
+        if self.freerdp_clients is None:
+            bundled_dirs = []
+            if self.get_os() == "macos":
+                bundled_dirs = [os.path.join(base_dir, 'freerdp', 'macos') for base_dir in self.resource_index.base_dirs]
+            self.freerdp_clients = FreeRDPClients.discover(bundled_dirs)
+            logger.info("FreeRDP clients: %s", self.freerdp_clients or "none found")
+
+        # Pick the front-end for the display server, embedding needs one that can reparent its window
+        display = FreeRDPClients.display_server()
+        features = ("embed",) if self.config["Display"]["Embed session in window"] else ()
+        self.freerdp_flavour = FreeRDPClients.choose(display, self.freerdp_clients, self.config["Administration"]["FreeRDP Client"], features)
+        if self.freerdp_flavour is None:
+            return "xfreerdp"
+        return self.freerdp_clients[self.freerdp_flavour]
+
+    def freerdp_supports(self, feature):
+
+        """
+        Whether the chosen FreeRDP front-end has a feature, assumed for binaries set by environment.
+        """
+        if self.freerdp_flavour is None:
+            return True
+        return feature in FreeRDPClients.flavours[self.freerdp_flavour]["features"]
+
+    def get_screen_layout(self):
+
+        """
+        Return the monitor layout, captured once until the screens change.
+        """
+        if self.screen_layout is None:
+            self.screen_layout = ScreenLayout.capture()
+            logger.debug("Screen layout: %s", self.screen_layout.monitors)
+        return self.screen_layout
+
+    def on_screen_added(self, screen):
+        screen.geometryChanged.connect(self.invalidate_screen_layout)
+        screen.logicalDotsPerInchChanged.connect(self.invalidate_screen_layout)
+        self.invalidate_screen_layout()
+
+    def invalidate_screen_layout(self, *args):
+        self.screen_layout = None
+        self.freerdp_monitors = {}
+
+    def gen_display_options(self, freerdp_path):
+
+        """
+        Return the size, monitor and scaling options of a desktop session, and record the pixels it transfers.
+
+        The session covers the selected monitors, the screen of the window, or the session
+        widget when embedded. An explicit resolution replaces the size of that area.
+        """
+        display = self.config["Display"]
+        layout = self.get_screen_layout()
+        hidpi = display["HiDPI"]
+        resolution = "" if display["Resolution"] in ("", "Automatic") else display["Resolution"]
+        smart_sizing = display["Fit session to window"] and self.freerdp_supports("smart-sizing")
+        options = []
+
+        # The monitor of the window, the primary one before the window is shown
+        screen = self.windowHandle().screen() if self.windowHandle() is not None else None
+        monitor = layout.monitors[layout.find(screen.name()) if screen is not None else 0] if layout.monitors else None
+        monitors = [monitor] if monitor is not None else []
+
+        if display["Use all monitors"] and self.freerdp_supports("multimon") and self.session_widget is None:
+            indexes = layout.select(display["Monitors"])
+            monitors = [layout.monitors[index] for index in indexes]
+            options.append("/multimon")
+            if display["Monitors"].strip():
+                ids = layout.freerdp_ids(indexes, self.freerdp_monitors.get(freerdp_path, {}))
+                options.append(f"/monitors:{','.join(str(monitor_id) for monitor_id in ids)}")
+
+            # FreeRDP cannot stretch a desktop spanning monitors, a logical resolution is sent as a scaled desktop
+            if hidpi != "Native" and monitors:
+                options.extend(layout.scale_options(monitors[0]))
+            size = None
+            pixels = sum(monitor["width"] * monitor["height"] for monitor in monitors)
+        else:
+            scale = monitor["scale"] if monitor is not None else 1
+            if self.session_widget is not None:
+                ratio = self.session_widget.devicePixelRatioF()
+                width, height = round(self.session_widget.width() * ratio), round(self.session_widget.height() * ratio)
+            elif monitor is not None:
+                width, height = monitor["width"], monitor["height"]
+            else:
+                width, height = 0, 0
+
+            # A logical resolution is stretched to the panel by FreeRDP instead of being transferred at full size
+            if resolution:
+                width, height = (int(value) for value in resolution.split("x"))
+            elif hidpi == "Logical resolution" and scale > 1 and self.freerdp_supports("smart-sizing"):
+                width, height = round(width / scale), round(height / scale)
+                smart_sizing = True
+            elif hidpi == "Scale desktop" and monitor is not None:
+                options.extend(layout.scale_options(monitor))
+            size = f"{width}x{height}" if width and height else None
+            if size:
+                options.append(f"/size:{size}")
+            pixels = width * height
+
+        if display["Start session in fullscreen"] and self.session_widget is None:
+            options.append("/f")
+
+        # FreeRDP refuses smart sizing together with dynamic resolution, a logical resolution keeps the smart sizing
+        dynamic = display["Dynamic resolution"] and not (smart_sizing and hidpi == "Logical resolution" and not resolution)
+        if display["Dynamic resolution"] and not dynamic:
+            logger.info("Dynamic resolution is not used with a logical resolution, FreeRDP stretches the desktop instead")
+        if dynamic:
+            options.append("/dynamic-resolution")
+        elif smart_sizing:
+            options.append("/smart-sizing")
+
+        if self.connection_trace is not None:
+            self.connection_trace.annotate("screen", {
+                "monitors": [f"{monitor['name']} {monitor['width']}x{monitor['height']}@{monitor['scale']}" for monitor in monitors],
+                "hidpi": hidpi,
+                "size": size,
+                "pixels": pixels,
+                "panel_pixels": sum(monitor["width"] * monitor["height"] for monitor in monitors),
+                "dynamic": dynamic,
+            })
+        return options
+
     def gen_command(self):
 
         # Get the path to the bundled xfreerdp
-        if self.get_os() == "macos":
-            freerdp_path = self.get_path('freerdp/'+self.get_os()+'/xfreerdp')
-        else:
-            freerdp_path = "xfreerdp"
+        freerdp_path = self.get_freerdp_path()
 
         # Get FreeRDP version
         freerdp_version = self.get_freerdp_version(freerdp_path)
@@ -1182,10 +4895,6 @@ class Client(QMainWindow):
         general_username = self.config["General"]["Username"] or self.username_edit.text()
         general_password = self.config["General"]["Password"] or self.password_edit.text()
         general_domain = self.config["General"]["Domain"] or self.domain_edit.text()
-        display_resolution = self.config["Display"]["Resolution"]
-        display_use_all_monitors = self.config["Display"]["Use all monitors"]
-        display_fullscreen = self.config["Display"]["Start session in fullscreen"]
-        display_fit_window = self.config["Display"]["Fit session to window"]
         audio_play_sound = self.config["Audio"]["Play sound"]
         audio_record_sound = self.config["Audio"]["Record sound"]
         devices_printers = self.config["Devices"]["Printers"]
@@ -1195,7 +4904,7 @@ class Client(QMainWindow):
         folders_redirect = self.config["Folders"]["Redirect"]
         folders_folders = self.config["Folders"]["Folders"]
         experience_clipboard = self.config["Experience"]["Clipboard"]
-        experience_remotefx = self.config["Experience"]["RemoteFX"]
+        experience_codec = self.config["Experience"]["Codec"]
         experience_smooth_fonts = self.config["Experience"]["Smooth Fonts"]
         experience_desktop_composition = self.config["Experience"]["Desktop Composition"]
         experience_full_window_drag = self.config["Experience"]["Full Window Drag"]
@@ -1219,22 +4928,32 @@ class Client(QMainWindow):
         if general_password:
             command.append(f"/p:{general_password}")
 
-        # Add display settings
-        if display_resolution:
-            command.append(f"/size:{display_resolution}")
-        if display_use_all_monitors:
-            command.append("/multimon")
-        if display_fullscreen:
-            command.append("/f")
-        if display_fit_window:
-            command.append("/smart-sizing")
-
-        # Add Audio settings
+        # Add display settings, a RemoteApp opens windows of its own and an embedded session fills the session widget
+        if self.remote_app is not None:
+            app = self.remote_app
+            if major_version and major_version < 3:
+                command.append(f"/app:{app['program']}")
+                command.append(f"/app-name:{app['name']}")
+                if app.get("args"):
+                    command.append(f"/app-cmd:{app['args']}")
+            else:
+                options = f"program:{app['program']},name:{app['name']}"
+                if app.get("args"):
+                    options += f",cmd:{app['args']}"
+                command.append(f"/app:{options}")
+        else:
+            if self.session_widget is not None:
+                command.append(f"/parent-window:{int(self.session_widget.winId())}")
+            command.extend(self.gen_display_options(freerdp_path))
+
+        # Add Audio settings, local playback and recording use the backend checked by prepare_connection
+        audio_backend = self.audio_backend
+        audio_profile = self.config["Audio"]["Profile"]
         if major_version and major_version < 3:
             if audio_play_sound == "Never":
                 command.append("/sound:off")
             elif audio_play_sound == "On this computer":
-                command.append("/sound:sys:alsa")
+                command.append(f"/sound:{AudioBackends.options(audio_backend or 'ALSA', audio_profile, 'playback')}")
             elif audio_play_sound == "On the remote computer":
                 command.append("/sound:sys:rdpsnd")
         else:
@@ -1243,8 +4962,23 @@ class Client(QMainWindow):
                 command.append("/audio-mode:2")
             elif audio_play_sound == "On this computer":
                 command.append("/audio-mode:0")
+                if audio_backend:
+                    command.append(f"/sound:{AudioBackends.options(audio_backend, audio_profile, 'playback')}")
             elif audio_play_sound == "On the remote computer":
                 command.append("/audio-mode:1")
+        if audio_record_sound == "On this computer" and audio_backend:
+            command.append(f"/microphone:{AudioBackends.options(audio_backend, audio_profile, 'microphone')}")
+
+        # Add Folder redirection, skipping folders that failed validation
+        if folders_redirect:
+            drive_names = set()
+            for folder in folders_folders:
+                if folder.get("enabled") and "," in folder["path"]:
+                    # FreeRDP splits the option at commas and would share the wrong path
+                    logger.warning("Skipping folder %s, FreeRDP cannot redirect a path containing a comma", folder["path"])
+                elif folder.get("enabled") and self.path_validator.is_reachable(folder["path"]):
+                    drive_name = self.get_drive_name(folder["path"], drive_names)
+                    command.append(f"/drive:{drive_name},{folder['path']}")
 
         # Add Devices Settings
         if devices_printers:
@@ -1266,8 +5000,10 @@ class Client(QMainWindow):
         # Add Experiance Settings
         if experience_clipboard:
             command.append("+clipboard")
-        if experience_remotefx:
-            command.append("/rfx")
+        if experience_codec == "Automatic" and self.hardware_profile:
+            experience_codec = HardwareProfile.choose_codec(self.hardware_profile)
+            logger.info("Selected the %s codec for %.0f fps on %s cores", experience_codec, self.hardware_profile["fps"], self.hardware_profile["cores"])
+        command.extend(HardwareProfile.codec_options(experience_codec, major_version))
         if experience_smooth_fonts:
             command.append("+fonts")
         if experience_desktop_composition:
@@ -1280,6 +5016,12 @@ class Client(QMainWindow):
             command.append("-themes")
         if experience_disable_wallpaper:
             command.append("-wallpaper")
+        if self.config["Experience"]["Reconnect on network change"]:
+            # Covers drops without a local network change, the watcher handles the others
+            command.extend(["+auto-reconnect", "/auto-reconnect-max-retries:20"])
+
+        # Security protocol selected by the preflight
+        command.extend(security_flags(self.security_preflight))
 
         # Ignore Certificate
         if major_version and major_version < 3:
@@ -1287,14 +5029,80 @@ class Client(QMainWindow):
         else:
             command.append("/cert:ignore")
 
-        # Debugging: Print the final command
-        print(f"Generated freerdp({freerdp_version}) command:")
-        print(" ".join(command))
+        # Debugging: Log the final command without its secrets
+        logger.info("Generated freerdp(%s) command: %s", freerdp_version, " ".join(redact_command(command)))
 
         return command
 
+    def get_drive_name(self, path, used_names):
+
+        # Derive a unique share name from the folder name
+        base_name = re.sub(r'[^A-Za-z0-9_-]', '_', os.path.basename(os.path.normpath(path))) or "Folder"
+        drive_name = base_name
+        index = 2
+        while drive_name.lower() in used_names:
+            drive_name = f"{base_name}_{index}"
+            index += 1
+        used_names.add(drive_name.lower())
+        return drive_name
+
+    def get_server_endpoint(self):
+
+        """
+        Return the (server, port) to connect to, from the configuration or the login form.
+        """
+        server_edit = getattr(self, 'server_edit', None)
+        server = self.config["General"]["Server Address"] or (server_edit.text().strip() if server_edit else "")
+        return server, self.config["General"]["Port"] or 3389
+
+    def update_health_endpoints(self):
+        server, port = self.get_server_endpoint()
+        self.health_monitor.set_endpoints([(server, port)] if server else [])
+        self.show_health()
+
+    def on_health_changed(self, key, result):
+        self.health[key] = result
+        self.show_health()
+
+    def show_health(self):
+
+        # The labels only exist on the login screen
+        if self.health_icon is None:
+            return
+        server, port = self.get_server_endpoint()
+        if not server:
+            self.health_icon.hide()
+            self.health_label.hide()
+            return
+        result = self.health.get(HealthMonitor.endpoint_key(server, port))
+
+        # Map the latency to the reception icons
+        if result is None:
+            level, text = 0, "Checking server..."
+        elif not result["reachable"]:
+            level, text = 0, "Server unreachable"
+        else:
+            latency = result["latency"]
+            level = 4 if latency < 50 else 3 if latency < 150 else 2 if latency < 400 else 1
+            text = f"Server reachable ({latency:.0f} ms)"
+        if level not in self.health_pixmaps:
+            self.health_pixmaps[level] = self.render_svg(self.get_path(f"icons/reception-{level}.svg"))
+        self.health_icon.setPixmap(self.health_pixmaps[level])
+        self.health_label.setText(text)
+        self.health_icon.show()
+        self.health_label.show()
+
     def connect_to_server(self):
 
+        # The log off of an idle session would also end a new logon to it
+        if self.logoff_job is not None:
+            QMessageBox.information(self, "Session", "The previous session is being logged off, try again in a moment.")
+            return
+
+        # Release the dialog of the previous attempt
+        if getattr(self, 'connection_dialog', None) is not None:
+            self.connection_dialog.deleteLater()
+
         # Create a "connecting" message and a spinner
         self.connection_dialog = QProgressDialog("Connecting to server...", "Cancel", 0, 0, self)
         self.connection_dialog.setWindowModality(Qt.WindowModal)
@@ -1318,43 +5126,659 @@ class Client(QMainWindow):
 
     def connect(self):
 
+        # Tag the log records and the trace of this attempt with a new session ID
+        session_id = self.log_manager.begin_session()
+        self.connection_trace = ConnectionTrace(session_id)
+
+        # Resolve the settings of this attempt
+        with self.connection_trace.span("config"):
+            server, port = self.get_server_endpoint()
+            freerdp_path = self.get_freerdp_path()
+            folders = []
+            if self.config["Folders"]["Redirect"]:
+                folders = [folder["path"] for folder in self.config["Folders"]["Folders"] if folder.get("enabled")]
+            local_audio = self.get_os() == "linux" and "On this computer" in (self.config["Audio"]["Play sound"], self.config["Audio"]["Record sound"])
+            probe_monitors = (self.config["Display"]["Use all monitors"] and bool(self.config["Display"]["Monitors"].strip())
+                              and freerdp_path not in self.freerdp_monitors)
+        self.connection_trace.server = f"{server}:{port}"
+        if self.freerdp_flavour is not None:
+            display = FreeRDPClients.display_server()
+            self.connection_trace.annotate("client", self.freerdp_flavour)
+            self.connection_trace.annotate("display", f"{display} ({FreeRDPClients.describe(self.freerdp_flavour, display)})")
+        logger.info("Connecting to %s:%s as %s (session %s)", server, port, self.config["General"]["Username"], session_id)
+
+        # No status probes while a session is running
+        self.health_monitor.set_endpoints([])
+        self.security_preflight = None
+        self.audio_backend = None
+
+        # Probe FreeRDP, the network and the redirected folders in the background before building the command
+        self.prepare_job = self.job_runner.run(
+            self.prepare_connection,
+            freerdp_path,
+            freerdp_path not in self.freerdp_versions,
+            folders,
+            self.connection_trace,
+            server,
+            port,
+            self.config["Administration"]["Security Preflight"],
+            self.config["General"]["Username"] or None,
+            local_audio,
+            probe_monitors,
+            on_result=self.on_connection_prepared,
+            on_failed=self.on_connection_prepared
+        )
+
+    def prepare_connection(self, job, freerdp_path, probe_version, folders, trace, server, port, preflight=False, cookie=None, audio=False, monitors=False):
+
+        """
+        Blocking connection preparation, runs inside a JobThread.
+        """
+        result = {"freerdp_path": freerdp_path}
+        if probe_version:
+            try:
+                with trace.span("version"):
+                    result["version"] = self.parse_freerdp_version(job.run_command([freerdp_path, '+version'], timeout=10))
+            except OSError as e:
+                logger.warning("Error retrieving FreeRDP version: %s", e)
+        job.check_cancelled()
+        result["preflight"] = self.probe_network(trace, server, port, preflight, cookie)
+        job.check_cancelled()
+        with trace.span("folders", count=len(folders)):
+            result["folders"] = self.path_validator.validate(folders)
+        if audio:
+            with trace.span("audio") as attributes:
+                result["audio"] = attributes["available"] = AudioBackends.detect()
+        if monitors:
+            try:
+                with trace.span("monitors"):
+                    result["monitors"] = ScreenLayout.parse_monitor_list(job.run_command([freerdp_path, '/monitor-list'], timeout=10).stdout)
+            except OSError as e:
+                logger.warning("Error listing the FreeRDP monitors: %s", e)
+        return result
+
+    def probe_network(self, trace, server, port, preflight=False, cookie=None, timeout=5):
+
+        """
+        Time the name resolution and a TCP connect to the server, for the connection trace.
+
+        With preflight, the RDP security negotiation is run on the same connection and its
+        result returned, see negotiate_security.
+        """
+        if not server:
+            return None
+        try:
+            with trace.span("dns") as attributes:
+                try:
+                    addresses = socket.getaddrinfo(server, port, type=socket.SOCK_STREAM)
+                except OSError as e:
+                    attributes["error"] = str(e)
+                    raise
+            family, socktype, proto, _, address = addresses[0]
+            with socket.socket(family, socktype, proto) as sock:
+                sock.settimeout(timeout)
+                with trace.span("tcp", address=address[0]) as attributes:
+                    try:
+                        sock.connect(address)
+                    except OSError as e:
+                        attributes["error"] = str(e)
+                        raise
+                if preflight:
+                    with trace.span("x224") as attributes:
+                        result = negotiate_security(sock, cookie)
+                        attributes.update(result)
+                    return result
+        except OSError as e:
+            # FreeRDP reports the actual connection error
+            logger.info("Network probe of %s:%s failed: %s", server, port, e)
+            if preflight:
+                return {"status": "unreachable", "error": str(e)}
+        return None
+
+    def on_connection_prepared(self, result):
+
+        # Ignore preparations that were cancelled by the user
+        if self.prepare_job is None:
+            return
+        self.prepare_job = None
+
+        if isinstance(result, dict):
+            if "version" in result:
+                self.freerdp_versions[result["freerdp_path"]] = result["version"]
+            if "monitors" in result:
+                self.freerdp_monitors[result["freerdp_path"]] = result["monitors"]
+            for path, reachable in result["folders"].items():
+                if not reachable:
+                    logger.warning("Skipping unreachable folder: %s", path)
+
+            # Check the local audio backend before FreeRDP fails to open it
+            if "audio" in result:
+                self.audio_backend = AudioBackends.choose(self.config["Audio"]["Backend"], result["audio"])
+                if self.audio_backend is None:
+                    logger.warning("No local audio backend found, FreeRDP uses its default")
+                self.connection_trace.annotate("audio", {
+                    "backend": self.audio_backend,
+                    "profile": self.config["Audio"]["Profile"],
+                    "playback": self.config["Audio"]["Play sound"],
+                    "microphone": self.config["Audio"]["Record sound"],
+                })
+
+            # Stop before FreeRDP when the preflight already tells the attempt will fail
+            preflight = result.get("preflight")
+            if preflight is not None:
+                logger.info("Security preflight: %s", preflight)
+                if preflight["status"] == "not_rdp":
+                    self.on_connection_failed("The server did not answer as a Remote Desktop server.")
+                    return
+                if preflight["status"] == "busy":
+                    self.on_connection_failed(f"The server is busy, try again later. ({preflight.get('error')})")
+                    return
+                self.security_preflight = preflight
+        self.start_connection()
+
+    def start_connection(self):
+
+        # Swap the login view for the session widget before the command needs its window
+        if self.config["Display"]["Embed session in window"] and self.session_widget is None:
+            self.begin_embedded_session()
+
+        # Register the app with the RemoteApp session of this host
+        if self.remote_app is not None:
+            server, port = self.get_server_endpoint()
+            self.remote_app_session_key = f"{self.config['General']['Username'] or self.username_edit.text()}@{server}:{port}"
+            apps = self.remote_app_sessions.setdefault(self.remote_app_session_key, [])
+            if self.remote_app["name"] not in apps:
+                apps.append(self.remote_app["name"])
+            self.connection_trace.annotate("remote_apps", list(apps))
+
+        # Watch the network to reconnect when the route to the server changes
+        if self.config["Experience"]["Reconnect on network change"] and self.network_route is None:
+            if self.network_watcher.start():
+                self.network_address = self.connection_trace.spans.get("tcp", {}).get("address")
+                self.network_route = self.get_network_route()
+
         # Construct the freerdp3 command using the dedicated method
-        command = self.gen_command()
+        with self.connection_trace.span("gen_command"):
+            command = self.gen_command()
+        self.connection_trace.annotate("audio_options", [arg for arg in command if arg.startswith(("/sound", "/microphone", "/audio-mode"))])
 
         # Create a thread for the connection process
-        self.connection_thread = ConnectionThread(command)
+        self.connection_thread = ConnectionThread(command, self.connection_trace, self.launch_policy)
 
         # Connect the success and failure signals to appropriate slots
+        self.connection_thread.connection_established.connect(self.on_connection_established)
         self.connection_thread.connection_success.connect(self.on_connection_success)
         self.connection_thread.connection_failed.connect(self.on_connection_failed)
 
         # Start the connection thread
         self.connection_thread.start()
 
+    def on_connection_established(self):
+        # The session window is up, the progress dialog is no longer needed
+        self.connection_dialog.hide()
+        if self.session_widget is not None:
+            self.session_widget.setFocus()
+
+        # Watch the local input to reclaim the session when the kiosk is left alone
+        if self.config["Administration"]["Idle Disconnect"] and not self.idle_timer.isActive():
+            self.start_idle_monitor()
+
+        # Time the recovery of a session restarted after a network change
+        if self.network_recovery is not None:
+            recovered = round((time.monotonic() - self.network_recovery) * 1000, 1)
+            self.network_recovery = None
+            logger.info("Session recovered %.0fms after the network change", recovered)
+            if self.connection_trace is not None:
+                self.connection_trace.annotations["network"][-1]["recovered_ms"] = recovered
+
+    def get_network_route(self):
+
+        """
+        Return the local address used to reach the server, the TCP probe of the first attempt resolved its address.
+        """
+        return NetworkWatcher.route_source(self.network_address or "192.0.2.1")
+
+    def on_network_changed(self, events):
+
+        # Only a running session can be affected
+        if self.connection_thread is None or not self.connection_thread.isRunning() or self.connection_trace is None:
+            return
+        route = self.get_network_route()
+        record = {"time": round(self.connection_trace.offset(), 1), "events": events, "route": route}
+        if route is None:
+            # Wait for the network to come back, the next event reconnects
+            record["action"] = "offline"
+        elif route == self.network_route:
+            # The TCP connection survives a change that keeps the route
+            record["action"] = "unchanged"
+        else:
+            record["action"] = "reconnect"
+        logger.info("Network changed (%s events), route %s -> %s: %s", len(events), self.network_route, route, record["action"])
+        self.connection_trace.annotations.setdefault("network", []).append(record)
+        if record["action"] == "reconnect":
+            self.reconnect_session(route)
+
+    def reconnect_session(self, route):
+
+        """
+        Replace the running FreeRDP process by a new one without waiting for its connection to time out.
+        """
+        self.connection_thread.stop()
+        self.connection_thread.wait()
+        network = self.connection_trace.annotations["network"][-1:]
+        self.restart_trace("reconnected")
+        self.connection_trace.annotate("network", network)
+        self.network_route = route
+        self.network_recovery = time.monotonic()
+        self.start_connection()
+
+    def restart_trace(self, outcome):
+
+        """
+        End the trace of a replaced FreeRDP process once it exited, its successor gets a trace under the same ID.
+        """
+        previous = self.connection_trace
+        self.finish_trace(outcome)
+        self.connection_trace = ConnectionTrace(previous.trace_id, previous.server)
+
+    def launch_remote_app(self, app):
+
+        """
+        Start a published app, next to the apps of the running RemoteApp session of the same host when there is one.
+        """
+        if self.connection_in_progress():
+            if self.prepare_job is not None or self.remote_app is None or self.remote_app_session_key not in self.remote_app_sessions:
+                QMessageBox.information(self, "RemoteApp", "Another session is already running.")
+                return
+            self.start_remote_app_process(app)
+            return
+        self.remote_app = app
+        self.connect_to_server()
+
+    def start_remote_app_process(self, app):
+
+        """
+        Start another app in a FreeRDP process of its own, leaving the running processes and their windows alone.
+
+        FreeRDP cannot start an app in a running process and offers no access to its RAIL channel,
+        so each extra app is a connection and logon of its own. The server must allow several
+        sessions per user, otherwise it moves the session to the newest connection.
+        """
+        logger.info("Starting %s next to the RemoteApp session %s", app["name"], self.remote_app_session_key)
+        remote_app, self.remote_app = self.remote_app, app
+        try:
+            command = self.gen_command()
+        finally:
+            self.remote_app = remote_app
+        apps = self.remote_app_sessions[self.remote_app_session_key]
+        apps.append(app["name"])
+        trace = ConnectionTrace(self.log_manager.session_id, self.connection_trace.server if self.connection_trace is not None else None)
+        trace.annotate("remote_apps", list(apps))
+
+        # The process ends on its own, the apps of the other processes keep running
+        thread = ConnectionThread(command, trace, self.launch_policy)
+        thread.connection_established.connect(lambda: self.on_remote_app_established(thread))
+        thread.connection_success.connect(lambda: self.on_remote_app_exited(thread))
+        thread.connection_failed.connect(lambda error_message: self.on_remote_app_exited(thread, error_message))
+        self.remote_app_threads[thread] = (app, time.monotonic())
+        thread.start()
+
+    def on_remote_app_established(self, thread):
+        if thread not in self.remote_app_threads:
+            return
+        app, started = self.remote_app_threads[thread]
+        launched = round((time.monotonic() - started) * 1000, 1)
+        logger.info("Started %s in %.0fms", app["name"], launched)
+        thread.trace.annotations.setdefault("remote_app_launches", []).append({"app": app["name"], "ms": launched})
+
+    def on_remote_app_exited(self, thread, error_message=None):
+
+        # Threads stopped with the session were already released
+        if thread not in self.remote_app_threads:
+            return
+        app, started = self.remote_app_threads.pop(thread)
+        apps = self.remote_app_sessions.get(self.remote_app_session_key, [])
+        if app["name"] in apps:
+            apps.remove(app["name"])
+        self.log_manager.write_trace(thread.trace.finish("success" if error_message is None else "failed", error_message))
+        if error_message is not None:
+            logger.error("Failed to run %s: %s", app["name"], error_message)
+            QMessageBox.critical(self, "Error", f"Failed to start {app['name']}: {error_message}")
+
+    def stop_remote_app_processes(self):
+
+        # The apps started next to the session end with it
+        for thread in list(self.remote_app_threads):
+            thread.stop()
+            thread.wait()
+            self.log_manager.write_trace(thread.trace.finish("stopped"))
+        self.remote_app_threads = {}
+
+    def start_idle_monitor(self):
+        if self.idle_source is None:
+            self.idle_source = IdleMonitor.source()
+            logger.info("Idle time source: %s", self.idle_source or "none")
+        if not self.idle_source:
+            self.idle_source = False
+            logger.warning("Idle sessions are not disconnected, no idle time source on this desktop")
+            return
+        self.idle_timer.setInterval(5000)
+        self.idle_timer.start()
+
+    def check_idle(self):
+        if self.idle_source == "x11":
+            self.on_idle_time(X11.idle_ms())
+        elif self.idle_source == "logind" and self.idle_job is None:
+            self.idle_job = self.job_runner.run_command(
+                IdleMonitor.logind_command(),
+                timeout=5,
+                parse=IdleMonitor.parse_logind,
+                on_result=self.on_idle_time,
+                on_failed=lambda error: self.on_idle_time(None)
+            )
+
+    def on_idle_time(self, idle_ms):
+        self.idle_job = None
+        if not self.idle_timer.isActive() or idle_ms is None:
+            return
+        if self.idle_dismissed is not None:
+            # Count from the Stay Connected click until the desktop reports newer input
+            dismissed_ms = (time.monotonic() - self.idle_dismissed) * 1000
+            if idle_ms > dismissed_ms:
+                idle_ms = dismissed_ms
+            else:
+                self.idle_dismissed = None
+        timeout_ms = self.config["Administration"]["Idle Disconnect"] * 60 * 1000
+        warning_ms = self.config["Administration"]["Idle Warning"] * 1000
+        if idle_ms >= timeout_ms:
+            self.reclaim_idle_session(idle_ms)
+        elif idle_ms >= timeout_ms - warning_ms:
+            self.show_idle_warning(round((timeout_ms - idle_ms) / 1000))
+        elif self.idle_warning is not None:
+            # Input came back during the warning
+            logger.info("Idle warning cleared after %.0fs without input", idle_ms / 1000)
+            self.close_idle_warning()
+
+    def show_idle_warning(self, seconds):
+
+        """
+        Count down to the disconnect, polling every second so input clears the warning at once.
+        """
+        if self.idle_warning is None:
+            logger.info("Session idle, disconnecting in %ss", seconds)
+            self.idle_warning = QMessageBox(QMessageBox.Warning, "Session Idle", "", QMessageBox.Ok, self)
+            self.idle_warning.setWindowFlags(self.idle_warning.windowFlags() | Qt.WindowStaysOnTopHint)
+            self.idle_warning.setWindowModality(Qt.NonModal)
+            self.idle_warning.button(QMessageBox.Ok).setText("Stay Connected")
+            self.idle_warning.buttonClicked.connect(self.stay_connected)
+            self.idle_warning.show()
+            self.idle_warning.raise_()
+            self.idle_timer.setInterval(1000)
+            if self.connection_trace is not None:
+                self.connection_trace.annotations["idle_warnings"] = self.connection_trace.annotations.get("idle_warnings", 0) + 1
+        self.idle_warning.setText(f"No input for a while. The session will be disconnected in {seconds} seconds.")
+
+    def stay_connected(self):
+
+        """
+        Treat the Stay Connected click as input, the warning closes and the idle time restarts from now.
+        """
+        logger.info("Idle warning dismissed, the session stays connected")
+        self.close_idle_warning()
+        self.idle_dismissed = time.monotonic()
+
+    def close_idle_warning(self):
+        self.idle_timer.setInterval(5000)
+        if self.idle_warning is not None:
+            self.idle_warning.hide()
+            self.idle_warning.deleteLater()
+            self.idle_warning = None
+
+    def stop_idle_monitor(self):
+        self.idle_timer.stop()
+        self.idle_dismissed = None
+        self.close_idle_warning()
+        if self.idle_job is not None:
+            self.idle_job.cancel()
+            self.idle_job = None
+
+    def reclaim_idle_session(self, idle_ms):
+
+        """
+        Disconnect an idle session and go back to the login screen.
+
+        A disconnected session keeps its seat until the server ends it, the Log off action ends it from here.
+        """
+        session_seconds = round(self.connection_trace.offset() / 1000) if self.connection_trace is not None else 0
+        action = self.config["Administration"]["Idle Action"]
+        logger.info("Disconnecting the session after %.0fs without input", idle_ms / 1000)
+        self.connection_thread.stop()
+        self.connection_thread.wait()
+        self.idle_reclaims["sessions"] += 1
+        self.idle_reclaims["session_seconds"] += session_seconds
+        if action == "Log off":
+            self.log_off_session()
+        if self.connection_trace is not None:
+            self.connection_trace.annotate("idle", {"source": self.idle_source, "idle_ms": idle_ms, "session_seconds": session_seconds, "action": action})
+        self.finish_trace("reclaimed")
+        self.log_manager.end_session("Session disconnected after inactivity")
+        self.release_session()
+        self.connection_dialog.hide()
+        self.reset_ui()
+
+    def log_off_session(self):
+
+        """
+        Run logoff in the disconnected session through a short RemoteApp connection.
+
+        With one session per user the connection attaches to the session of the user, so logoff
+        ends it and frees its seat. The server must allow unlisted RemoteApp programs.
+        """
+        remote_app, self.remote_app = self.remote_app, {"name": "Log off", "program": "logoff"}
+        try:
+            command = self.gen_command()
+        finally:
+            self.remote_app = remote_app
+        self.logoff_job = self.job_runner.run_command(
+            command,
+            timeout=60,
+            on_result=self.on_session_logged_off,
+            on_failed=lambda error: self.on_session_logged_off(None, error)
+        )
+
+    def on_session_logged_off(self, result, error=None):
+        self.logoff_job = None
+        if result is None or result.returncode < 0:
+            logger.warning("Failed to log off the idle session: %s", error or "no answer within the timeout")
+            return
+
+        # FreeRDP exits once the server ends the session
+        self.idle_reclaims["logged_off"] += 1
+        logger.info("Logged off the idle session, FreeRDP exited with code %s", result.returncode)
+
+    def stop_network_watcher(self):
+        self.network_watcher.stop()
+        self.network_route = None
+        self.network_address = None
+        self.network_recovery = None
+
+    def release_session(self):
+
+        """
+        Undo the per-session state once FreeRDP has exited.
+        """
+        self.end_embedded_session()
+        self.stop_network_watcher()
+        self.stop_idle_monitor()
+        self.stop_remote_app_processes()
+        if self.remote_app is not None:
+            self.remote_app_sessions.pop(self.remote_app_session_key, None)
+            self.remote_app = None
+
+    def begin_embedded_session(self):
+
+        """
+        Replace the login view with a native child widget that FreeRDP renders into.
+
+        FreeRDP can only reparent its window on X11, elsewhere the session keeps its own window.
+        """
+        if QApplication.platformName() != "xcb":
+            logger.info("Embedded sessions need X11, the %s platform uses a separate window", QApplication.platformName())
+            return
+        if not self.freerdp_supports("embed"):
+            logger.info("%s cannot be embedded, the session uses a separate window", self.freerdp_flavour)
+            return
+        if self.remote_app is not None:
+            return
+        size = self.centralWidget().size()
+        self.login_widget = self.takeCentralWidget()
+        self.session_widget = SessionWidget(self)
+        self.session_widget.setObjectName("sessionWidget")
+        self.session_widget.resized.connect(self.session_resize_timer.start)
+        self.session_widget.setAttribute(Qt.WA_NativeWindow)
+        self.session_widget.setAttribute(Qt.WA_DontCreateNativeAncestors)
+        self.session_widget.setFocusPolicy(Qt.StrongFocus)
+        self.session_widget.resize(size)
+        self.setCentralWidget(self.session_widget)
+        if self.connection_trace is not None:
+            self.connection_trace.annotate("embedded", True)
+
+    def resize_embedded_session(self):
+
+        """
+        Resize the FreeRDP window inside the session widget, which then resizes or rescales the remote desktop.
+        """
+        if self.session_widget is None or self.connection_thread is None:
+            return
+        ratio = self.session_widget.devicePixelRatioF()
+        width, height = round(self.session_widget.width() * ratio), round(self.session_widget.height() * ratio)
+        if X11.resize_children(int(self.session_widget.winId()), width, height):
+            logger.debug("Resized the embedded session to %sx%s", width, height)
+
+    def end_embedded_session(self):
+
+        """
+        Put the login view back in place of the session widget.
+        """
+        self.session_resize_timer.stop()
+        if self.session_widget is None:
+            return
+        self.takeCentralWidget()
+        self.session_widget.deleteLater()
+        self.session_widget = None
+        self.setCentralWidget(self.login_widget)
+        self.login_widget = None
+
     def on_connection_success(self):
         # Handle successful connection
+        self.finish_trace("success")
+        self.log_manager.end_session("Session ended normally")
+        self.release_session()
         self.connection_dialog.hide()
         QMessageBox.information(self, "Connected", "Connection to the server was successful.")
         self.reset_ui()
 
     def on_connection_failed(self, error_message):
         # Handle failed connection
+        logger.error("Connection failed: %s", error_message)
+        self.finish_trace("failed", error_message)
+        self.log_manager.end_session("Session ended with an error")
+        self.release_session()
         self.connection_dialog.hide()
         QMessageBox.critical(self, "Error", f"Failed to connect to the server: {error_message}")
         self.reset_ui()
 
+    def finish_trace(self, outcome, error=None):
+
+        # Write the trace of the attempt once
+        if self.connection_trace is None:
+            return
+        trace = self.connection_trace.finish(outcome, error)
+        self.connection_trace = None
+        logger.info("Connection %s after %.0fms", outcome, trace["total"])
+        self.log_manager.write_trace(trace)
+
     def connection_timeout(self):
 
+        # Cancel a pending version probe
+        if self.prepare_job is not None:
+            self.prepare_job.cancel()
+            self.prepare_job = None
+
         # If the cancel button is pressed, stop the thread and close the dialog
-        if self.connection_thread.isRunning():
+        if self.connection_thread is not None and self.connection_thread.isRunning():
             self.connection_thread.stop()  # Signal the thread to stop
             self.connection_thread.wait()  # Wait for the thread to finish
 
+        self.finish_trace("cancelled")
+        self.log_manager.end_session("Session cancelled")
+        self.release_session()
         self.connection_dialog.reject()  # Close the dialog
         self.reset_ui()  # Reset the UI
 
 if __name__ == "__main__":
-    app = QApplication([])
+    parser = argparse.ArgumentParser(description="Remote Desktop client")
+    parser.add_argument("--trace-summary", type=int, metavar="N", help="Print per-phase connect timings of the last N attempts and exit")
+    parser.add_argument("--show", action="store_true", help="Bring the running client to the front")
+    parser.add_argument("--connect", nargs="?", const="", metavar="SERVER", help="Connect, to SERVER instead of the configured server if given")
+    parser.add_argument("--reload-config", action="store_true", help="Reload the configuration files")
+    parser.add_argument("--status", action="store_true", help="Print the state of the running client")
+    parser.add_argument("--build-manifest", metavar="DIR", help="Write the asset manifest of DIR and exit")
+    parser.add_argument("--import-connections", nargs="+", metavar="PATH", help="Import .rdp, .rdg and .csv files or directories of them and exit")
+    args, qt_args = parser.parse_known_args()
+
+    # Generate the asset manifest at build time
+    if args.build_manifest:
+        print(f"Indexed {ResourceIndex.write_manifest(args.build_manifest)} assets in {args.build_manifest}")
+        sys.exit(0)
+
+    # Bulk import of connection lists without starting the interface
+    if args.import_connections:
+        importer = ConnectionImporter(os.path.join(os.path.dirname(get_script_dir()), 'config'))
+        print(json.dumps(importer.run(args.import_connections)))
+        sys.exit(0)
+
+    # Summarize logs/trace.jsonl without starting the interface
+    if args.trace_summary:
+        print(summarize_traces(os.path.join(os.path.dirname(get_script_dir()), 'logs', 'trace.jsonl'), args.trace_summary))
+        sys.exit(0)
+
+    # Requests for the running instance
+    requests = []
+    if args.status:
+        requests.append({"command": "status"})
+    else:
+        if args.reload_config:
+            requests.append({"command": "reload-config"})
+        requests.append({"command": "show"})
+        if args.connect is not None:
+            requests.append({"command": "connect", "server": args.connect})
+
+    # Forward them to the running instance if there is one
+    instance_name = InstanceServer.name_for(os.path.dirname(get_script_dir()))
+    replies = []
+    for request in requests:
+        reply = InstanceServer.send(instance_name, request)
+        if reply is None:
+            break
+        replies.append(reply)
+    if replies:
+        for reply in replies:
+            if not reply.get("ok"):
+                sys.stderr.write(f"{reply.get('error')}\n")
+        if args.status:
+            print(json.dumps(replies[-1]))
+        sys.exit(0 if all(reply.get("ok") for reply in replies) else 1)
+    if args.status:
+        print(json.dumps({"ok": False, "error": "Not running"}))
+        sys.exit(1)
+
+    app = QApplication(sys.argv[:1] + qt_args)
     client_window = Client()
+    client_window.start_instance_server()
     client_window.show()
+
+    # Run the connect request once the event loop is up
+    if args.connect is not None:
+        QTimer.singleShot(0, lambda: client_window.handle_instance_command(requests[-1]))
     sys.exit(app.exec_())
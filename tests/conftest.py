@@ -0,0 +1,58 @@
+"""
+Shared fixtures: the client module is imported from a copy of src in a temporary root,
+so the config/ and logs/ directories it creates next to src stay out of the checkout.
+"""
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import importlib
+import shutil
+import sys
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture(scope="session")
+def pyrdp(tmp_path_factory, qapp):
+    root = tmp_path_factory.mktemp("root")
+    shutil.copytree(os.path.join(REPO_DIR, "src"), root / "src",
+                    ignore=shutil.ignore_patterns("plymouth", "extra", "freerdp", "__pycache__"))
+    sys.path.insert(0, str(root / "src"))
+    try:
+        yield importlib.import_module("PyRDPConnect")
+    finally:
+        sys.path.remove(str(root / "src"))
+        sys.modules.pop("PyRDPConnect", None)
+
+
+@pytest.fixture
+def root_dir(pyrdp):
+
+    # Every test starts without a configuration
+    root = os.path.dirname(os.path.dirname(os.path.abspath(pyrdp.__file__)))
+    shutil.rmtree(os.path.join(root, "config"), ignore_errors=True)
+    return root
+
+
+@pytest.fixture
+def client(pyrdp, root_dir, qapp):
+    instances = []
+
+    def create():
+        instance = pyrdp.Client()
+        instances.append(instance)
+        return instance
+
+    yield create
+    for instance in instances:
+        instance.close()
+        instance.deleteLater()
+    qapp.processEvents()
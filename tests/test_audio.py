@@ -0,0 +1,59 @@
+"""
+Local audio backends and the low-latency audio profile.
+"""
+import pytest
+
+
+@pytest.mark.parametrize("backend, profile, device, value", [
+    ("PipeWire", "Standard", "playback", "sys:pulse"),
+    ("ALSA", "Standard", "microphone", "sys:alsa"),
+    ("PulseAudio", "Low latency", "playback", "sys:pulse,format:1,rate:48000,channel:2,latency:40,quality:high"),
+    ("PipeWire", "Low latency", "microphone", "sys:pulse,format:1,rate:16000,channel:1"),
+])
+def test_options(pyrdp, backend, profile, device, value):
+    assert pyrdp.AudioBackends.options(backend, profile, device) == value
+
+
+@pytest.mark.parametrize("requested, available, backend", [
+    ("Automatic", ["PipeWire", "ALSA"], "PipeWire"),
+    ("ALSA", ["PipeWire", "ALSA"], "ALSA"),
+    ("PulseAudio", ["PipeWire", "ALSA"], "PipeWire"),
+    ("PulseAudio", ["ALSA"], "ALSA"),
+    ("Automatic", [], None),
+])
+def test_choose(pyrdp, requested, available, backend):
+    assert pyrdp.AudioBackends.choose(requested, available) == backend
+
+
+@pytest.mark.parametrize("sockets, devices, available", [
+    (["pulse/native", "pipewire-0"], ["pcmC0D0p", "controlC0"], ["PipeWire", "ALSA"]),
+    (["pulse/native"], ["controlC0"], ["PulseAudio"]),
+    (["pipewire-0"], [], []),
+])
+def test_detect(pyrdp, tmp_path, monkeypatch, sockets, devices, available):
+    for name in sockets:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).touch()
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    monkeypatch.delenv("PULSE_SERVER", raising=False)
+    listdir = pyrdp.os.listdir
+    monkeypatch.setattr(pyrdp.os, "listdir", lambda path: list(devices) if path == "/dev/snd" else listdir(path))
+    assert pyrdp.AudioBackends.detect() == available
+
+
+def test_low_latency_profile_in_the_command(client, monkeypatch):
+    monkeypatch.setenv("PYRDPCONNECT_FREERDP", "/usr/bin/xfreerdp")
+    c = client()
+    c.config["General"]["Server Address"] = "rds.example.com"
+    c.config["Audio"].update({"Play sound": "On this computer", "Record sound": "On this computer", "Profile": "Low latency"})
+    c.audio_backend = "PipeWire"
+    command = c.gen_command()
+    assert "/audio-mode:0" in command
+    assert "/sound:sys:pulse,format:1,rate:48000,channel:2,latency:40,quality:high" in command
+    assert "/microphone:sys:pulse,format:1,rate:16000,channel:1" in command
+
+    # Without a local backend FreeRDP picks its own and the microphone stays off
+    c.audio_backend = None
+    command = c.gen_command()
+    assert "/audio-mode:0" in command
+    assert not any(arg.startswith(("/sound", "/microphone")) for arg in command)
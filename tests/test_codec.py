@@ -0,0 +1,64 @@
+"""
+Automatic codec selection from the hardware profile.
+"""
+import json
+import os
+
+import pytest
+
+
+@pytest.mark.parametrize("flags, cores, fps, codec", [
+    (["sse2", "avx2"], 8, 120, "AVC444"),
+    (["asimd"], 4, 90, "AVC444"),
+    (["sse2", "avx"], 8, 120, "AVC420"),
+    (["sse2", "avx2"], 2, 120, "AVC420"),
+    (["sse2"], 1, 50, "GFX Progressive"),
+    (["neon"], 1, 20, "GFX Progressive"),
+    ([], 1, 20, "RemoteFX"),
+    (["sse2"], 1, 8, "RemoteFX"),
+    (["sse2"], 4, 3, "Bitmap"),
+])
+def test_choose_codec(pyrdp, flags, cores, fps, codec):
+    assert pyrdp.HardwareProfile.choose_codec({"flags": flags, "cores": cores, "fps": fps}) == codec
+
+
+@pytest.mark.parametrize("codec, major_version, options", [
+    ("AVC444", 3, ["/gfx:avc444", "/bpp:32"]),
+    ("AVC420", 3, ["/gfx:avc420", "/bpp:32"]),
+    ("GFX Progressive", 3, ["/gfx:progressive", "/bpp:32"]),
+    ("GFX Progressive", None, ["/gfx:progressive", "/bpp:32"]),
+    ("GFX Progressive", 2, ["/gfx", "/gfx-progressive", "/bpp:32"]),
+    ("RemoteFX", 2, ["/rfx", "/bpp:32"]),
+    ("Bitmap", 3, ["-gfx", "/bpp:16"]),
+    ("Automatic", 3, []),
+])
+def test_codec_options(pyrdp, codec, major_version, options):
+    assert pyrdp.HardwareProfile.codec_options(codec, major_version) == options
+
+
+def test_profile_is_measured_again_on_other_hardware(pyrdp, monkeypatch):
+    cpu = {"arch": "x86_64", "model": "Celeron N4020", "flags": ["sse2"], "cores": 2}
+    monkeypatch.setattr(pyrdp.HardwareProfile, "read_cpu", classmethod(lambda cls: dict(cpu)))
+    profile = dict(cpu, fingerprint=pyrdp.HardwareProfile.fingerprint(cpu), fps=30.0)
+    assert pyrdp.HardwareProfile.is_current(profile)
+    cpu["cores"] = 4
+    assert not pyrdp.HardwareProfile.is_current(profile)
+    assert not pyrdp.HardwareProfile.is_current({"fingerprint": profile["fingerprint"]})
+
+
+def test_benchmark_decodes_frames(pyrdp, qapp):
+    assert pyrdp.HardwareProfile.benchmark(duration=0.05, width=64, height=64) > 0
+
+
+def test_stored_profile_picks_the_codec(client, pyrdp, root_dir, monkeypatch):
+    monkeypatch.setenv("PYRDPCONNECT_FREERDP", "/usr/bin/xfreerdp")
+    cpu = pyrdp.HardwareProfile.read_cpu()
+    profile = dict(cpu, fingerprint=pyrdp.HardwareProfile.fingerprint(cpu), fps=45.0, cores=2, flags=["sse2"])
+    pyrdp.ConfigStore(os.path.join(root_dir, "config")).commit({pyrdp.HardwareProfile.file_name: json.dumps(profile).encode()})
+
+    # The stored profile is current, nothing is measured
+    c = client()
+    assert c.hardware_job is None and c.hardware_profile == profile
+    c.config["General"]["Server Address"] = "rds.example.com"
+    command = c.gen_command()
+    assert "/gfx:avc420" in command and "/bpp:32" in command
@@ -0,0 +1,36 @@
+"""
+Transactional configuration writes and their recovery.
+"""
+import json
+
+
+def test_commit_writes_changed_files(pyrdp, tmp_path):
+    store = pyrdp.ConfigStore(str(tmp_path))
+    assert store.commit({"general.cfg": b"{}", "display.cfg": b"{}"}) == ["general.cfg", "display.cfg"]
+    assert store.commit({"general.cfg": b"{}", "display.cfg": b'{"a": 1}'}) == ["display.cfg"]
+    assert store.read("display.cfg") == {"a": 1}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["display.cfg", "general.cfg", "transaction.json"]
+
+
+def test_recover_rolls_a_pending_commit_forward(pyrdp, tmp_path):
+    (tmp_path / "general.cfg").write_bytes(b"{}")
+    (tmp_path / "general.cfg.staged.tmp").write_bytes(b'{"new": true}')
+    (tmp_path / "transaction.json").write_text(json.dumps({"generation": 3, "state": "pending", "files": ["general.cfg"]}))
+    store = pyrdp.ConfigStore(str(tmp_path))
+    store.recover()
+    assert store.read("general.cfg") == {"new": True}
+    assert store.read("transaction.json")["state"] == "committed"
+    assert store.generation == 3
+
+
+def test_recover_only_discards_its_own_staged_files(pyrdp, tmp_path):
+    (tmp_path / "general.cfg").write_bytes(b"{}")
+    (tmp_path / "general.cfg.staged.tmp").write_bytes(b'{"new": true}')
+    (tmp_path / "transaction.json.staged.tmp").write_bytes(b"{")
+    (tmp_path / "notes.tmp").write_bytes(b"kept")
+    (tmp_path / "sync").mkdir()
+    (tmp_path / "sync" / "bundle.json.tmp").write_bytes(b"kept")
+    pyrdp.ConfigStore(str(tmp_path)).recover()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["general.cfg", "notes.tmp", "sync"]
+    assert (tmp_path / "general.cfg").read_bytes() == b"{}"
+    assert (tmp_path / "sync" / "bundle.json.tmp").exists()
@@ -0,0 +1,200 @@
+"""
+ConfigSync against an http.server stand-in that answers conditional requests.
+"""
+import http.server
+import json
+import os
+import threading
+
+import pytest
+
+LAST_MODIFIED = "Mon, 05 Oct 2026 10:00:00 GMT"
+
+
+class BundleHandler(http.server.BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        if server.use_etag and self.headers.get("If-None-Match") == server.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        if not server.use_etag and self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        if server.use_etag:
+            self.send_header("ETag", server.etag)
+        else:
+            self.send_header("Last-Modified", LAST_MODIFIED)
+        self.send_header("Content-Length", str(len(server.body)))
+        self.end_headers()
+        self.wfile.write(server.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = http.server.HTTPServer(("127.0.0.1", 0), BundleHandler)
+    httpd.requests = []
+    httpd.use_etag = True
+    httpd.etag = '"v1"'
+    httpd.body = json.dumps({"General": {"Server Address": "rds1.example.com"}}).encode()
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/bundle.json"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+    thread.join()
+
+
+@pytest.fixture
+def job(pyrdp):
+    return pyrdp.JobThread(lambda job: None)
+
+
+def test_etag_200_then_304(pyrdp, server, job, tmp_path):
+    sync = pyrdp.ConfigSync(server.url, str(tmp_path))
+    result = sync.poll(job)
+    assert result["bundle"]["General"]["Server Address"] == "rds1.example.com"
+    sync.mark_applied(result["sha256"])
+
+    assert sync.poll(job) is None
+    assert server.requests[-1]["If-None-Match"] == '"v1"'
+
+    server.etag = '"v2"'
+    server.body = json.dumps({"General": {"Server Address": "rds2.example.com"}}).encode()
+    assert sync.poll(job)["bundle"]["General"]["Server Address"] == "rds2.example.com"
+
+
+def test_if_modified_since(pyrdp, server, job, tmp_path):
+    server.use_etag = False
+    sync = pyrdp.ConfigSync(server.url, str(tmp_path))
+    sync.mark_applied(sync.poll(job)["sha256"])
+    assert sync.poll(job) is None
+    assert server.requests[-1]["If-Modified-Since"] == LAST_MODIFIED
+    assert "If-None-Match" not in server.requests[-1]
+
+
+def test_bundle_not_applied_is_returned_again(pyrdp, server, job, tmp_path):
+    sync = pyrdp.ConfigSync(server.url, str(tmp_path))
+    first = sync.poll(job)
+    assert sync.poll(job) == first
+
+
+def test_unreachable_source_falls_back_to_the_cache(pyrdp, server, job, tmp_path):
+    sync = pyrdp.ConfigSync(server.url, str(tmp_path))
+    first = sync.poll(job)
+    server.shutdown()
+    server.server_close()
+    server.serve_forever = lambda: None
+    assert sync.poll(job) == first
+    sync.mark_applied(first["sha256"])
+    assert sync.poll(job) is None
+
+
+def test_malformed_bundle_keeps_the_cache(pyrdp, server, job, tmp_path):
+    sync = pyrdp.ConfigSync(server.url, str(tmp_path))
+    first = sync.poll(job)
+    server.etag = '"broken"'
+    server.body = b"{not json"
+    assert sync.poll(job) == first
+    with open(sync.bundle_path) as f:
+        assert json.load(f) == first["bundle"]
+    state = sync.load_state()
+    assert state["sha256"] == first["sha256"]
+    assert state["rejected_sha256"] != first["sha256"]
+
+
+@pytest.mark.parametrize("bundle", [
+    ["General"],
+    {"General": "rds.example.com"},
+    {"General": {"Port": "3390"}},
+    {"Display": {"Use all monitors": 1}},
+    {"Administration": {"Idle Disconnect": True}},
+    {"Folders": {"Folders": ["/srv/share"]}},
+    {"Appearance": {"Logo File": {"filename": "logo.png"}}},
+])
+def test_bundle_with_wrong_types_is_rejected(client, pyrdp, server, job, tmp_path, bundle):
+    defaults = client().config_defaults
+    server.body = json.dumps(bundle).encode()
+    sync = pyrdp.ConfigSync(server.url, str(tmp_path), defaults)
+    assert sync.poll(job) is None
+    assert not os.path.exists(sync.bundle_path)
+    assert sync.load_state()["rejected_sha256"]
+
+    # The same bundle is skipped on the next download
+    server.use_etag = False
+    assert sync.poll(job) is None
+
+
+def test_bundle_with_valid_types_is_accepted(client, pyrdp, server, job, tmp_path):
+    bundle = {
+        "General": {"Port": 3390, "Server Address": "rds.example.com"},
+        "Display": {"Use all monitors": True},
+        "Folders": {"Folders": [{"path": "/srv/share", "enabled": True}]},
+        "Future": {"Setting": 1},
+    }
+    server.body = json.dumps(bundle).encode()
+    sync = pyrdp.ConfigSync(server.url, str(tmp_path), client().config_defaults)
+    assert sync.poll(job)["bundle"] == bundle
+
+
+def test_file_source_uses_size_and_mtime(pyrdp, job, tmp_path):
+    bundle = tmp_path / "bundle.json"
+    bundle.write_text(json.dumps({"Display": {"HiDPI": "Native"}}))
+    sync = pyrdp.ConfigSync(bundle.as_uri(), str(tmp_path / "cache"))
+    sync.mark_applied(sync.poll(job)["sha256"])
+    assert sync.poll(job) is None
+    bundle.write_text(json.dumps({"Display": {"HiDPI": "Logical resolution"}}))
+    os.utime(bundle, ns=(0, 1))
+    assert sync.poll(job)["bundle"]["Display"]["HiDPI"] == "Logical resolution"
+
+
+def sync_result(pyrdp, tmp_path, bundle):
+    sync = pyrdp.ConfigSync("unused", str(tmp_path / "sync"))
+    return sync, {"sha256": "digest", "bundle": bundle}
+
+
+def test_failed_save_is_not_marked_applied(client, pyrdp, tmp_path, monkeypatch):
+    c = client()
+    sync, result = sync_result(pyrdp, tmp_path, {"Display": {"HiDPI": "Logical resolution"}})
+
+    def fail(files):
+        raise OSError("disk full")
+    monkeypatch.setattr(c.config_store, "commit", fail)
+    c.on_sync_result(sync, result)
+    assert "applied_sha256" not in sync.load_state()
+    assert c.config["Display"]["HiDPI"] == "Native"
+    assert not c.config_tracker.dirty_categories()
+
+
+def test_sync_without_login_changes_keeps_the_ui(client, pyrdp, tmp_path, monkeypatch):
+    c = client()
+    resets = []
+    monkeypatch.setattr(c, "reset_ui", lambda: resets.append(True))
+    sync, result = sync_result(pyrdp, tmp_path, {"Display": {"HiDPI": "Logical resolution"}})
+    c.on_sync_result(sync, result)
+    assert sync.load_state()["applied_sha256"] == "digest"
+    assert c.config["Display"]["HiDPI"] == "Logical resolution"
+    assert resets == []
+
+    sync, result = sync_result(pyrdp, tmp_path, {"General": {"Server Address": "rds.example.com"}})
+    c.on_sync_result(sync, result)
+    assert resets == [True]
+
+
+def test_bundle_failing_to_apply_is_rejected(client, pyrdp, tmp_path):
+    c = client()
+    sync, result = sync_result(pyrdp, tmp_path, {"General": {"Port": "3390", "Server Address": "rds.example.com"}})
+    c.on_sync_result(sync, result)
+    state = sync.load_state()
+    assert state["rejected_sha256"] == "digest"
+    assert "applied_sha256" not in state
+    assert c.config["General"]["Server Address"] == ""
+    assert not c.config_tracker.dirty_categories()
@@ -0,0 +1,64 @@
+"""
+Unsaved changes tracked against the saved configuration.
+"""
+import pytest
+
+
+@pytest.fixture
+def tracker(pyrdp):
+    config_tracker = pyrdp.ConfigTracker()
+    config_tracker.snapshot({"General": {"Server Address": "rds.example.com", "Port": 3389}, "Display": {"Fullscreen": True}})
+    return config_tracker
+
+
+def test_reverted_change_is_not_dirty(tracker):
+    changes = []
+    tracker.dirty_changed.connect(changes.append)
+    tracker.update("General", "Server Address", "other.example.com")
+    tracker.update("General", "Server Address", "another.example.com")
+    assert tracker.dirty_keys() == {"General": ["Server Address"]}
+    tracker.update("General", "Server Address", "rds.example.com")
+    assert not tracker.is_dirty()
+    assert changes == [True, False]
+
+
+def test_refresh_diffs_every_value(tracker):
+    tracker.refresh({"General": {"Server Address": "rds.example.com", "Port": 3390}, "Display": {"Fullscreen": False}})
+    assert tracker.dirty_categories() == ["Display", "General"]
+    assert tracker.dirty_keys() == {"Display": ["Fullscreen"], "General": ["Port"]}
+
+
+def test_snapshot_clears_the_dirty_state(tracker):
+    changes = []
+    tracker.dirty_changed.connect(changes.append)
+    tracker.update("Display", "Fullscreen", False)
+    tracker.snapshot({"Display": {"Fullscreen": False}})
+    assert not tracker.is_dirty()
+    tracker.update("Display", "Fullscreen", False)
+    assert changes == [True, False]
+
+
+def test_save_button_follows_the_dirty_state(client, qapp, monkeypatch):
+    c = client()
+    c.launch_configurations()
+    server_address = c.get_widget_from_config("General", "Server Address")
+    saved_address = server_address.text()
+
+    server_address.setText("other.example.com")
+    qapp.processEvents()
+    assert c.save_button.objectName() == "unsavedChanges"
+
+    server_address.setText(saved_address)
+    qapp.processEvents()
+    assert c.save_button.objectName() == "saveButton"
+
+    # Once every file exists only the changed category is written
+    c.save_config()
+    c.launch_configurations()
+    server_address = c.get_widget_from_config("General", "Server Address")
+    written = []
+    monkeypatch.setattr(c.config_store, "commit", lambda files: written.append(sorted(files)))
+    server_address.setText("other.example.com")
+    c.write_config()
+    assert written == [["general.cfg"]]
+    assert not c.config_tracker.is_dirty()
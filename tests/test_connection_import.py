@@ -0,0 +1,45 @@
+import json
+import os
+
+
+def write_connections(root_dir, *records):
+    os.makedirs(os.path.join(root_dir, "config"), exist_ok=True)
+    with open(os.path.join(root_dir, "config", "connections.jsonl"), "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def test_importer_deduplicates_formats(pyrdp, tmp_path):
+    (tmp_path / "a.rdp").write_text("full address:s:alpha.example.com:3390\nusername:s:EX\\bob\n", encoding="utf-16")
+    (tmp_path / "s.csv").write_text("Host,Username\nbeta.example.com,carol\nalpha.example.com:3390,bob\n")
+    (tmp_path / "s.rdg").write_text(
+        '<RDCMan><file><group><logonCredentials inherit="None"><userName>g</userName><domain>D</domain></logonCredentials>'
+        '<server><properties><name>gamma.example.com</name></properties></server></group></file></RDCMan>')
+    importer = pyrdp.ConnectionImporter(str(tmp_path / "config"))
+    stats = importer.run([str(tmp_path)])
+    assert stats["imported"] == 3
+    assert stats["duplicates"] == 1
+    records = {record["General"]["Server Address"]: record["General"] for record in importer.read(importer.path)}
+    assert records["alpha.example.com"] == {"Server Address": "alpha.example.com", "Username": "bob", "Domain": "EX", "Port": 3390}
+    assert records["gamma.example.com"]["Domain"] == "D"
+
+
+def test_apply_imported_connection_without_login_fields(client, root_dir):
+
+    # The port and username are configured, so init_ui does not create their fields
+    os.makedirs(os.path.join(root_dir, "config"))
+    with open(os.path.join(root_dir, "config", "general.cfg"), "w") as f:
+        json.dump({"Username": "configured"}, f)
+    write_connections(root_dir, {"name": "h1", "General": {"Server Address": "h1", "Username": "u1", "Domain": "D1", "Port": 3390}})
+    c = client()
+    assert c.port_edit is None and c.username_edit is None
+    c.apply_imported_connection("h1")
+    assert c.config["General"]["Port"] == 3390
+    assert c.domain_edit.text() == "D1"
+
+
+def test_apply_imported_connection_unknown_host(client, root_dir):
+    write_connections(root_dir, {"name": "h1", "General": {"Server Address": "h1", "Username": "u1", "Domain": ""}})
+    c = client()
+    c.apply_imported_connection("other")
+    assert c.config["General"]["Server Address"] == ""
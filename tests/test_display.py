@@ -0,0 +1,63 @@
+import json
+import os
+
+import pytest
+
+
+def write_display(root_dir, values):
+    os.makedirs(os.path.join(root_dir, "config"), exist_ok=True)
+    with open(os.path.join(root_dir, "config", "display.cfg"), "w") as f:
+        json.dump(values, f)
+
+
+def test_resolution_saved_by_earlier_versions_is_automatic(client, root_dir):
+    write_display(root_dir, {"Resolution": "1920x1080", "Use all monitors": False})
+    c = client()
+    assert c.config["Display"]["Resolution"] == "Automatic"
+    assert c.widgets["Display"]["Resolution"].currentText() == "Automatic"
+    assert c.collect_config()["Display"]["Resolution"] == "Automatic"
+    assert not c.config_tracker.dirty_categories()
+
+
+def test_resolution_saved_with_hidpi_is_kept(client, root_dir):
+    write_display(root_dir, {"Resolution": "1280x720", "HiDPI": "Native"})
+    c = client()
+    assert c.config["Display"]["Resolution"] == "1280x720"
+    assert c.widgets["Display"]["Resolution"].currentText() == "1280x720"
+
+
+@pytest.fixture
+def hidpi_layout(pyrdp):
+    return pyrdp.ScreenLayout([
+        {"name": "A", "x": 0, "y": 0, "width": 3840, "height": 2160, "scale": 2.0, "logical": (1920, 1080), "primary": True},
+        {"name": "B", "x": 3840, "y": 0, "width": 1920, "height": 1080, "scale": 1.0, "logical": (1920, 1080), "primary": False},
+    ])
+
+
+@pytest.mark.parametrize("hidpi, expected", [
+    ("Native", ["/size:3840x2160"]),
+    ("Scale desktop", ["/scale-desktop:200", "/scale-device:180", "/size:3840x2160"]),
+    ("Logical resolution", ["/size:1920x1080", "/smart-sizing"]),
+])
+def test_hidpi_modes(client, hidpi_layout, hidpi, expected):
+    c = client()
+    c.config["Display"]["HiDPI"] = hidpi
+    c.screen_layout = hidpi_layout
+    assert c.gen_display_options("xfreerdp") == expected
+
+
+def test_monitors_are_mapped_to_freerdp_ids(client, hidpi_layout):
+    c = client()
+    c.config["Display"].update({"Use all monitors": True, "Monitors": "1"})
+    c.screen_layout = hidpi_layout
+    c.freerdp_monitors = {"xfreerdp": hidpi_layout.parse_monitor_list("  * [0] 1920x1080\t+3840+0\n    [1] 3840x2160\t+0+0\n")}
+    assert c.gen_display_options("xfreerdp") == ["/multimon", "/monitors:0"]
+
+
+def test_trace_summary_reports_the_monitor_probe(pyrdp, tmp_path):
+    trace = pyrdp.ConnectionTrace("abc")
+    trace.record("monitors", 0, 42)
+    path = tmp_path / "trace.jsonl"
+    path.write_text(json.dumps(trace.finish("success")) + "\n")
+    rows = {line.split()[0]: line.split()[1:] for line in pyrdp.summarize_traces(str(path), 10).splitlines()[2:]}
+    assert rows["monitors"] == ["1", "42", "42"]
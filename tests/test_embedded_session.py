@@ -0,0 +1,54 @@
+"""
+FreeRDP sessions rendered inside the client window.
+"""
+import pytest
+
+
+@pytest.fixture
+def embed_client(client, pyrdp, monkeypatch):
+    monkeypatch.setenv("PYRDPCONNECT_FREERDP", "/usr/bin/xfreerdp")
+    c = client()
+    c.config["General"]["Server Address"] = "rds.example.com"
+    c.config["Display"]["Embed session in window"] = True
+    return c
+
+
+def test_session_widget_replaces_the_login_view(embed_client, pyrdp, monkeypatch):
+    monkeypatch.setattr(pyrdp.QApplication, "platformName", staticmethod(lambda: "xcb"))
+    c = embed_client
+    c.config["Display"]["Start session in fullscreen"] = True
+    login_widget = c.centralWidget()
+    c.begin_embedded_session()
+    assert c.centralWidget() is c.session_widget
+    command = c.gen_command()
+    assert f"/parent-window:{int(c.session_widget.winId())}" in command
+    assert "/f" not in command
+
+    c.end_embedded_session()
+    assert c.session_widget is None
+    assert c.centralWidget() is login_widget
+    command = c.gen_command()
+    assert "/f" in command and not any(arg.startswith("/parent-window:") for arg in command)
+
+
+def test_other_platforms_keep_a_separate_window(embed_client, pyrdp, monkeypatch):
+    monkeypatch.setattr(pyrdp.QApplication, "platformName", staticmethod(lambda: "wayland"))
+    c = embed_client
+    c.begin_embedded_session()
+    assert c.session_widget is None
+
+
+def test_front_end_without_embedding_keeps_a_separate_window(embed_client, pyrdp, monkeypatch):
+    monkeypatch.setattr(pyrdp.QApplication, "platformName", staticmethod(lambda: "xcb"))
+    c = embed_client
+    monkeypatch.setattr(c, "freerdp_supports", lambda feature: feature != "embed")
+    c.begin_embedded_session()
+    assert c.session_widget is None
+
+
+def test_remote_app_is_not_embedded(embed_client, pyrdp, monkeypatch):
+    monkeypatch.setattr(pyrdp.QApplication, "platformName", staticmethod(lambda: "xcb"))
+    c = embed_client
+    c.remote_app = {"name": "Notepad", "program": "notepad"}
+    c.begin_embedded_session()
+    assert c.session_widget is None
@@ -0,0 +1,75 @@
+"""
+Folder redirection options of the FreeRDP command.
+"""
+import pytest
+
+
+def drive_options(command):
+    return [arg for arg in command if arg.startswith("/drive:")]
+
+
+@pytest.fixture
+def folder_client(client, tmp_path, monkeypatch):
+    monkeypatch.setenv("PYRDPCONNECT_FREERDP", "/usr/bin/xfreerdp")
+    c = client()
+    c.config["General"]["Server Address"] = "rds.example.com"
+    c.config["Folders"]["Redirect"] = True
+    return c
+
+
+def test_folders_are_redirected_with_unique_names(folder_client, tmp_path):
+    paths = [tmp_path / "a" / "Share", tmp_path / "b" / "Share", tmp_path / "Data files"]
+    for path in paths:
+        path.mkdir(parents=True)
+    folder_client.config["Folders"]["Folders"] = [{"path": str(path), "enabled": True} for path in paths]
+    folder_client.path_validator.validate([str(path) for path in paths])
+    assert drive_options(folder_client.gen_command()) == [
+        f"/drive:Share,{paths[0]}",
+        f"/drive:Share_2,{paths[1]}",
+        f"/drive:Data_files,{paths[2]}",
+    ]
+
+
+def test_folders_with_a_comma_are_skipped(folder_client, tmp_path):
+    paths = [tmp_path / "Reports, 2026", tmp_path / "Share"]
+    for path in paths:
+        path.mkdir()
+    folder_client.config["Folders"]["Folders"] = [{"path": str(path), "enabled": True} for path in paths]
+    folder_client.path_validator.validate([str(path) for path in paths])
+    assert drive_options(folder_client.gen_command()) == [f"/drive:Share,{paths[1]}"]
+
+
+def test_unreachable_and_disabled_folders_are_skipped(folder_client, tmp_path):
+    folder_client.config["Folders"]["Folders"] = [
+        {"path": str(tmp_path / "missing"), "enabled": True},
+        {"path": str(tmp_path), "enabled": False},
+    ]
+    folder_client.path_validator.validate([str(tmp_path / "missing"), str(tmp_path)])
+    assert drive_options(folder_client.gen_command()) == []
+
+
+def test_folder_with_a_comma_cannot_be_added(client, pyrdp, monkeypatch):
+    c = client()
+    warnings = []
+
+    class FolderDialog:
+
+        Directory = 0
+
+        def __init__(self, parent):
+            pass
+
+        def setFileMode(self, mode):
+            pass
+
+        def exec_(self):
+            return True
+
+        def selectedFiles(self):
+            return ["/srv/Reports, 2026"]
+
+    monkeypatch.setattr(pyrdp, "QFileDialog", FolderDialog)
+    monkeypatch.setattr(pyrdp.QMessageBox, "warning", staticmethod(lambda *args: warnings.append(args[2])))
+    c.select_folder()
+    assert c.config["Folders"]["Folders"] == []
+    assert warnings and "comma" in warnings[0]
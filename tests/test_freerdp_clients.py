@@ -0,0 +1,82 @@
+"""
+Choice of the FreeRDP front-end for the display server.
+"""
+import pytest
+
+
+def executable(path):
+    path.write_text("#!/bin/sh\n")
+    path.chmod(0o755)
+    return str(path)
+
+
+@pytest.mark.parametrize("platform_name, environ, display", [
+    ("xcb", {"WAYLAND_DISPLAY": "wayland-0"}, "x11"),
+    ("wayland", {}, "wayland"),
+    ("wayland-egl", {}, "wayland"),
+    ("offscreen", {"WAYLAND_DISPLAY": "wayland-0"}, "wayland"),
+    ("offscreen", {"XDG_SESSION_TYPE": "wayland"}, "wayland"),
+    ("offscreen", {}, "x11"),
+])
+def test_display_server(pyrdp, monkeypatch, platform_name, environ, display):
+    monkeypatch.delenv("WAYLAND_DISPLAY", raising=False)
+    monkeypatch.delenv("XDG_SESSION_TYPE", raising=False)
+    for name, value in environ.items():
+        monkeypatch.setenv(name, value)
+    assert pyrdp.FreeRDPClients.display_server(platform_name) == display
+
+
+def test_discover_prefers_bundled_binaries(pyrdp, tmp_path, monkeypatch):
+    bundled, system = tmp_path / "bundled", tmp_path / "bin"
+    bundled.mkdir()
+    system.mkdir()
+    bundled_xfreerdp = executable(bundled / "xfreerdp")
+    executable(system / "xfreerdp3")
+    sdl = executable(system / "sdl-freerdp")
+    (system / "wlfreerdp3").write_text("not executable")
+    monkeypatch.setenv("PATH", str(system))
+    assert pyrdp.FreeRDPClients.discover([str(bundled)]) == {"xfreerdp": bundled_xfreerdp, "sdl-freerdp": sdl}
+    assert pyrdp.FreeRDPClients.discover()["xfreerdp"] == str(system / "xfreerdp3")
+
+
+@pytest.mark.parametrize("display, available, override, features, flavour", [
+    ("wayland", ["xfreerdp", "sdl-freerdp", "wlfreerdp"], "Automatic", (), "sdl-freerdp"),
+    ("wayland", ["xfreerdp", "wlfreerdp"], "Automatic", (), "wlfreerdp"),
+    ("wayland", ["xfreerdp", "sdl-freerdp"], "Automatic", ("embed",), "xfreerdp"),
+    ("x11", ["xfreerdp", "sdl-freerdp"], "Automatic", (), "xfreerdp"),
+    ("x11", ["wlfreerdp"], "Automatic", (), "wlfreerdp"),
+    ("x11", ["sdl-freerdp"], "Automatic", ("embed",), "sdl-freerdp"),
+    ("x11", ["xfreerdp", "sdl-freerdp"], "sdl-freerdp", (), "sdl-freerdp"),
+    ("x11", ["xfreerdp"], "wlfreerdp", (), "xfreerdp"),
+    ("x11", [], "Automatic", (), None),
+])
+def test_choose(pyrdp, display, available, override, features, flavour):
+    available = {name: f"/usr/bin/{name}" for name in available}
+    assert pyrdp.FreeRDPClients.choose(display, available, override, features) == flavour
+
+
+def test_describe(pyrdp):
+    describe = pyrdp.FreeRDPClients.describe
+    assert describe("xfreerdp", "x11") == "native"
+    assert describe("xfreerdp", "wayland") == "fallback"
+    assert describe("wlfreerdp", "x11") == "unsupported"
+
+
+def test_client_uses_the_chosen_front_end(client, pyrdp, monkeypatch):
+    monkeypatch.delenv("PYRDPCONNECT_FREERDP", raising=False)
+    monkeypatch.setattr(pyrdp.FreeRDPClients, "display_server", staticmethod(lambda platform_name=None: "wayland"))
+    c = client()
+    c.freerdp_clients = {"xfreerdp": "/usr/bin/xfreerdp3", "sdl-freerdp": "/usr/bin/sdl-freerdp3"}
+    assert c.get_freerdp_path() == "/usr/bin/sdl-freerdp3"
+    assert not c.freerdp_supports("embed")
+
+    # Embedding needs the X11 front-end
+    c.config["Display"]["Embed session in window"] = True
+    assert c.get_freerdp_path() == "/usr/bin/xfreerdp3"
+    assert c.freerdp_supports("embed")
+
+
+def test_environment_overrides_the_front_end(client, monkeypatch):
+    monkeypatch.setenv("PYRDPCONNECT_FREERDP", "/opt/freerdp/xfreerdp")
+    c = client()
+    assert c.get_freerdp_path() == "/opt/freerdp/xfreerdp"
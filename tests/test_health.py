@@ -0,0 +1,80 @@
+"""
+Server reachability probes and their indicator on the login screen.
+"""
+import socket
+import time
+
+import pytest
+
+
+def wait_for(qapp, condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def monitor(pyrdp):
+    health_monitor = pyrdp.HealthMonitor(timeout=2.0, min_interval=0.05, max_interval=0.2, max_down_interval=0.2)
+    health_monitor.start()
+    yield health_monitor
+    health_monitor.stop()
+
+
+def test_probes_report_reachability(monitor, qapp):
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+    open_port = listener.getsockname()[1]
+    closed = socket.socket()
+    closed.bind(("127.0.0.1", 0))
+    closed_port = closed.getsockname()[1]
+
+    results = {}
+    monitor.health_changed.connect(lambda key, result: results.setdefault(key, result))
+    try:
+        monitor.set_endpoints([("127.0.0.1", open_port), ("127.0.0.1", closed_port)])
+        assert wait_for(qapp, lambda: len(results) == 2)
+    finally:
+        listener.close()
+        closed.close()
+    assert results[f"127.0.0.1:{open_port}"]["reachable"] is True
+    assert results[f"127.0.0.1:{open_port}"]["latency"] >= 0
+    assert results[f"127.0.0.1:{closed_port}"]["reachable"] is False
+    assert results[f"127.0.0.1:{closed_port}"]["error"]
+
+
+def test_removed_endpoints_are_no_longer_probed(monitor, qapp):
+    keys = []
+    monitor.health_changed.connect(lambda key, result: keys.append(key))
+    monitor.set_endpoints([("127.0.0.1", 9)])
+    assert wait_for(qapp, lambda: keys)
+    monitor.set_endpoints([])
+    wait_for(qapp, lambda: False, timeout=0.1)
+    count = len(keys)
+    wait_for(qapp, lambda: False, timeout=0.5)
+    assert len(keys) == count
+
+
+@pytest.mark.parametrize("result, level, text", [
+    (None, 0, "Checking server..."),
+    ({"reachable": False, "latency": None, "error": "refused"}, 0, "Server unreachable"),
+    ({"reachable": True, "latency": 20.0}, 4, "Server reachable (20 ms)"),
+    ({"reachable": True, "latency": 200.0}, 2, "Server reachable (200 ms)"),
+    ({"reachable": True, "latency": 900.0}, 1, "Server reachable (900 ms)"),
+])
+def test_indicator_maps_latency_to_reception_icons(client, pyrdp, monkeypatch, result, level, text):
+    c = client()
+    monkeypatch.setattr(c, "get_server_endpoint", lambda: ("rds.example.com", 3389))
+    icons = []
+    monkeypatch.setattr(c, "get_path", lambda name: icons.append(name) or name)
+    monkeypatch.setattr(c, "render_svg", lambda path: pyrdp.QPixmap(1, 1))
+    c.health_pixmaps = {}
+    if result is None:
+        c.show_health()
+    else:
+        c.on_health_changed("rds.example.com:3389", result)
+    assert c.health_label.text() == text
+    assert icons == [f"icons/reception-{level}.svg"]
@@ -0,0 +1,115 @@
+"""
+Idle warning countdown, the Stay Connected button and the reclaim of idle sessions.
+"""
+import sys
+import time
+
+import pytest
+
+
+def idle_client(client, pyrdp, monkeypatch):
+    c = client()
+    c.config["Administration"]["Idle Disconnect"] = 1
+    c.config["Administration"]["Idle Warning"] = 30
+    reclaimed = []
+    monkeypatch.setattr(c, "reclaim_idle_session", reclaimed.append)
+    c.idle_source = "x11"
+    c.idle_timer.start()
+    return c, reclaimed
+
+
+def test_idle_warning_counts_down(client, pyrdp, monkeypatch):
+    c, reclaimed = idle_client(client, pyrdp, monkeypatch)
+    c.on_idle_time(40000)
+    assert c.idle_warning is not None
+    assert c.idle_timer.interval() == 1000
+    c.on_idle_time(60000)
+    assert reclaimed == [60000]
+
+
+def test_stay_connected_resets_the_idle_time(client, pyrdp, monkeypatch):
+    c, reclaimed = idle_client(client, pyrdp, monkeypatch)
+    c.on_idle_time(40000)
+    warning = c.idle_warning
+    warning.button(pyrdp.QMessageBox.Ok).click()
+    assert c.idle_warning is None
+    assert c.idle_timer.interval() == 5000
+    assert not warning.isVisible()
+
+    # The desktop still reports the idle time from before the click
+    c.on_idle_time(45000)
+    c.on_idle_time(65000)
+    assert c.idle_warning is None and reclaimed == []
+
+    # Once the click is far enough back, the countdown starts again
+    c.idle_dismissed = time.monotonic() - 40
+    c.on_idle_time(75000)
+    assert c.idle_warning is not None
+    assert reclaimed == []
+
+
+def test_input_after_stay_connected_ends_the_baseline(client, pyrdp, monkeypatch):
+    c, reclaimed = idle_client(client, pyrdp, monkeypatch)
+    c.on_idle_time(40000)
+    c.idle_warning.button(pyrdp.QMessageBox.Ok).click()
+    c.idle_dismissed = time.monotonic() - 10
+    c.on_idle_time(2000)
+    assert c.idle_dismissed is None
+    c.on_idle_time(40000)
+    assert c.idle_warning is not None
+
+
+class StoppedThread:
+
+    def stop(self):
+        pass
+
+    def wait(self):
+        pass
+
+    def isRunning(self):
+        return False
+
+
+@pytest.mark.parametrize("action, logged_off", [("Disconnect", 0), ("Log off", 1)])
+def test_reclaim_idle_session(client, pyrdp, qapp, monkeypatch, action, logged_off):
+    c = client()
+    c.config["Administration"]["Idle Action"] = action
+    commands = []
+
+    def gen_command():
+        # Stand-in for FreeRDP that exits like a session ended by the server
+        commands.append(c.remote_app)
+        return [sys.executable, "-c", "pass"]
+    monkeypatch.setattr(c, "gen_command", gen_command)
+    c.connection_dialog = pyrdp.QProgressDialog("Connecting to server...", "Cancel", 0, 0, c)
+    c.connection_thread = StoppedThread()
+    c.connection_trace = pyrdp.ConnectionTrace("abc")
+    traces = []
+    monkeypatch.setattr(c.log_manager, "write_trace", traces.append)
+
+    c.reclaim_idle_session(120000)
+    assert traces[0]["outcome"] == "reclaimed"
+    assert traces[0]["idle"]["action"] == action
+    if logged_off:
+        assert commands == [{"name": "Log off", "program": "logoff"}]
+        assert c.remote_app is None
+        assert c.connection_in_progress()
+        deadline = time.monotonic() + 10
+        while c.logoff_job is not None and time.monotonic() < deadline:
+            qapp.processEvents()
+            time.sleep(0.01)
+    else:
+        assert commands == []
+    assert c.logoff_job is None
+    assert c.idle_reclaims == {"sessions": 1, "session_seconds": 0, "logged_off": logged_off}
+
+
+def test_no_logon_while_logging_off(client, pyrdp, monkeypatch):
+    c = client()
+    messages = []
+    monkeypatch.setattr(pyrdp.QMessageBox, "information", staticmethod(lambda *args: messages.append(args[2])))
+    monkeypatch.setattr(c, "connect", lambda: pytest.fail("connected during the log off"))
+    c.logoff_job = object()
+    c.connect_to_server()
+    assert messages and "logged off" in messages[0]
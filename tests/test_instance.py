@@ -0,0 +1,78 @@
+"""
+Relaunches forwarded to the running instance over its local socket.
+"""
+import threading
+import time
+import uuid
+
+import pytest
+
+
+def send(pyrdp, qapp, name, request):
+
+    # The client blocks on the socket, the server answers in this event loop
+    replies = []
+    sender = threading.Thread(target=lambda: replies.append(pyrdp.InstanceServer.send(name, request, timeout=5000)))
+    sender.start()
+    deadline = time.monotonic() + 10
+    while sender.is_alive() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    sender.join()
+    return replies[0]
+
+
+@pytest.fixture
+def server(pyrdp):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.get("command") == "fail":
+            raise RuntimeError("broken")
+        return {"ok": True, "echo": request}
+
+    instance_server = pyrdp.InstanceServer(f"PyRDPConnect-test-{uuid.uuid4().hex[:8]}", handler)
+    assert instance_server.listen()
+    instance_server.requests = requests
+    yield instance_server
+    instance_server.close()
+
+
+def test_request_is_answered_by_the_handler(pyrdp, qapp, server):
+    assert send(pyrdp, qapp, server.name, {"command": "show"}) == {"ok": True, "echo": {"command": "show"}}
+    assert server.requests == [{"command": "show"}]
+
+
+def test_invalid_and_failing_requests_get_an_error(pyrdp, qapp, server):
+    assert send(pyrdp, qapp, server.name, ["show"]) == {"ok": False, "error": "Invalid request: request is not an object"}
+    assert send(pyrdp, qapp, server.name, {"command": "fail"}) == {"ok": False, "error": "broken"}
+
+
+def test_no_instance_running(pyrdp):
+    assert pyrdp.InstanceServer.send(f"PyRDPConnect-test-{uuid.uuid4().hex[:8]}", {"command": "show"}, timeout=100) is None
+
+
+def test_socket_name_depends_on_the_install(pyrdp, tmp_path):
+    name_for = pyrdp.InstanceServer.name_for
+    assert name_for(str(tmp_path / "a")) == name_for(str(tmp_path / "a" / ".." / "a"))
+    assert name_for(str(tmp_path / "a")) != name_for(str(tmp_path / "b"))
+
+
+def test_client_commands(client, monkeypatch):
+    c = client()
+    connects = []
+    monkeypatch.setattr(c, "connect_to_server", lambda: connects.append(c.config["General"]["Server Address"]))
+    status = c.handle_instance_command({"command": "status"})
+    assert status["ok"] and status["connected"] is False and status["session"] == c.log_manager.session_id
+    assert c.handle_instance_command({"command": "connect", "server": "rds.example.com"}) == {"ok": True}
+    assert connects == ["rds.example.com"]
+    assert c.handle_instance_command({"command": "reload-config"}) == {"ok": True}
+    assert c.handle_instance_command({"command": "quit"}) == {"ok": False, "error": "Unknown command: quit"}
+
+
+def test_client_refuses_to_connect_twice(client, monkeypatch):
+    c = client()
+    monkeypatch.setattr(c, "connection_in_progress", lambda: True)
+    assert c.handle_instance_command({"command": "connect"}) == {"ok": False, "error": "A connection is already in progress"}
+    assert c.handle_instance_command({"command": "reload-config"})["ok"] is False
@@ -0,0 +1,78 @@
+"""
+Background jobs for external commands and the UI stall detector.
+"""
+import sys
+import time
+
+import pytest
+
+
+def wait_for(qapp, condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def runner(pyrdp):
+    job_runner = pyrdp.JobRunner()
+    yield job_runner
+    job_runner.cancel_all()
+
+
+def test_command_output_is_reported_on_the_gui_thread(runner, qapp):
+    results, progress = [], []
+    command = [sys.executable, "-c", "print('one'); print('two'); import sys; print('err', file=sys.stderr)"]
+    runner.run_command(command, parse=lambda result: result.stdout.split(),
+                       on_result=results.append, on_progress=progress.append)
+    assert wait_for(qapp, lambda: results and not runner.jobs)
+    assert results == [["one", "two"]]
+    assert progress == ["one", "two"]
+
+
+def test_failed_command_is_reported(runner, qapp):
+    errors = []
+    runner.run_command([sys.executable, "-c", "raise SystemExit(3)"], check=True,
+                       on_result=lambda result: errors.append("result"), on_failed=errors.append)
+    assert wait_for(qapp, lambda: errors)
+    assert "exit status 3" in errors[0]
+
+
+def test_timeout_kills_the_command(runner, qapp):
+    results = []
+    started = time.monotonic()
+    runner.run_command([sys.executable, "-c", "import time; time.sleep(30)"], timeout=0.5, on_result=results.append)
+    assert wait_for(qapp, lambda: results)
+    assert results[0].returncode < 0
+    assert time.monotonic() - started < 10
+
+
+def test_cancelled_job_terminates_the_command_silently(runner, qapp):
+    signals = []
+    job = runner.run_command([sys.executable, "-c", "import time; print('up', flush=True); time.sleep(30)"],
+                             on_result=signals.append, on_failed=signals.append)
+    assert wait_for(qapp, lambda: job.process is not None)
+    runner.cancel_all()
+    qapp.processEvents()
+    assert job.process.poll() is not None
+    assert signals == []
+
+
+def test_stall_is_logged_with_a_stack_sample(pyrdp, qapp, monkeypatch):
+    warnings = []
+    monkeypatch.setattr(pyrdp.logger, "warning", lambda message, *args: warnings.append(message % args))
+    detector = pyrdp.StallDetector(threshold=0.2, interval=0.05)
+    detector.start()
+    try:
+        wait_for(qapp, lambda: False, timeout=0.2)
+        assert warnings == []
+
+        # Block the event loop well past the threshold
+        time.sleep(0.6)
+        assert wait_for(qapp, lambda: warnings, timeout=2)
+    finally:
+        detector.stop()
+    assert warnings[0].startswith("UI stall: event loop blocked for")
+    assert "test_stall_is_logged_with_a_stack_sample" in warnings[0]
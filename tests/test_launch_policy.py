@@ -0,0 +1,26 @@
+def test_apply_frontend_only_when_settings_change(pyrdp, monkeypatch, tmp_path):
+    calls = []
+    monkeypatch.setattr(pyrdp.LaunchPolicy, "apply_scheduling", classmethod(lambda cls, tids, nice, cpus: calls.append(nice) or {}))
+    monkeypatch.setattr(pyrdp.LaunchPolicy, "cgroup_root", str(tmp_path))
+    policy = pyrdp.LaunchPolicy()
+    policy.configure({"Front-end Nice": 5, "Session Nice": 0})
+    assert policy.apply_frontend() is not None
+    assert policy.apply_frontend() is None
+
+    # Session settings do not concern the front-end
+    policy.configure({"Front-end Nice": 5, "Session Nice": 10})
+    assert policy.apply_frontend() is None
+    policy.configure({"Front-end Nice": 6, "Session Nice": 10})
+    assert policy.apply_frontend() is not None
+    assert len(calls) == 2
+
+
+def test_reset_ui_does_not_reapply_frontend(client, pyrdp, monkeypatch):
+    applied = []
+    original = pyrdp.LaunchPolicy.apply_frontend
+    monkeypatch.setattr(pyrdp.LaunchPolicy, "apply_frontend", lambda self: applied.append(original(self)) or applied[-1])
+    c = client()
+    c.reset_ui()
+    c.reset_ui()
+    assert len(applied) == 3
+    assert applied[1] is None and applied[2] is None
@@ -0,0 +1,98 @@
+"""
+Queued logging to rotating files, per-session files and the redaction of secrets.
+"""
+import json
+import re
+
+import pytest
+
+LINE = re.compile(r"^\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3} (INFO|WARNING|ERROR) \[([\w-]+)\] (\w+): (.*)$")
+
+
+@pytest.mark.parametrize("arg, expected", [
+    ("/p:hunter2", "/p:********"),
+    ("/P:hunter2", "/P:********"),
+    ("/gp:hunter2", "/gp:********"),
+    ("/pth:8846f7eaee8fb117ad06bdd830b7586c", "/pth:********"),
+    ("/password:hunter2", "/password:********"),
+    ("/gatewaypassword:hunter2", "/gatewaypassword:********"),
+    ("/p:hunter2,with:colons", "/p:********"),
+    ('"/p:hunter 2"', '"/p:********"'),
+    ("'/p:hunter2'", "'/p:********'"),
+    ('/p:"hunter 2"', '/p:********"'),
+    ("/p=hunter2", "/p=********"),
+    ("--password=hunter2", "--password=********"),
+    ("/gateway:g:gw.example.com,u:alice,p:hunter2", "/gateway:g:gw.example.com,u:alice,p:********"),
+    ("/gw:g:gw.example.com,p=hunter2,d:corp", "/gw:g:gw.example.com,p=********,d:corp"),
+    ("/gateway:g:gw.example.com,access-token:eyJ0eXAi", "/gateway:g:gw.example.com,access-token:********"),
+    ("/port:3389", "/port:3389"),
+    ("/parent-window:42", "/parent-window:42"),
+    ("/v:rds.example.com", "/v:rds.example.com"),
+])
+def test_redact_command(pyrdp, arg, expected):
+    assert pyrdp.redact_command(["xfreerdp", arg]) == ["xfreerdp", expected]
+
+
+@pytest.mark.parametrize("flag", ["/p", "-p", "--password", "/gp"])
+def test_redact_separate_value(pyrdp, flag):
+    assert pyrdp.redact_command(["xfreerdp", flag, "hunter2", "/v:host"]) == ["xfreerdp", flag, "********", "/v:host"]
+
+
+@pytest.fixture
+def log_manager(pyrdp, tmp_path, monkeypatch):
+
+    # Only this manager tags and writes the records
+    monkeypatch.setattr(pyrdp.logger, "handlers", [])
+    manager = pyrdp.LogManager(str(tmp_path / "logs"), max_bytes=2000, backup_count=2)
+    manager.start()
+    yield manager
+    manager.stop()
+
+
+def test_generated_command_does_not_leak_the_password(client, pyrdp, log_manager, tmp_path, monkeypatch):
+    monkeypatch.setenv("PYRDPCONNECT_FREERDP", "/usr/bin/xfreerdp")
+    c = client()
+    c.config["General"].update({"Server Address": "rds.example.com", "Username": "alice", "Password": "hunter2"})
+    c.config["Administration"]["Password"] = "hunter2"
+    log_manager.begin_session()
+    command = c.gen_command()
+    log_manager.end_session()
+    log_manager.stop()
+    assert "/p:hunter2" in command
+    logs = [path for path in (tmp_path / "logs").rglob("*.log")]
+    assert len(logs) == 2
+    for path in logs:
+        content = path.read_text()
+        assert "Generated freerdp" in content and "/p:********" in content
+        assert "hunter2" not in content
+
+
+def test_log_format_and_rotation(pyrdp, log_manager, tmp_path):
+    for index in range(100):
+        pyrdp.logger.info("Record %s", index)
+    log_manager.stop()
+    logs = tmp_path / "logs"
+    assert sorted(path.name for path in logs.iterdir() if path.name.startswith("PyRDPConnect.log")) == ["PyRDPConnect.log", "PyRDPConnect.log.1", "PyRDPConnect.log.2"]
+    assert all(path.stat().st_size <= 2000 for path in logs.glob("PyRDPConnect.log*"))
+    lines = (logs / "PyRDPConnect.log").read_text().splitlines()
+    assert lines[-1].endswith("Record 99")
+    for line in lines:
+        match = LINE.match(line)
+        assert match and match.group(2) == "-" and match.group(3) == "test_log_format_and_rotation"
+
+
+def test_session_records_and_traces(pyrdp, log_manager, tmp_path):
+    session = log_manager.begin_session()
+    pyrdp.logger.warning("During the session")
+    log_manager.write_trace(pyrdp.ConnectionTrace(session).finish("success"))
+    log_manager.end_session("Session ended normally")
+    pyrdp.logger.info("After the session")
+    log_manager.stop()
+    logs = tmp_path / "logs"
+
+    session_lines = (logs / "sessions" / f"{session}.log").read_text().splitlines()
+    assert [LINE.match(line).group(2, 4) for line in session_lines] == [(session, "During the session"), (session, "Session ended normally")]
+    main = (logs / "PyRDPConnect.log").read_text()
+    assert "After the session" in main and "Connection trace" not in main
+    traces = [json.loads(line) for line in (logs / "trace.jsonl").read_text().splitlines()]
+    assert [(trace["trace_id"], trace["outcome"]) for trace in traces] == [(session, "success")]
@@ -0,0 +1,91 @@
+"""
+The network watcher and the traces of the FreeRDP processes replaced after a network change.
+"""
+import errno
+
+
+class ExitingThread:
+
+    # Stand-in for the ConnectionThread of the old process, records its exit while being waited for
+    def __init__(self, trace):
+        self.trace = trace
+
+    def stop(self):
+        pass
+
+    def wait(self):
+        self.trace.milestone("exit")
+
+    def isRunning(self):
+        return True
+
+
+def test_reconnect_starts_a_new_trace(client, pyrdp, monkeypatch):
+    c = client()
+    traces = []
+    started = []
+    monkeypatch.setattr(c.log_manager, "write_trace", traces.append)
+    monkeypatch.setattr(c, "start_connection", lambda: started.append(c.connection_trace))
+    monkeypatch.setattr(pyrdp.NetworkWatcher, "route_source", staticmethod(lambda address: "10.0.0.2"))
+    first = pyrdp.ConnectionTrace("abc", "rdp.example.com")
+    first.record("tcp", 0, 5, address="192.0.2.10")
+    c.connection_trace = first
+    c.connection_thread = ExitingThread(first)
+    c.network_address = "192.0.2.10"
+    c.network_route = "10.0.0.1"
+
+    c.on_network_changed([{"type": "address"}])
+
+    assert len(traces) == 1
+    assert traces[0]["outcome"] == "reconnected"
+    assert "exit" in traces[0]["spans"]
+    assert traces[0]["network"][-1]["action"] == "reconnect"
+
+    second = c.connection_trace
+    assert started == [second] and second is not first
+    assert second.trace_id == "abc" and second.server == "rdp.example.com"
+    assert second.spans == {}
+    assert second.annotations["network"] == traces[0]["network"][-1:]
+    assert c.network_route == "10.0.0.2" and c.network_recovery is not None
+
+    # The route keeps being computed for the resolved server address
+    c.connection_thread = ExitingThread(second)
+    c.on_network_changed([{"type": "route"}])
+    assert len(traces) == 1
+    assert second.annotations["network"][-1]["action"] == "unchanged"
+
+
+class FailingSocket:
+
+    # Stand-in for the netlink socket, raising the queued errors and then running dry
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.reads = 0
+        self.closed = False
+
+    def recv(self, size):
+        self.reads += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        raise BlockingIOError()
+
+    def close(self):
+        self.closed = True
+
+
+def test_netlink_overflow_keeps_reading(pyrdp):
+    watcher = pyrdp.NetworkWatcher()
+    sock = watcher.sock = FailingSocket(OSError(errno.ENOBUFS, "No buffer space available"))
+    watcher.on_readable()
+    assert sock.reads == 2 and not sock.closed
+    assert watcher.events[0]["type"] == "overflow"
+    assert watcher.settle_timer.isActive()
+    watcher.stop()
+
+
+def test_netlink_error_stops_the_watcher(pyrdp):
+    watcher = pyrdp.NetworkWatcher()
+    sock = watcher.sock = FailingSocket(OSError(errno.EBADF, "Bad file descriptor"), OSError(errno.EBADF, "Bad file descriptor"))
+    watcher.on_readable()
+    assert sock.reads == 1 and sock.closed
+    assert watcher.sock is None
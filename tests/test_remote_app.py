@@ -0,0 +1,73 @@
+"""
+Starting another app while a RemoteApp session runs.
+"""
+import sys
+import time
+
+APP_COMMAND = [sys.executable, "-c", "import time; print('Loading Dynamic Virtual Channel', flush=True); time.sleep(30)"]
+
+
+class RunningThread:
+
+    # Stand-in for the ConnectionThread of the first app
+    def __init__(self):
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+    def wait(self):
+        pass
+
+    def isRunning(self):
+        return not self.stopped
+
+
+def wait_for(qapp, condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        qapp.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+def test_open_apps_survive_the_next_launch(client, pyrdp, qapp, monkeypatch):
+    c = client()
+    traces = []
+    monkeypatch.setattr(c.log_manager, "write_trace", traces.append)
+    monkeypatch.setattr(c, "gen_command", lambda: APP_COMMAND)
+    errors = []
+    monkeypatch.setattr(pyrdp.QMessageBox, "critical", staticmethod(lambda *args: errors.append(args[2])))
+    first = RunningThread()
+    c.connection_thread = first
+    c.connection_trace = pyrdp.ConnectionTrace("abc")
+    c.remote_app = {"name": "Word", "program": "||word"}
+    c.remote_app_session_key = "alice@rds.example.com:3389"
+    c.remote_app_sessions[c.remote_app_session_key] = ["Word"]
+
+    c.launch_remote_app({"name": "Excel", "program": "||excel"})
+    c.launch_remote_app({"name": "Outlook", "program": "||outlook"})
+    threads = list(c.remote_app_threads)
+    assert len(threads) == 2
+    assert wait_for(qapp, lambda: all("remote_app_launches" in thread.trace.annotations for thread in threads))
+
+    # The first app and the other extra app are still running
+    assert not first.stopped
+    assert c.remote_app == {"name": "Word", "program": "||word"}
+    assert c.connection_trace.trace_id == "abc"
+    assert c.remote_app_sessions[c.remote_app_session_key] == ["Word", "Excel", "Outlook"]
+    assert all(thread.isRunning() for thread in threads)
+    assert traces == []
+
+    # An extra app closing on its own leaves the others open
+    threads[0].freerdp_process.terminate()
+    assert wait_for(qapp, lambda: len(c.remote_app_threads) == 1)
+    assert threads[1].isRunning()
+    assert c.remote_app_sessions[c.remote_app_session_key] == ["Word", "Outlook"]
+    assert errors and "Excel" in errors[0]
+
+    # The extra apps end with the session
+    c.release_session()
+    assert not threads[1].isRunning()
+    assert c.remote_app_threads == {}
+    assert [trace["outcome"] for trace in traces] == ["failed", "stopped"]
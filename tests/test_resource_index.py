@@ -0,0 +1,67 @@
+"""
+Asset lookups through the resource index.
+"""
+import hashlib
+import json
+import os
+
+import pytest
+
+
+@pytest.fixture
+def bases(tmp_path):
+    src, resources = tmp_path / "src", tmp_path / "Resources"
+    for base in (src, resources):
+        (base / "icons").mkdir(parents=True)
+        (base / "icons" / "shared.png").write_bytes(base.name.encode())
+    (resources / "icons" / "only.png").write_bytes(b"resources")
+    (src / "img" / "logo").mkdir(parents=True)
+    (src / "img" / "logo" / "logo.png").write_bytes(b"logo")
+    (src / "README").write_text("readme")
+    return src, resources
+
+
+def test_lookup_prefers_the_first_base(pyrdp, bases):
+    src, resources = bases
+    index = pyrdp.ResourceIndex([str(src), str(resources)])
+    assert index.lookup("icons/shared.png") == str(src / "icons" / "shared.png")
+    assert index.lookup("icons/only.png") == str(resources / "icons" / "only.png")
+    assert index.lookup("img/./logo/logo.png") == str(src / "img" / "logo" / "logo.png")
+    assert index.lookup("README") == str(src / "README")
+
+
+def test_missing_asset_is_reported_once(pyrdp, bases, monkeypatch):
+    warnings = []
+    monkeypatch.setattr(pyrdp.logger, "warning", lambda message, *args: warnings.append(args[0]))
+    index = pyrdp.ResourceIndex([str(path) for path in bases])
+    assert index.lookup("icons/missing.png") is None
+    assert index.lookup("icons/missing.png") is None
+    assert warnings == ["icons/missing.png"]
+
+
+def test_refresh_picks_up_changed_directories(pyrdp, bases):
+    src, resources = bases
+    index = pyrdp.ResourceIndex([str(src), str(resources)])
+    assert not index.refresh()
+    assert index.lookup("icons/new.png") is None
+
+    (src / "icons" / "new.png").write_bytes(b"new")
+    mtime = os.stat(src / "icons").st_mtime_ns
+    os.utime(src / "icons", ns=(mtime, mtime + 1_000_000_000))
+    assert index.refresh()
+    assert index.lookup("icons/new.png") == str(src / "icons" / "new.png")
+
+
+def test_digest_uses_the_manifest(pyrdp, bases):
+    src, resources = bases
+    assert pyrdp.ResourceIndex.write_manifest(str(src)) == 2
+    manifest = json.loads((src / "manifest.json").read_text())
+    assert manifest["assets"]["icons/shared.png"] == {"sha256": hashlib.sha256(b"src").hexdigest(), "size": 3}
+
+    # The manifest hash is trusted over the file content
+    manifest["assets"]["icons/shared.png"]["sha256"] = "from-manifest"
+    (src / "manifest.json").write_text(json.dumps(manifest))
+    index = pyrdp.ResourceIndex([str(src), str(resources)])
+    assert index.digest("icons/shared.png") == "from-manifest"
+    assert index.digest("icons/only.png") == hashlib.sha256(b"resources").hexdigest()
+    assert index.digest("icons/missing.png") is None
@@ -0,0 +1,146 @@
+"""
+RDP security negotiation against a socketserver stand-in answering with canned X.224 responses.
+"""
+import socket
+import socketserver
+import struct
+import threading
+
+import pytest
+
+
+def connection_confirm(negotiation=b""):
+    x224 = struct.pack(">BBHHB", 6 + len(negotiation), 0xD0, 0, 0x1234, 0) + negotiation
+    return struct.pack(">BBH", 3, 0, 4 + len(x224)) + x224
+
+
+def negotiation(kind, value, flags=0):
+    return struct.pack("<BBHI", kind, flags, 8, value)
+
+
+class StubHandler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        server = self.server
+        server.requests.append(self.request.recv(1024))
+        if server.response is None:
+            # Hold the connection open without answering
+            server.release.wait(5)
+            return
+        self.request.sendall(server.response)
+
+
+@pytest.fixture
+def stub():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.requests = []
+    server.response = b""
+    server.release = threading.Event()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def negotiate(pyrdp, stub, response, cookie=None, timeout=2):
+    stub.response = response
+    with socket.create_connection(stub.server_address, timeout=timeout) as sock:
+        return pyrdp.negotiate_security(sock, cookie)
+
+
+def test_server_selects_nla(pyrdp, stub):
+    result = negotiate(pyrdp, stub, connection_confirm(negotiation(0x02, 0x02, flags=0x1F)), cookie="alice")
+    assert result == {"status": "ok", "protocol": 0x02, "flags": 0x1F}
+    assert pyrdp.security_flags(result) == ["/sec:nla"]
+    assert b"Cookie: mstshash=alice\r\n" in stub.requests[0]
+    assert stub.requests[0][:2] == b"\x03\x00"
+
+
+def test_server_refuses_the_request(pyrdp, stub):
+    result = negotiate(pyrdp, stub, connection_confirm(negotiation(0x03, 5)))
+    assert result == {"status": "failure", "failure": "HYBRID_REQUIRED_BY_SERVER"}
+    assert pyrdp.security_flags(result) == ["/sec:nla"]
+
+
+def test_server_without_negotiation_uses_standard_security(pyrdp, stub):
+    result = negotiate(pyrdp, stub, connection_confirm())
+    assert result["status"] == "ok" and result["protocol"] == 0
+    assert pyrdp.security_flags(result) == ["/sec:rdp"]
+
+
+def test_server_closing_the_connection_is_busy(pyrdp, stub):
+    assert negotiate(pyrdp, stub, b"")["status"] == "busy"
+
+
+def test_server_not_answering_is_busy(pyrdp, stub):
+    result = negotiate(pyrdp, stub, None, timeout=0.3)
+    assert result["status"] == "busy"
+    assert result["error"]
+
+
+@pytest.mark.parametrize("response", [
+    b"HTTP/1.1 400 Bad Request\r\n\r\n",
+    b"\x03\x00\x00\x05\x00",
+    b"\x03\x00\x10\x00" + b"\x00" * 16,
+])
+def test_other_services_are_not_rdp(pyrdp, stub, response):
+    assert negotiate(pyrdp, stub, response) == {"status": "not_rdp"}
+    assert pyrdp.security_flags({"status": "not_rdp"}) == []
+
+
+def test_truncated_answer(pyrdp, stub):
+    response = connection_confirm(negotiation(0x02, 0x01))
+    assert negotiate(pyrdp, stub, response[:9])["status"] == "not_rdp"
+
+
+@pytest.mark.parametrize("data, expected", [
+    (b"", {"status": "not_rdp"}),
+    (connection_confirm()[:10], {"status": "not_rdp"}),
+    (connection_confirm().replace(b"\xd0", b"\xe0", 1), {"status": "not_rdp"}),
+    (connection_confirm(negotiation(0x03, 99)), {"status": "failure", "failure": "UNKNOWN_99"}),
+    (connection_confirm(negotiation(0x07, 1)), {"status": "not_rdp"}),
+    (connection_confirm(negotiation(0x02, 0x08)), {"status": "ok", "protocol": 0x08, "flags": 0}),
+])
+def test_parse_x224_response(pyrdp, data, expected):
+    assert pyrdp.parse_x224_response(data) == expected
+
+
+def test_probe_network_records_the_preflight(client, pyrdp, stub):
+    stub.response = connection_confirm(negotiation(0x02, 0x01))
+    c = client()
+    trace = pyrdp.ConnectionTrace("test")
+    host, port = stub.server_address
+    result = c.probe_network(trace, host, port, preflight=True, cookie="alice")
+    assert result == {"status": "ok", "protocol": 0x01, "flags": 0}
+    assert {"dns", "tcp", "x224"} <= set(trace.spans)
+
+
+def test_probe_network_unreachable(client, pyrdp):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    c = client()
+    result = c.probe_network(pyrdp.ConnectionTrace("test"), "127.0.0.1", port, preflight=True)
+    assert result["status"] == "unreachable"
+
+
+@pytest.mark.parametrize("protocol, expected", [
+    (0x0, ["/sec:rdp"]),
+    (0x1, ["/sec:tls"]),
+    (0x2, ["/sec:nla"]),
+    (0x4, ["/sec:tls"]),
+    (0x8, ["/sec:nla"]),
+    (0x10, []),
+])
+def test_security_flags_for_each_protocol(pyrdp, protocol, expected):
+    assert pyrdp.security_flags({"status": "ok", "protocol": protocol, "flags": 0}) == expected
+
+
+def test_server_selects_rdstls(pyrdp, stub):
+    result = negotiate(pyrdp, stub, connection_confirm(negotiation(0x02, 0x04)))
+    assert result["protocol"] == 0x04
+    assert pyrdp.security_flags(result) == ["/sec:tls"]
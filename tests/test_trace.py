@@ -0,0 +1,68 @@
+"""
+Connect-phase spans of an attempt and the summary of the trace log.
+"""
+import json
+import sys
+
+
+def test_spans_and_milestones(pyrdp):
+    trace = pyrdp.ConnectionTrace("abc", "rds.example.com")
+    with trace.span("dns", host="rds.example.com") as attributes:
+        attributes["addresses"] = 2
+    trace.milestone("first_output")
+    trace.milestone("established")
+    trace.annotate("codec", "gfx")
+    result = trace.finish("success")
+
+    assert result["trace_id"] == "abc" and result["server"] == "rds.example.com"
+    assert result["outcome"] == "success" and result["error"] is None and result["codec"] == "gfx"
+    spans = result["spans"]
+    assert spans["dns"]["host"] == "rds.example.com" and spans["dns"]["addresses"] == 2
+
+    # Each milestone spans from the previous one
+    assert spans["first_output"]["start"] == round(spans["dns"]["start"] + spans["dns"]["duration"], 1)
+    assert spans["established"]["start"] == round(spans["first_output"]["start"] + spans["first_output"]["duration"], 1)
+    assert result["total"] >= spans["established"]["start"]
+
+
+def test_span_is_recorded_when_the_block_fails(pyrdp):
+    trace = pyrdp.ConnectionTrace("abc")
+    try:
+        with trace.span("tcp"):
+            raise OSError("refused")
+    except OSError:
+        pass
+    assert "tcp" in trace.finish("failed", "refused")["spans"]
+
+
+def test_connection_thread_traces_the_freerdp_output(pyrdp, qapp):
+    output = "; ".join(f"print({line!r}, flush=True)" for line in [
+        "[INFO][com.freerdp.crypto] - TLS handshake", "[INFO][com.freerdp.core.nla] - CredSSP", "Local framebuffer format"
+    ])
+    trace = pyrdp.ConnectionTrace("abc")
+    thread = pyrdp.ConnectionThread([sys.executable, "-c", output], trace)
+    thread.start()
+    assert thread.wait(10000)
+    assert list(trace.spans) == ["spawn", "first_output", "tls", "nla", "established", "exit"]
+
+
+def test_summary_reports_percentiles_of_the_last_attempts(pyrdp, tmp_path):
+    path = tmp_path / "trace.jsonl"
+
+    def trace(dns, outcome="success"):
+        return json.dumps({"outcome": outcome, "total": dns + 100, "spans": {"dns": {"start": 0, "duration": dns}}})
+
+    # The rotated file holds the older attempts
+    (tmp_path / "trace.jsonl.1").write_text("\n".join(trace(dns) for dns in (1000, 10, 20)) + "\n")
+    path.write_text("\n".join([trace(30), "{not json", trace(40, "failed")]) + "\n")
+
+    lines = pyrdp.summarize_traces(str(path), 5).splitlines()
+    assert lines[0] == "Last 4 attempts (3 success, 1 failed)"
+    rows = {line.split()[0]: line.split()[1:] for line in lines[2:]}
+    assert rows["dns"] == ["4", "30", "40"]
+    assert rows["total"] == ["4", "130", "140"]
+
+
+def test_summary_without_attempts(pyrdp, tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    assert pyrdp.summarize_traces(path, 10) == f"No connection attempts recorded in {path}"
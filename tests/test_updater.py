@@ -0,0 +1,167 @@
+"""
+Updater against a local bare repository: a publisher clone pushes releases, the client
+checkout fetches, stages and swaps them.
+"""
+import os
+import subprocess
+
+import pytest
+
+GIT_ENV = {
+    "GIT_AUTHOR_NAME": "Test", "GIT_AUTHOR_EMAIL": "test@example.com",
+    "GIT_COMMITTER_NAME": "Test", "GIT_COMMITTER_EMAIL": "test@example.com",
+    "GIT_CONFIG_GLOBAL": os.devnull, "GIT_CONFIG_NOSYSTEM": "1",
+}
+
+
+def git(cwd, *args):
+    return subprocess.run(["git"] + list(args), cwd=cwd, check=True, capture_output=True, text=True,
+                          env=dict(os.environ, **GIT_ENV)).stdout.strip()
+
+
+def publish(publisher, files, message):
+    for path, content in files.items():
+        full = os.path.join(publisher, path)
+        if content is None:
+            os.remove(full)
+            continue
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, "w") as f:
+            f.write(content)
+    git(publisher, "add", "-A")
+    git(publisher, "commit", "-q", "-m", message)
+    git(publisher, "push", "-q", "origin", "HEAD:main")
+    return git(publisher, "rev-parse", "HEAD")
+
+
+def read(root, path):
+    with open(os.path.join(root, path)) as f:
+        return f.read()
+
+
+@pytest.fixture
+def repos(tmp_path, monkeypatch):
+    for name, value in GIT_ENV.items():
+        monkeypatch.setenv(name, value)
+    remote = tmp_path / "remote.git"
+    git(tmp_path, "init", "-q", "--bare", "-b", "main", str(remote))
+    publisher = tmp_path / "publisher"
+    git(tmp_path, "clone", "-q", str(remote), str(publisher))
+    git(publisher, "checkout", "-q", "-b", "main")
+    publish(publisher, {
+        "src/PyRDPConnect.py": "VERSION = 1\n",
+        "src/icons/a.svg": "<svg/>\n",
+        "docs/old.md": "old\n",
+        "README.md": "v1\n",
+    }, "v1")
+    return remote, publisher
+
+
+@pytest.fixture
+def job(pyrdp):
+    return pyrdp.JobThread(lambda job: None)
+
+
+def clone(tmp_path, remote, *args):
+    root = tmp_path / "client"
+    git(tmp_path, "clone", "-q", *args, f"file://{remote}", str(root))
+    return str(root)
+
+
+def test_update_is_swapped_in(pyrdp, repos, job, tmp_path):
+    remote, publisher = repos
+    root = clone(tmp_path, remote)
+    updater = pyrdp.Updater(root)
+    assert updater.check_and_stage(job) is None
+
+    commit = publish(publisher, {"src/PyRDPConnect.py": "VERSION = 2\n", "README.md": "v2\n", "docs/old.md": None}, "v2")
+    assert updater.check_and_stage(job) == commit
+    assert read(root, "src/PyRDPConnect.py") == "VERSION = 1\n"
+    assert read(updater.stage_dir, "src/PyRDPConnect.py") == "VERSION = 2\n"
+
+    assert updater.apply(job) == commit
+    assert read(root, "src/PyRDPConnect.py") == "VERSION = 2\n"
+    assert read(root, "README.md") == "v2\n"
+    assert not os.path.exists(os.path.join(root, "docs", "old.md"))
+    assert git(root, "rev-parse", "HEAD") == commit
+    assert git(root, "status", "--porcelain") == ""
+    assert not os.path.exists(updater.stage_dir)
+
+
+def test_shallow_clone_stays_shallow(pyrdp, repos, job, tmp_path):
+    remote, publisher = repos
+    root = clone(tmp_path, remote, "--depth=1")
+    commit = publish(publisher, {"src/PyRDPConnect.py": "VERSION = 2\n"}, "v2")
+    updater = pyrdp.Updater(root)
+    assert updater.check_and_stage(job) == commit
+    updater.apply(job)
+    assert git(root, "rev-parse", "--is-shallow-repository") == "true"
+    assert read(root, "src/PyRDPConnect.py") == "VERSION = 2\n"
+
+
+def test_update_that_does_not_compile_is_not_staged(pyrdp, repos, job, tmp_path):
+    remote, publisher = repos
+    root = clone(tmp_path, remote)
+    publish(publisher, {"src/PyRDPConnect.py": "def broken(:\n"}, "broken")
+    updater = pyrdp.Updater(root)
+    with pytest.raises(SyntaxError):
+        updater.check_and_stage(job)
+    assert updater.staged_commit is None
+    with pytest.raises(RuntimeError):
+        updater.apply(job)
+    assert read(root, "src/PyRDPConnect.py") == "VERSION = 1\n"
+
+
+@pytest.mark.parametrize("path", ["src/icons/a.svg", "README.md", "src/local.py"])
+def test_local_changes_stop_the_update_before_the_swap(pyrdp, repos, job, tmp_path, path):
+    remote, publisher = repos
+    root = clone(tmp_path, remote)
+    publish(publisher, {"src/PyRDPConnect.py": "VERSION = 2\n", "README.md": "v2\n"}, "v2")
+    with open(os.path.join(root, path), "w") as f:
+        f.write("local\n")
+    updater = pyrdp.Updater(root)
+    updater.check_and_stage(job)
+    with pytest.raises(RuntimeError, match="Local changes"):
+        updater.apply(job)
+    assert read(root, "src/PyRDPConnect.py") == "VERSION = 1\n"
+    assert read(root, path) == "local\n"
+
+
+def test_local_changes_to_unchanged_files_are_kept(pyrdp, repos, job, tmp_path):
+    remote, publisher = repos
+    root = clone(tmp_path, remote)
+    commit = publish(publisher, {"src/PyRDPConnect.py": "VERSION = 2\n"}, "v2")
+    with open(os.path.join(root, "README.md"), "w") as f:
+        f.write("local\n")
+    updater = pyrdp.Updater(root)
+    updater.check_and_stage(job)
+    assert updater.apply(job) == commit
+    assert read(root, "README.md") == "local\n"
+
+
+def test_diverged_checkout_is_not_updated(pyrdp, repos, job, tmp_path):
+    remote, publisher = repos
+    root = clone(tmp_path, remote)
+    publish(publisher, {"README.md": "v2\n"}, "v2")
+    with open(os.path.join(root, "README.md"), "w") as f:
+        f.write("local commit\n")
+    git(root, "commit", "-q", "-am", "local")
+    with pytest.raises(RuntimeError, match="diverged"):
+        pyrdp.Updater(root).check(job)
+
+
+def test_exchange_without_renameat2(pyrdp, tmp_path, monkeypatch):
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    (first / "name").write_text("first")
+    (second / "name").write_text("second")
+    pyrdp.Updater.exchange(str(first), str(second))
+    assert (first / "name").read_text() == "second"
+
+    # Other platforms fall back to renames
+    monkeypatch.setattr(pyrdp.sys, "platform", "darwin")
+    pyrdp.Updater.exchange(str(first), str(second))
+    assert (first / "name").read_text() == "first"
+    assert (second / "name").read_text() == "second"
+    assert not os.path.exists(str(second) + ".old")